@@ -1,16 +1,22 @@
 """Automation API endpoints."""
 import asyncio
+import json
 import logging
+import time
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import User, UserProfile, AppSettings
+from app.config import settings
+from app.database import SessionLocal, get_db
+from app.models import AppSettings, AutomationRun, AutomationRunEvent, User, UserProfile
 from app.api.auth import get_current_user
-from app.services.automation import AutomationService, automation_status
+from app.services.automation import RESUMABLE, latest_run, run_status
+from app.services.automation_queue import ACTIVE, enqueue_run
 from app.services.github_analyzer import GitHubAnalyzer
+from app.services.hh_client import HHClient
 
 logger = logging.getLogger(__name__)
 
@@ -50,20 +56,20 @@ HH_SPECIALIZATIONS = [
     {"id": "1.536", "name": "Технический писатель"},
 ]
 
-# Major cities
-HH_CITIES = [
-    {"id": "1", "name": "Москва"},
-    {"id": "2", "name": "Санкт-Петербург"},
-    {"id": "3", "name": "Екатеринбург"},
-    {"id": "4", "name": "Новосибирск"},
-    {"id": "41", "name": "Калининград"},
-    {"id": "54", "name": "Красноярск"},
-    {"id": "66", "name": "Нижний Новгород"},
-    {"id": "88", "name": "Казань"},
-    {"id": "104", "name": "Воронеж"},
-    {"id": "113", "name": "Ростов-на-Дону"},
-    {"id": "159", "name": "Самара"},
-    {"id": "1438", "name": "Краснодар"},
+# Major cities, resolved to HH area ids via the cached area index
+HH_CITY_NAMES = [
+    "Москва",
+    "Санкт-Петербург",
+    "Екатеринбург",
+    "Новосибирск",
+    "Калининград",
+    "Красноярск",
+    "Нижний Новгород",
+    "Казань",
+    "Воронеж",
+    "Ростов-на-Дону",
+    "Самара",
+    "Краснодар",
 ]
 
 
@@ -76,7 +82,20 @@ async def get_specializations():
 @router.get("/cities")
 async def get_cities():
     """Get available cities for job search."""
-    return HH_CITIES
+    try:
+        index = await HHClient().get_area_index()
+    except Exception as e:
+        logger.error(f"Could not load HH areas: {e}")
+        raise HTTPException(status_code=503, detail="HH.ru areas are unavailable")
+
+    cities = []
+    for name in HH_CITY_NAMES:
+        area_id = index.resolve_city(name)
+        if area_id:
+            cities.append({"id": area_id, "name": name})
+        else:
+            logger.warning(f"City {name!r} not found in HH areas")
+    return cities
 
 
 @router.post("/analyze-github")
@@ -108,15 +127,23 @@ async def analyze_github(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _has_free_run_slot(db: Session, user: User) -> bool:
+    """Runs share HH and LLM capacity fairly; per user their number is capped."""
+    running = db.query(AutomationRun).filter(
+        AutomationRun.user_id == user.id,
+        AutomationRun.status.in_(ACTIVE),
+    ).count()
+    return running < settings.automation_max_runs_per_user
+
+
 @router.post("/start")
 async def start_automation(
     config: AutomationConfig,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    """Start the automation process."""
-    if automation_status.get("status") == "running":
+    """Queue an automation run; a worker process (app.worker) picks it up."""
+    if not _has_free_run_slot(db, user):
         raise HTTPException(status_code=400, detail="Automation already running")
 
     # Check if user has profile
@@ -124,50 +151,188 @@ async def start_automation(
     if not profile:
         raise HTTPException(status_code=400, detail="Profile not found. Complete interview first.")
 
-    # Start automation in background
-    service = AutomationService(db, user)
-    background_tasks.add_task(
-        service.run,
-        specializations=config.specializations,
-        cities=config.cities,
-        auto_apply=config.auto_apply,
-        max_resumes=config.max_resumes,
-    )
+    run = AutomationRun(user_id=user.id, config=config.model_dump(), phase="loading")
+    db.add(run)
+    enqueue_run(db, run)
 
-    return {"message": "Automation started"}
+    return {"message": "Automation started", "run_id": run.id}
 
 
 @router.post("/stop")
 async def stop_automation(
+    db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """Stop the automation process."""
-    automation_status["should_stop"] = True
+    # Not picked up yet: nothing to wind down
+    db.query(AutomationRun).filter(
+        AutomationRun.user_id == user.id,
+        AutomationRun.status == "queued",
+    ).update({"status": "stopped", "message": "Автоматизация остановлена"}, synchronize_session=False)
+    # Running: the worker sees the flag at its next checkpoint
+    db.query(AutomationRun).filter(
+        AutomationRun.user_id == user.id,
+        AutomationRun.status == "running",
+    ).update({"should_stop": True}, synchronize_session=False)
+    db.commit()
     return {"message": "Stop signal sent"}
 
 
 @router.get("/status")
 async def get_automation_status(
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Get status of the latest automation run.
+
+    Includes per-stage queue depths and counters ("stages") and LLM scoring
+    latency in seconds ("analysis_latency") as of the last checkpoint.
+    """
+    return run_status(latest_run(db, user.id))
+
+
+@router.get("/runs")
+async def list_runs(
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Recent automation runs, newest first."""
+    runs = (
+        db.query(AutomationRun)
+        .filter(AutomationRun.user_id == user.id)
+        .order_by(AutomationRun.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "run_id": run.id,
+            "status": run.status,
+            "phase": run.phase,
+            "config": run.config,
+            "vacancies_analyzed": run.vacancies_analyzed,
+            "resumes_generated": run.resumes_generated,
+            "applications_sent": run.applications_sent,
+            "created_at": run.created_at,
+            "finished_at": run.finished_at,
+        }
+        for run in runs
+    ]
+
+
+@router.post("/runs/{run_id}/resume")
+async def resume_run(
+    run_id: int,
+    db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    """Get current automation status."""
-    return {
-        "status": automation_status.get("status", "idle"),
-        "phase": automation_status.get("phase"),
-        "message": automation_status.get("message", ""),
-        "vacancies_loaded": automation_status.get("vacancies_loaded", 0),
-        "vacancies_total": automation_status.get("vacancies_total", 0),
-        "vacancies_analyzed": automation_status.get("vacancies_analyzed", 0),
-        "resumes_generated": automation_status.get("resumes_generated", 0),
-        "applications_sent": automation_status.get("applications_sent", 0),
-        "recommendations": automation_status.get("recommendations", []),
-        "error": automation_status.get("error"),
-    }
+    """Continue an interrupted, failed or stopped run from its last checkpoint."""
+    run = db.query(AutomationRun).filter(
+        AutomationRun.id == run_id,
+        AutomationRun.user_id == user.id,
+    ).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if run.status not in RESUMABLE:
+        raise HTTPException(status_code=400, detail=f"Run is {run.status}, cannot resume")
+    if not _has_free_run_slot(db, user):
+        raise HTTPException(status_code=400, detail="Automation already running")
+
+    enqueue_run(db, run)
+    return {"message": "Automation resumed", "run_id": run.id}
+
+
+# Comment line sent on an idle stream so proxies keep the connection open
+SSE_KEEPALIVE = 15.0
+
+# Events read from the DB per poll
+SSE_BATCH = 200
+
+
+def _sse(event: AutomationRunEvent) -> str:
+    data = json.dumps(event.data, ensure_ascii=False)
+    return f"id: {event.seq}\nevent: {event.type}\ndata: {data}\n\n"
+
+
+@router.get("/runs/{run_id}/events")
+async def stream_run_events(
+    run_id: int,
+    request: Request,
+    after: int = 0,
+    last_event_id: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Server-Sent Events stream of a run's progress.
+
+    Events: ``progress`` (counters and message), ``phase``,
+    ``recommendation`` (a new vacancy scoring >= 60) and ``status``. The
+    event id is the run's sequence number; a reconnecting EventSource sends
+    it back as Last-Event-ID and the stream continues after it (``after``
+    does the same for other clients). The stream ends once the run has
+    finished and everything was sent; a reconnect then gets 204.
+    """
+    run = db.query(AutomationRun).filter(
+        AutomationRun.id == run_id,
+        AutomationRun.user_id == user.id,
+    ).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    last_seq = after
+    if last_event_id and last_event_id.isdigit():
+        last_seq = max(last_seq, int(last_event_id))
+
+    finished = run.status not in ACTIVE
+    pending = db.query(AutomationRunEvent.id).filter(
+        AutomationRunEvent.run_id == run_id,
+        AutomationRunEvent.seq > last_seq,
+    ).first()
+    if finished and not pending:
+        return Response(status_code=204)
+
+    async def event_stream():
+        seq = last_seq
+        idle_since = time.monotonic()
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            with SessionLocal() as stream_db:
+                # Status first: a finished run has committed all of its events
+                status = stream_db.query(AutomationRun.status).filter(AutomationRun.id == run_id).scalar()
+                events = (
+                    stream_db.query(AutomationRunEvent)
+                    .filter(AutomationRunEvent.run_id == run_id, AutomationRunEvent.seq > seq)
+                    .order_by(AutomationRunEvent.seq)
+                    .limit(SSE_BATCH)
+                    .all()
+                )
+            for event in events:
+                yield _sse(event)
+                seq = event.seq
+            if len(events) == SSE_BATCH:
+                continue
+            if status not in ACTIVE:
+                return
+
+            if events:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= SSE_KEEPALIVE:
+                yield ": keepalive\n\n"
+                idle_since = time.monotonic()
+            await asyncio.sleep(settings.automation_stream_poll_interval)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/recommendations")
 async def get_recommendations(
+    db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    """Get current vacancy recommendations."""
-    return automation_status.get("recommendations", [])
+    """Get vacancy recommendations of the latest run."""
+    return run_status(latest_run(db, user.id))["recommendations"]
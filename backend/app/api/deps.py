@@ -1,8 +1,10 @@
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.database import get_db
 from app.models import User
+from app.services.hh_resilience import Deadline
 
 
 def get_current_user(db: Session = Depends(get_db)) -> User:
@@ -30,3 +32,8 @@ def get_current_user_with_hh(
             detail="HH.ru not connected. Please authorize first.",
         )
     return user
+
+
+def get_deadline() -> Deadline:
+    """Time budget for HH.ru calls made while serving this request."""
+    return Deadline(settings.hh_request_deadline)
@@ -247,10 +247,7 @@ async def publish_variation(
         # Add more fields as needed based on HH API requirements
     }
 
-    client = HHClient(
-        access_token=user.hh_access_token,
-        refresh_token=user.hh_refresh_token
-    )
+    client = HHClient.for_user(user)
 
     try:
         if variation.hh_resume_id:
@@ -261,11 +258,6 @@ async def publish_variation(
             result = await client.create_resume(hh_resume_data)
             variation.hh_resume_id = result.get("id")
 
-        # Save new tokens if refreshed
-        if client.new_tokens:
-            user.hh_access_token = client.new_tokens.get("access_token")
-            user.hh_refresh_token = client.new_tokens.get("refresh_token")
-
         variation.status = "published"
         db.commit()
 
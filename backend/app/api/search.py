@@ -1,16 +1,22 @@
 """Vacancy search API with full filtering and export."""
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-import json
-import csv
-import io
 
 from app.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_deadline
 from app.models import User
+from app.services.area_index import RUSSIA_AREA_ID, TRIE_NODE_CAPACITY
 from app.services.hh_client import HHClient
+from app.services.hh_resilience import Deadline
+from app.services.vacancy_export import (
+    parquet_available,
+    stream_csv,
+    stream_json,
+    stream_ndjson,
+    stream_parquet,
+)
 
 router = APIRouter()
 
@@ -22,40 +28,72 @@ router = APIRouter()
 async def get_dictionaries():
     """Get HH.ru dictionaries (experience, employment, schedule, etc.)."""
     client = HHClient()
-    return await client.get_dictionaries()
+    return Response(await client.get_reference_body("/dictionaries"), media_type="application/json")
 
 
 @router.get("/areas")
 async def get_areas():
     """Get all regions/areas (hierarchical)."""
     client = HHClient()
-    return await client.get_areas()
+    return Response(await client.get_reference_body("/areas"), media_type="application/json")
 
 
 @router.get("/areas/russia")
 async def get_russia_areas():
     """Get Russia regions with cities."""
     client = HHClient()
-    areas = await client.get_areas()
-    # Find Russia (id=113)
-    for country in areas:
-        if country.get("id") == "113":
-            return country
-    return {"error": "Russia not found"}
+    index = await client.get_area_index()
+    russia = index.get(RUSSIA_AREA_ID)
+    if not russia:
+        return {"error": "Russia not found"}
+    return russia
+
+
+@router.get("/areas/autocomplete")
+async def autocomplete_areas(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=TRIE_NODE_CAPACITY),
+    country: str | None = None,
+):
+    """Case-insensitive prefix search over area names."""
+    client = HHClient()
+    index = await client.get_area_index()
+    return [index.summary(area_id) for area_id in index.autocomplete(q, limit, country)]
+
+
+@router.get("/areas/cities")
+async def get_area_cities(country: str | None = RUSSIA_AREA_ID):
+    """Get flat list of cities (leaf areas), optionally for one country."""
+    client = HHClient()
+    index = await client.get_area_index()
+    return [
+        {"id": area_id, "name": index.nodes[area_id].get("name"), "parent_id": index.parent[area_id]}
+        for area_id in index.list_cities(country)
+    ]
+
+
+@router.get("/areas/{area_id}")
+async def get_area(area_id: str):
+    """Get area by id with its ancestor path."""
+    client = HHClient()
+    index = await client.get_area_index()
+    if not index.get(area_id):
+        raise HTTPException(status_code=404, detail="Area not found")
+    return index.summary(area_id)
 
 
 @router.get("/professional-roles")
 async def get_professional_roles():
     """Get professional roles (job categories)."""
     client = HHClient()
-    return await client.get_professional_roles()
+    return Response(await client.get_reference_body("/professional_roles"), media_type="application/json")
 
 
 @router.get("/industries")
 async def get_industries():
     """Get industries list."""
     client = HHClient()
-    return await client.get_industries()
+    return Response(await client.get_reference_body("/industries"), media_type="application/json")
 
 
 # ============ Vacancy Search ============
@@ -93,9 +131,10 @@ async def search_vacancies(
     order_by: str = "relevance",
     page: int = 0,
     per_page: int = 20,
+    deadline: Deadline = Depends(get_deadline),
 ):
     """Search vacancies with filters."""
-    client = HHClient()
+    client = HHClient(deadline=deadline)
     return await client.search_vacancies_full(
         text=text,
         area=area,
@@ -119,14 +158,22 @@ async def export_vacancies(
     params: SearchParams,
     format: str = "json",
     max_pages: int = 20,
+    partition: bool = False,
 ):
     """Export all vacancies matching search criteria.
 
     Args:
         params: Search parameters
-        format: Export format (json or csv)
-        max_pages: Maximum pages to fetch (up to 2000 vacancies)
+        format: Export format (json, ndjson, csv or parquet)
+        max_pages: Maximum pages to fetch (up to 2000 vacancies), per slice if partitioned
+        partition: Split the query by area/date to export past the 2000 results limit
     """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=400,
+            detail="Parquet export requires pyarrow (pip install job-search-assistant[export])",
+        )
+
     client = HHClient()
 
     # Build search params dict
@@ -156,60 +203,53 @@ async def export_vacancies(
     if params.order_by:
         search_params["order_by"] = params.order_by
 
-    # Export all vacancies
-    vacancies = await client.export_all_vacancies(max_pages=max_pages, **search_params)
+    if partition:
+        pages = client.iter_partitioned_pages(max_pages=max_pages, **search_params)
+    else:
+        pages = client.iter_export_pages(max_pages=max_pages, **search_params)
+
+    # Fetch the first page before responding, so HH errors still produce a proper
+    # error status; the rest is streamed as pages arrive.
+    try:
+        first_page = await anext(pages)
+    except StopAsyncIteration:
+        first_page = None
+
+    async def all_pages():
+        if first_page is None:
+            return
+        yield first_page
+        async for items in pages:
+            yield items
 
     if format == "csv":
-        # Generate CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Header
-        writer.writerow([
-            "ID", "Название", "Компания", "Город", "Зарплата от", "Зарплата до",
-            "Валюта", "Опыт", "Занятость", "График", "URL", "Дата публикации"
-        ])
-
-        # Data
-        for v in vacancies:
-            salary = v.get("salary") or {}
-            area = v.get("area") or {}
-            employer = v.get("employer") or {}
-            experience = v.get("experience") or {}
-            employment = v.get("employment") or {}
-            schedule = v.get("schedule") or {}
-
-            writer.writerow([
-                v.get("id", ""),
-                v.get("name", ""),
-                employer.get("name", ""),
-                area.get("name", ""),
-                salary.get("from", ""),
-                salary.get("to", ""),
-                salary.get("currency", ""),
-                experience.get("name", ""),
-                employment.get("name", ""),
-                schedule.get("name", ""),
-                v.get("alternate_url", ""),
-                v.get("published_at", ""),
-            ])
-
-        output.seek(0)
         return StreamingResponse(
-            iter([output.getvalue()]),
+            stream_csv(all_pages()),
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=vacancies.csv"}
         )
+    elif format == "ndjson":
+        return StreamingResponse(
+            stream_ndjson(all_pages()),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": "attachment; filename=vacancies.ndjson"}
+        )
+    elif format == "parquet":
+        return StreamingResponse(
+            stream_parquet(all_pages()),
+            media_type="application/vnd.apache.parquet",
+            headers={"Content-Disposition": "attachment; filename=vacancies.parquet"}
+        )
     else:
         # JSON format
-        return {
-            "total": len(vacancies),
-            "items": vacancies,
-        }
+        return StreamingResponse(
+            stream_json(all_pages()),
+            media_type="application/json",
+        )
 
 
 @router.get("/vacancies/{vacancy_id}")
-async def get_vacancy_details(vacancy_id: str):
+async def get_vacancy_details(vacancy_id: str, deadline: Deadline = Depends(get_deadline)):
     """Get full vacancy details."""
-    client = HHClient()
+    client = HHClient(deadline=deadline)
     return await client.get_vacancy(vacancy_id)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.database import get_db
 from app.api.deps import get_current_user
@@ -8,6 +8,10 @@ from app.models import User, AppSettings
 from app.schemas.settings import SettingsResponse, SettingsUpdate
 from app.config import settings as app_settings
 from app.services.llm import CLAUDE_MODELS, OPENAI_MODELS
+from app.services.rate_limiter import DEFAULT_HH_RATES, hh_rate_limiter, load_rate_limits
+from app.services.hh_client import hh_inflight
+from app.services.hh_resilience import hh_breakers
+from app.services.retry import retry_stats
 from app.services.llm.prompts import (
     INTERVIEW_SYSTEM_PROMPT,
     INTERVIEW_FIRST_MESSAGE,
@@ -216,3 +220,47 @@ async def delete_github_token(
         db.delete(setting)
         db.commit()
     return {"message": "GitHub token deleted"}
+
+
+# ============ HH.ru Rate Limits ============
+
+
+class RateLimitsUpdate(BaseModel):
+    search: float | None = Field(default=None, gt=0)
+    detail: float | None = Field(default=None, gt=0)
+    negotiations: float | None = Field(default=None, gt=0)
+    resumes: float | None = Field(default=None, gt=0)
+    default: float | None = Field(default=None, gt=0)
+
+
+@router.get("/hh-rate-limits")
+async def get_hh_rate_limits(
+    user: User = Depends(get_current_user),
+):
+    """Get HH.ru API rate limits (requests per second per endpoint class)."""
+    return {"rates": hh_rate_limiter.get_rates(), "defaults": DEFAULT_HH_RATES}
+
+
+@router.put("/hh-rate-limits")
+async def update_hh_rate_limits(
+    data: RateLimitsUpdate,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Update HH.ru API rate limits. Applied immediately to the API and all workers."""
+    for name, rate in data.model_dump(exclude_none=True).items():
+        set_setting(db, f"hh_rate_{name}", str(rate))
+
+    return {"rates": load_rate_limits(db), "defaults": DEFAULT_HH_RATES}
+
+
+@router.get("/hh-client-stats")
+async def get_hh_client_stats(
+    user: User = Depends(get_current_user),
+):
+    """Get HH client counters (retries etc.) for tuning limits under load."""
+    return {
+        "retries": dict(retry_stats),
+        "coalescing": {**hh_inflight.stats, "inflight": hh_inflight.inflight},
+        "circuit_breakers": hh_breakers.snapshot(),
+    }
@@ -1,20 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 import re
 
 from app.database import get_db
-from app.api.deps import get_current_user, get_current_user_with_hh
+from app.api.deps import get_current_user, get_current_user_with_hh, get_deadline
 from app.models import User, UserProfile, VacancyCache, BaseResume
 from app.schemas.vacancy import VacancyResponse, VacancyMatchResponse
 from app.services.hh_client import HHClient
+from app.services.hh_resilience import Deadline, HHUnavailableError
 from app.services.vacancy_analyzer import VacancyAnalyzer
+from app.services.vacancy_hydration import hydrate_in_background
+from app.services.vacancy_store import apply_vacancy_details, upsert_search_items
 
 router = APIRouter()
 
 
 @router.get("/vacancies")
 async def search_vacancies(
+    background_tasks: BackgroundTasks,
     text: Optional[str] = Query(None, description="Search query"),
     area: Optional[str] = Query(None, description="Region ID (1 = Moscow, 2 = SPb)"),
     salary: Optional[int] = Query(None, description="Desired salary"),
@@ -25,13 +29,11 @@ async def search_vacancies(
     per_page: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    deadline: Deadline = Depends(get_deadline),
 ):
     """Search vacancies on HH.ru."""
     # Use HH client with refresh token for auto-refresh
-    client = HHClient(
-        access_token=user.hh_access_token,
-        refresh_token=user.hh_refresh_token
-    )
+    client = HHClient.for_user(user, deadline=deadline)
 
     try:
         result = await client.search_vacancies(
@@ -45,48 +47,17 @@ async def search_vacancies(
             per_page=per_page,
         )
 
-        # Save new tokens if they were refreshed
-        if client.new_tokens:
-            user.hh_access_token = client.new_tokens.get("access_token")
-            user.hh_refresh_token = client.new_tokens.get("refresh_token")
-            db.commit()
-
-        # Cache vacancies
-        vacancies = []
-        for item in result.get("items", []):
-            # Check if already cached
-            cached = (
-                db.query(VacancyCache)
-                .filter(VacancyCache.hh_vacancy_id == str(item["id"]))
-                .first()
-            )
-
-            if not cached:
-                cached = VacancyCache(hh_vacancy_id=str(item["id"]))
-                db.add(cached)
-
-            # Update cache
-            cached.title = item.get("name")
-            cached.company_name = item.get("employer", {}).get("name")
-
-            salary_data = item.get("salary") or {}
-            cached.salary_from = salary_data.get("from")
-            cached.salary_to = salary_data.get("to")
-            cached.salary_currency = salary_data.get("currency")
-
-            cached.location = item.get("area", {}).get("name")
-            cached.experience = item.get("experience", {}).get("name")
-            cached.employment_type = item.get("employment", {}).get("name")
-
-            snippet = item.get("snippet", {})
-            cached.requirements = snippet.get("requirement")
-            cached.description = snippet.get("responsibility")
-
-            cached.raw_data = item
+        # Cache vacancies, one upsert for the whole page
+        ids, _ = upsert_search_items(db, result.get("items", []))
+        db.commit()
 
-            vacancies.append(cached)
+        cached = {v.id: v for v in db.query(VacancyCache).filter(VacancyCache.id.in_(ids))}
+        vacancies = [cached[vacancy_id] for vacancy_id in ids]
 
-        db.commit()
+        # Fetch full details of this page ahead of the user opening them
+        pending = [v.hh_vacancy_id for v in vacancies if v.details_fetched_at is None]
+        if pending:
+            background_tasks.add_task(hydrate_in_background, user.id, pending)
 
         # Return with pagination info
         return {
@@ -113,6 +84,8 @@ async def search_vacancies(
             "per_page": result.get("per_page", 20),
         }
 
+    except HHUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -125,6 +98,7 @@ async def get_vacancy(
     vacancy_id: int,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    deadline: Deadline = Depends(get_deadline),
 ):
     """Get vacancy details."""
     vacancy = db.query(VacancyCache).filter(VacancyCache.id == vacancy_id).first()
@@ -135,25 +109,12 @@ async def get_vacancy(
             detail="Vacancy not found in cache",
         )
 
-    # Fetch full details from HH if needed
-    if not vacancy.description or not vacancy.key_skills:
-        client = HHClient(
-            access_token=user.hh_access_token,
-            refresh_token=user.hh_refresh_token
-        )
+    # Fetch full details from HH if not hydrated yet
+    if vacancy.details_fetched_at is None:
+        client = HHClient.for_user(user, deadline=deadline)
         try:
             details = await client.get_vacancy(vacancy.hh_vacancy_id)
-
-            # Save new tokens if refreshed
-            if client.new_tokens:
-                user.hh_access_token = client.new_tokens.get("access_token")
-                user.hh_refresh_token = client.new_tokens.get("refresh_token")
-
-            vacancy.description = details.get("description")
-            vacancy.requirements = details.get("description")  # Full description
-            vacancy.key_skills = [s.get("name") for s in details.get("key_skills", [])]
-            vacancy.raw_data = details
-
+            apply_vacancy_details(vacancy, details)
             db.commit()
         except Exception:
             pass  # Use cached data if fetch fails
@@ -166,6 +127,7 @@ async def analyze_vacancy(
     vacancy_id: int,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    deadline: Deadline = Depends(get_deadline),
 ):
     """Analyze how well vacancy matches user profile."""
     # Get profile
@@ -184,23 +146,12 @@ async def analyze_vacancy(
             detail="Vacancy not found",
         )
 
-    # Fetch full details if needed
-    if not vacancy.key_skills:
-        client = HHClient(
-            access_token=user.hh_access_token,
-            refresh_token=user.hh_refresh_token
-        )
+    # Fetch full details if not hydrated yet
+    if vacancy.details_fetched_at is None:
+        client = HHClient.for_user(user, deadline=deadline)
         try:
             details = await client.get_vacancy(vacancy.hh_vacancy_id)
-
-            # Save new tokens if refreshed
-            if client.new_tokens:
-                user.hh_access_token = client.new_tokens.get("access_token")
-                user.hh_refresh_token = client.new_tokens.get("refresh_token")
-
-            vacancy.description = details.get("description")
-            vacancy.key_skills = [s.get("name") for s in details.get("key_skills", [])]
-            vacancy.raw_data = details
+            apply_vacancy_details(vacancy, details)
             db.commit()
         except Exception:
             pass
@@ -226,6 +177,7 @@ async def analyze_vacancy(
 async def get_hh_user_info(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    deadline: Deadline = Depends(get_deadline),
 ):
     """Get current user info from HH.ru - raw data for debugging."""
     if not user.hh_access_token:
@@ -234,14 +186,13 @@ async def get_hh_user_info(
             detail="HH.ru не подключён",
         )
 
-    client = HHClient(
-        access_token=user.hh_access_token,
-        refresh_token=user.hh_refresh_token,
-    )
+    client = HHClient.for_user(user, deadline=deadline)
 
     try:
         result = await client.get_me()
         return result
+    except HHUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -256,6 +207,7 @@ async def get_hh_user_info(
 async def get_hh_resumes(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    deadline: Deadline = Depends(get_deadline),
 ):
     """Get user's resumes from HH.ru."""
     if not user.hh_access_token:
@@ -264,10 +216,7 @@ async def get_hh_resumes(
             detail="HH.ru не подключён. Авторизуйтесь в настройках.",
         )
 
-    client = HHClient(
-        access_token=user.hh_access_token,
-        refresh_token=user.hh_refresh_token,
-    )
+    client = HHClient.for_user(user, deadline=deadline)
 
     try:
         # Use safer method with detailed error handling
@@ -287,6 +236,8 @@ async def get_hh_resumes(
 
         return {"resumes": resumes}
 
+    except HHUnavailableError:
+        raise
     except Exception as e:
         error_msg = str(e)
         if "403" in error_msg or "Forbidden" in error_msg:
@@ -305,6 +256,7 @@ async def get_hh_resume(
     resume_id: str,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    deadline: Deadline = Depends(get_deadline),
 ):
     """Get specific resume from HH.ru."""
     if not user.hh_access_token:
@@ -313,22 +265,15 @@ async def get_hh_resume(
             detail="HH.ru not connected. Please authorize first.",
         )
 
-    client = HHClient(
-        access_token=user.hh_access_token,
-        refresh_token=user.hh_refresh_token,
-    )
+    client = HHClient.for_user(user, deadline=deadline)
 
     try:
         resume = await client.get_resume(resume_id)
 
-        # Save new tokens if refreshed
-        if client.new_tokens:
-            user.hh_access_token = client.new_tokens.get("access_token")
-            user.hh_refresh_token = client.new_tokens.get("refresh_token")
-            db.commit()
-
         return resume
 
+    except HHUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -348,6 +293,7 @@ async def import_hh_resume(
     resume_id: str,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    deadline: Deadline = Depends(get_deadline),
 ):
     """Import resume from HH.ru as base resume."""
     if not user.hh_access_token:
@@ -356,19 +302,11 @@ async def import_hh_resume(
             detail="HH.ru not connected. Please authorize first.",
         )
 
-    client = HHClient(
-        access_token=user.hh_access_token,
-        refresh_token=user.hh_refresh_token,
-    )
+    client = HHClient.for_user(user, deadline=deadline)
 
     try:
         hh_resume = await client.get_resume(resume_id)
 
-        # Save new tokens if refreshed
-        if client.new_tokens:
-            user.hh_access_token = client.new_tokens.get("access_token")
-            user.hh_refresh_token = client.new_tokens.get("refresh_token")
-
         # Deactivate old base resumes
         db.query(BaseResume).filter(
             BaseResume.user_id == user.id,
@@ -458,7 +396,7 @@ async def import_hh_resume(
             "title": base_resume.title,
         }
 
-    except HTTPException:
+    except (HTTPException, HHUnavailableError):
         raise
     except Exception as e:
         raise HTTPException(
@@ -19,17 +19,78 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "sqlite:///./data/app.db"
+    database_busy_timeout: float = 5.0  # SQLite: seconds a write waits for another writer's lock
 
     # HH.ru OAuth
     hh_client_id: str = ""
     hh_client_secret: str = ""
     hh_redirect_uri: str = "http://localhost:8000/api/auth/hh/callback"
+    hh_token_refresh_margin: int = 300  # Refresh access token this many seconds before expiry
+    hh_api_url: str = "https://api.hh.ru"  # Point at a local stub for offline runs
+
+    # Record/replay HH API traffic (see app/services/http_cassette.py)
+    hh_cassette_mode: Literal["off", "record", "replay"] = "off"
+    hh_cassette_path: str = "data/hh_cassette.json"
+
+    # Outbound HTTP (shared connection pool for HH.ru / GitHub)
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 5.0
+    http2_enabled: bool = False  # Requires the "h2" package
+
+    # Retries for HH API calls (429/502/503/504, timeouts)
+    hh_retry_attempts: int = 3  # Retries after the first attempt
+    hh_retry_base_delay: float = 0.5
+    hh_retry_max_delay: float = 10.0
+    hh_retry_budget: float = 30.0  # Max total seconds spent sleeping per call
+
+    # Circuit breaker per HH endpoint group and per-request deadline
+    hh_breaker_failure_threshold: int = 5
+    hh_breaker_recovery_timeout: float = 30.0
+    hh_request_deadline: float = 15.0  # seconds, for interactive API routes
+
+    # Max concurrent page requests in bulk vacancy export
+    hh_export_concurrency: int = 5
+
+    # Partitioned export (beyond HH's 2000-results depth limit)
+    hh_partition_concurrency: int = 4  # Slices exported at once
+    hh_partition_max_slices: int = 100
+
+    # Incremental vacancy sync
+    hh_sync_max_pages: int = 5  # Pages per query (slice) and run
+    hh_sync_slice_concurrency: int = 4  # Queries synced at once by an automation run
+    hh_archive_check_age: int = 86400  # Re-check vacancies not seen for this many seconds
+    hh_archive_check_batch: int = 100
+
+    # Bulk vacancy detail fetching
+    hh_hydration_concurrency: int = 5
+    hh_hydration_batch: int = 50  # Vacancies per DB transaction
+
+    # Negotiations (applications) sync
+    hh_negotiations_ttl: int = 600  # seconds before re-syncing from HH
+
+    # HH reference data cache (dictionaries, areas, roles, industries)
+    hh_reference_ttl: int = 86400  # seconds
+    hh_reference_cache_dir: str = "data/hh_reference"
 
     # LLM
     llm_provider: Literal["claude", "openai"] = "claude"
     claude_api_key: str = ""
     openai_api_key: str = ""
     llm_model: str = ""  # If empty, use default for provider
+    llm_analyze_concurrency: int = 4  # Parallel vacancy scoring calls per run
+    llm_max_concurrency: int = 8  # In-flight LLM calls in the process, shared fairly between runs
+
+    # Automation (runs are executed by `python -m app.worker`)
+    automation_max_runs_per_user: int = 3  # E.g. searches for different roles side by side
+    automation_worker_concurrency: int = 2  # Runs per worker process
+    automation_lease_seconds: int = 120  # Run is reclaimed if not renewed for this long
+    automation_heartbeat_interval: int = 30
+    automation_poll_interval: float = 2.0  # Seconds between queue polls when idle
+    automation_max_attempts: int = 3  # Claims per run before it is left interrupted
+    automation_progress_interval: float = 0.5  # Min seconds between progress events of a run
+    automation_stream_poll_interval: float = 0.5  # How often the SSE stream checks for new events
 
     class Config:
         env_file = find_env_file()
@@ -1,10 +1,17 @@
+import asyncio
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.database import init_db
+from app.database import init_db, SessionLocal
+from app.services.http_pool import init_http_client, close_http_client
+from app.services.rate_limiter import load_rate_limits
+from app.services.hh_client import HHClient
+from app.services.hh_reference import hh_reference_cache
+from app.services.hh_resilience import HHUnavailableError
 from app.api import chat, settings as settings_api, auth, profile, vacancies, resumes, automation, search
 
 # Configure logging
@@ -16,10 +23,22 @@ logging.basicConfig(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """Initialize database, shared HTTP pool and reference cache on startup."""
     init_db()
+    with SessionLocal() as db:
+        load_rate_limits(db)
+    await init_http_client()
+
+    # Serve reference data from disk immediately, refresh stale parts in background
+    hh_reference_cache.load()
+    warm_task = asyncio.create_task(HHClient().warm_reference_cache())
+
     yield
 
+    warm_task.cancel()
+    await hh_reference_cache.close()
+    await close_http_client()
+
 
 app = FastAPI(
     title="Job Search Assistant",
@@ -37,6 +56,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(HHUnavailableError)
+async def hh_unavailable_handler(request: Request, exc: HHUnavailableError):
+    """Fail fast with 503 (circuit open), 504 (deadline exceeded) or 429 (HH rate limit)."""
+    headers = {"Retry-After": str(max(1, round(exc.retry_after)))} if exc.retry_after else None
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)}, headers=headers)
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
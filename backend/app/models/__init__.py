@@ -2,8 +2,10 @@ from app.models.user import User
 from app.models.profile import UserProfile
 from app.models.interview import InterviewSession
 from app.models.resume import BaseResume, ResumeVariation
-from app.models.vacancy import VacancyCache
-from app.models.settings import AppSettings
+from app.models.vacancy import VacancyCache, VacancySyncState
+from app.models.settings import AppSettings, HHRateSlot
+from app.models.negotiation import Negotiation
+from app.models.automation import AutomationRun, AutomationRunEvent, AutomationRunItem
 
 __all__ = [
     "User",
@@ -12,5 +14,11 @@ __all__ = [
     "BaseResume",
     "ResumeVariation",
     "VacancyCache",
+    "VacancySyncState",
     "AppSettings",
+    "HHRateSlot",
+    "Negotiation",
+    "AutomationRun",
+    "AutomationRunItem",
+    "AutomationRunEvent",
 ]
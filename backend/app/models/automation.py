@@ -0,0 +1,101 @@
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text, UniqueConstraint,
+)
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.database import Base
+
+
+class AutomationRun(Base):
+    """One automation pipeline run; status and counters are checkpointed here.
+
+    Doubles as the job queue of app.worker: queued runs are claimed with a
+    lease that the worker renews while it runs them.
+    """
+
+    __tablename__ = "automation_runs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    # queued, running, completed, stopped, error,
+    # interrupted (lease expired automation_max_attempts times)
+    status = Column(String(20), default="queued")
+    phase = Column(String(20), nullable=True)
+    message = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    should_stop = Column(Boolean, default=False)
+
+    config = Column(JSON, nullable=False)  # specializations, cities, auto_apply, max_resumes
+
+    # Worker lease; a running run whose lease expired is claimed again and resumed
+    worker_id = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0)  # Times claimed by a worker
+
+    vacancies_loaded = Column(Integer, default=0)
+    vacancies_total = Column(Integer, default=0)
+    vacancies_analyzed = Column(Integer, default=0)
+    vacancies_duplicates = Column(Integer, default=0)  # Copies of a vacancy in several slices, dropped
+    resumes_generated = Column(Integer, default=0)
+    applications_sent = Column(Integer, default=0)
+    recommendations = Column(JSON, default=list)
+    stages = Column(JSON, default=dict)  # Queue depths/counters at last checkpoint
+    analysis_latency = Column(JSON, default=dict)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    items = relationship("AutomationRunItem", back_populates="run", cascade="all, delete-orphan")
+    events = relationship("AutomationRunEvent", back_populates="run", cascade="all, delete-orphan")
+
+
+class AutomationRunItem(Base):
+    """Progress of one vacancy within a run: the checkpoint resumed from."""
+
+    __tablename__ = "automation_run_items"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(Integer, ForeignKey("automation_runs.id"), nullable=False)
+    vacancy_id = Column(Integer, ForeignKey("vacancies_cache.id"), nullable=False)
+
+    # loaded -> hydrated -> analyzed -> generated -> applied (or ready: apply failed);
+    # archived: found closed while hydrating, dropped; applied also when responded
+    # to elsewhere before a resume was generated
+    state = Column(String(20), default="loaded")
+    match_score = Column(Float, nullable=True)
+    variation_id = Column(Integer, ForeignKey("resume_variations.id"), nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    run = relationship("AutomationRun", back_populates="items")
+
+    __table_args__ = (
+        UniqueConstraint("run_id", "vacancy_id", name="uq_automation_run_items_run_vacancy"),
+        Index("ix_automation_run_items_run_state", "run_id", "state"),
+    )
+
+
+class AutomationRunEvent(Base):
+    """Incremental progress event of a run, streamed to clients over SSE."""
+
+    __tablename__ = "automation_run_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(Integer, ForeignKey("automation_runs.id"), nullable=False)
+    seq = Column(Integer, nullable=False)  # 1, 2, ... per run; the SSE event id
+
+    # phase, progress, recommendation, status
+    type = Column(String(20), nullable=False)
+    data = Column(JSON, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    run = relationship("AutomationRun", back_populates="events")
+
+    __table_args__ = (
+        UniqueConstraint("run_id", "seq", name="uq_automation_run_events_run_seq"),
+    )
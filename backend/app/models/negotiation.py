@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from datetime import datetime
+
+from app.database import Base
+
+
+class Negotiation(Base):
+    """Local copy of a user's HH negotiations (responses to vacancies)."""
+
+    __tablename__ = "negotiations"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    hh_negotiation_id = Column(String(50), nullable=True)  # None until seen on HH
+    hh_vacancy_id = Column(String(50), nullable=False)
+    state = Column(String(50), nullable=True)  # response, invitation, discard, ...
+
+    updated_at = Column(DateTime, nullable=True)  # As reported by HH
+    synced_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_negotiations_user_vacancy", "user_id", "hh_vacancy_id"),
+    )
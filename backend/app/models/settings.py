@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy import Column, DateTime, Float, Integer, String, Text
 from datetime import datetime
 
 from app.database import Base
@@ -10,3 +10,18 @@ class AppSettings(Base):
     key = Column(String(50), primary_key=True)
     value = Column(Text, nullable=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class HHRateSlot(Base):
+    """Shared HH.ru request budget of one endpoint class (see rate_limiter).
+
+    ``tat`` is the time (unix seconds) from which the next request is due;
+    every process reserves its requests by moving it forward.
+    """
+
+    __tablename__ = "hh_rate_slots"
+
+    name = Column(String(20), primary_key=True)
+    rate = Column(Float, nullable=False)  # Requests per second
+    burst = Column(Integer, nullable=False)
+    tat = Column(Float, nullable=False, default=0.0)
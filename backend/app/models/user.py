@@ -13,6 +13,8 @@ class User(Base):
     hh_access_token = Column(Text, nullable=True)
     hh_refresh_token = Column(Text, nullable=True)
     hh_token_expires_at = Column(DateTime, nullable=True)
+    hh_refresh_locked_until = Column(DateTime, nullable=True)  # Token refresh in progress (any process)
+    hh_negotiations_synced_at = Column(DateTime, nullable=True)  # Last full /negotiations sync
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
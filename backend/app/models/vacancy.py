@@ -31,5 +31,27 @@ class VacancyCache(Base):
     raw_data = Column(JSON, nullable=True)  # Full HH API response
     fetched_at = Column(DateTime, default=datetime.utcnow)
 
+    # Sync tracking
+    published_at = Column(DateTime, nullable=True)
+    last_seen_at = Column(DateTime, nullable=True)  # Last time HH listed it as open
+    archived_at = Column(DateTime, nullable=True)
+    details_fetched_at = Column(DateTime, nullable=True)  # Full /vacancies/{id} stored
+
     # Relationships
     resume_variations = relationship("ResumeVariation", back_populates="vacancy")
+
+
+class VacancySyncState(Base):
+    """Watermark of an incremental vacancy search query."""
+
+    __tablename__ = "vacancy_sync_state"
+
+    query_key = Column(String(255), primary_key=True)
+    params = Column(JSON, nullable=True)
+    watermark = Column(DateTime, nullable=True)  # Everything published up to it is synced (UTC)
+    # Set after a sync cut off at max_pages: (watermark, backfill_to] is still to be
+    # read, and backfill_watermark becomes the watermark once it is
+    backfill_to = Column(DateTime, nullable=True)
+    backfill_watermark = Column(DateTime, nullable=True)
+    last_found = Column(Integer, nullable=True)
+    last_synced_at = Column(DateTime, nullable=True)
@@ -39,6 +39,7 @@ class VacancyResponse(BaseModel):
     key_skills: list[str]
     match_score: float | None
     fetched_at: datetime
+    details_fetched_at: datetime | None = None
 
     class Config:
         from_attributes = True
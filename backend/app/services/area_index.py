@@ -0,0 +1,157 @@
+"""In-memory index over the HH.ru area tree.
+
+Built once from the cached ``/areas`` tree and rebuilt only when the cache
+returns a new tree. Provides O(1) id lookup, ancestor paths, a flattened
+city list and prefix tries for case-insensitive autocomplete: one over all
+areas and one per country, so a country filter never has to dig past
+entries of other countries that filled a node. Filters by a region match
+its (small) subtree directly.
+"""
+import re
+
+RUSSIA_AREA_ID = "113"
+
+# Each trie node keeps at most this many best-ranked area ids
+TRIE_NODE_CAPACITY = 20
+
+_WORD_SPLIT = re.compile(r"[\s\-()]+")
+
+
+class AreaIndex:
+    """Lookup structures over the HH area tree."""
+
+    def __init__(self, tree: list[dict]):
+        self.nodes: dict[str, dict] = {}  # id -> original tree node (with "areas")
+        self.parent: dict[str, str | None] = {}
+        self.depth: dict[str, int] = {}
+        self.cities: list[str] = []  # Leaf area ids in tree order
+        self.country: dict[str, str] = {}  # id -> root area id (country)
+        self._by_name: dict[str, list[str]] = {}
+        self._keys: dict[str, set[str]] = {}  # id -> lowercased name and its words
+        self._tries: dict[str | None, dict] = {None: {}}  # None: all countries
+
+        stack = [(node, None, 0) for node in reversed(tree)]
+        while stack:
+            node, parent_id, depth = stack.pop()
+            area_id = str(node["id"])
+            self.nodes[area_id] = node
+            self.parent[area_id] = parent_id
+            self.depth[area_id] = depth
+            self.country[area_id] = self.country[parent_id] if parent_id else area_id
+            self._by_name.setdefault(node.get("name", "").lower(), []).append(area_id)
+
+            children = node.get("areas") or []
+            if not children:
+                self.cities.append(area_id)
+            stack.extend((child, area_id, depth + 1) for child in reversed(children))
+
+        for area_id in sorted(self.nodes, key=self._rank):
+            self._index_name(area_id)
+
+    def _rank(self, area_id: str) -> tuple:
+        """Autocomplete order: shallower areas and shorter names first."""
+        name = self.nodes[area_id].get("name", "")
+        return (self.depth[area_id], len(name), name)
+
+    def _index_name(self, area_id: str):
+        """Insert full name and each word of it into the global and the country trie."""
+        name = self.nodes[area_id].get("name", "").lower()
+        keys = self._keys[area_id] = {name} | {word for word in _WORD_SPLIT.split(name) if word}
+        country_trie = self._tries.setdefault(self.country[area_id], {})
+        for trie in (self._tries[None], country_trie):
+            for key in keys:
+                node = trie
+                for char in key:
+                    node = node.setdefault(char, {})
+                    ids = node.setdefault("", [])
+                    if len(ids) < TRIE_NODE_CAPACITY and area_id not in ids:
+                        ids.append(area_id)
+
+    def get(self, area_id: str) -> dict | None:
+        """Get the original tree node (including children)."""
+        return self.nodes.get(str(area_id))
+
+    def ancestors(self, area_id: str) -> list[str]:
+        """Ids from the root country down to the area's parent."""
+        path = []
+        parent_id = self.parent.get(str(area_id))
+        while parent_id is not None:
+            path.append(parent_id)
+            parent_id = self.parent.get(parent_id)
+        return path[::-1]
+
+    def summary(self, area_id: str) -> dict:
+        """Compact area description with its ancestor path."""
+        node = self.nodes[area_id]
+        return {
+            "id": area_id,
+            "name": node.get("name"),
+            "parent_id": self.parent.get(area_id),
+            "is_city": not node.get("areas"),
+            "path": [
+                {"id": ancestor_id, "name": self.nodes[ancestor_id].get("name")}
+                for ancestor_id in self.ancestors(area_id)
+            ],
+        }
+
+    def is_within(self, area_id: str, root_id: str) -> bool:
+        """Check whether area is root_id or one of its descendants."""
+        return area_id == root_id or root_id in self.ancestors(area_id)
+
+    def list_cities(self, country_id: str | None = None) -> list[str]:
+        """Leaf area ids, optionally limited to one country."""
+        if country_id is None:
+            return list(self.cities)
+        return [area_id for area_id in self.cities if self.is_within(area_id, country_id)]
+
+    def autocomplete(self, prefix: str, limit: int = 10, country_id: str | None = None) -> list[str]:
+        """Area ids whose name (or a word of it) starts with prefix.
+
+        ``country_id`` picks that country's trie. An area below country level
+        (a region) is small enough to be matched directly, all of it.
+        """
+        prefix = prefix.strip().lower()
+        country_id = str(country_id) if country_id is not None else None
+        if country_id is not None and country_id not in self.country:
+            return []
+        if country_id is not None and self.country[country_id] != country_id:
+            return self._match_within(prefix, country_id)[:limit]
+
+        node = self._tries.get(country_id, {})
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        return node.get("", [])[:limit]
+
+    def _match_within(self, prefix: str, root_id: str) -> list[str]:
+        """Ids in the subtree of root_id whose name (or a word of it) starts with prefix, ranked."""
+        matches = []
+        stack = [self.nodes[root_id]]
+        while stack:
+            node = stack.pop()
+            area_id = str(node["id"])
+            if any(key.startswith(prefix) for key in self._keys[area_id]):
+                matches.append(area_id)
+            stack.extend(node.get("areas") or [])
+        return sorted(matches, key=self._rank)
+
+    def resolve_city(self, name: str, country_id: str | None = RUSSIA_AREA_ID) -> str | None:
+        """Find area id by exact (case-insensitive) name."""
+        candidates = self._by_name.get(name.strip().lower(), [])
+        if country_id is not None:
+            candidates = [area_id for area_id in candidates if self.is_within(area_id, country_id)]
+        return min(candidates, key=self._rank) if candidates else None
+
+
+_index: AreaIndex | None = None
+_index_source: list | None = None
+
+
+def get_area_index(tree: list[dict]) -> AreaIndex:
+    """Get index for the given tree, rebuilding only if the tree changed."""
+    global _index, _index_source
+    if _index is None or _index_source is not tree:
+        _index = AreaIndex(tree)
+        _index_source = tree
+    return _index
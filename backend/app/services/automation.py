@@ -1,334 +1,618 @@
-"""Automation service for job search pipeline."""
+"""Automation service for job search pipeline.
+
+Runs live in the automation_runs table; status is read from there and every
+vacancy a run touches is checkpointed in automation_run_items, so a run cut
+short by a restart can be resumed without repeating LLM calls. Runs are
+executed by worker processes (app.worker), not by the API.
+"""
 import asyncio
 import logging
+import time
+from datetime import datetime
 from typing import Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.models import User, UserProfile, VacancyCache, BaseResume, ResumeVariation
+from app.config import settings
+from app.database import SessionLocal
+from app.models import (
+    AutomationRun,
+    AutomationRunEvent,
+    AutomationRunItem,
+    BaseResume,
+    ResumeVariation,
+    User,
+    UserProfile,
+    VacancyCache,
+)
+from app.services.fair_share import share_key
 from app.services.hh_client import HHClient
+from app.services.negotiation_sync import (
+    applied_vacancy_ids,
+    not_applied,
+    record_application,
+    sync_negotiations,
+)
+from app.services.pipeline import Pipeline, Stage
 from app.services.vacancy_analyzer import VacancyAnalyzer
+from app.services.vacancy_hydration import hydrate_vacancies
+from app.services.vacancy_sync import VacancySync
 from app.services.resume_generator import ResumeGenerator
 from app.services.cover_letter import CoverLetterService
 
 logger = logging.getLogger(__name__)
 
-# Global status dict for tracking automation progress
-automation_status = {
-    "status": "idle",
-    "phase": None,
-    "message": "",
-    "vacancies_loaded": 0,
-    "vacancies_total": 0,
-    "vacancies_analyzed": 0,
-    "resumes_generated": 0,
-    "applications_sent": 0,
-    "recommendations": [],
-    "error": None,
-    "should_stop": False,
-}
+# Max vacancies analyzed (and hydrated beforehand) per run
+ANALYZE_LIMIT = 200
 
+# Items waiting between pipeline stages
+STAGE_QUEUE_SIZE = 20
 
-def reset_status():
-    """Reset automation status."""
-    automation_status.update({
-        "status": "idle",
-        "phase": None,
-        "message": "",
-        "vacancies_loaded": 0,
-        "vacancies_total": 0,
-        "vacancies_analyzed": 0,
-        "resumes_generated": 0,
-        "applications_sent": 0,
-        "recommendations": [],
-        "error": None,
-        "should_stop": False,
-    })
+# Status phase once the previous step ("source" is the loader) has finished
+NEXT_PHASE = {
+    "source": "hydrating",
+    "hydrating": "analyzing",
+    "analyzing": "generating",
+    "generating": "applying",
+}
+
+# Run columns mirrored in AutomationService.status and saved at each checkpoint
+RUN_FIELDS = (
+    "status",
+    "phase",
+    "message",
+    "vacancies_loaded",
+    "vacancies_total",
+    "vacancies_duplicates",
+    "vacancies_analyzed",
+    "resumes_generated",
+    "applications_sent",
+    "recommendations",
+    "stages",
+    "analysis_latency",
+    "error",
+)
+
+# Counters sent in "progress" events (the rest of the status is in /status)
+PROGRESS_FIELDS = (
+    "message",
+    "vacancies_loaded",
+    "vacancies_total",
+    "vacancies_duplicates",
+    "vacancies_analyzed",
+    "resumes_generated",
+    "applications_sent",
+)
+
+# Runs that can be picked up again from their checkpoints
+RESUMABLE = ("interrupted", "error", "stopped")
+
+
+def run_status(run: Optional[AutomationRun]) -> dict:
+    """Status of a run as served by the API (idle if there is none)."""
+    if run is None:
+        return {
+            "run_id": None,
+            "status": "idle",
+            "phase": None,
+            "message": "",
+            "vacancies_loaded": 0,
+            "vacancies_total": 0,
+            "vacancies_duplicates": 0,
+            "vacancies_analyzed": 0,
+            "resumes_generated": 0,
+            "applications_sent": 0,
+            "recommendations": [],
+            "stages": {},
+            "analysis_latency": {},
+            "error": None,
+        }
+    status = {"run_id": run.id}
+    for field in RUN_FIELDS:
+        status[field] = getattr(run, field)
+    status["message"] = status["message"] or ""
+    status["vacancies_duplicates"] = status["vacancies_duplicates"] or 0  # Runs from before the column
+    status["recommendations"] = list(status["recommendations"] or [])
+    status["stages"] = dict(status["stages"] or {})
+    status["analysis_latency"] = dict(status["analysis_latency"] or {})
+    return status
+
+
+def latest_run(db: Session, user_id: int) -> Optional[AutomationRun]:
+    return (
+        db.query(AutomationRun)
+        .filter(AutomationRun.user_id == user_id)
+        .order_by(AutomationRun.id.desc())
+        .first()
+    )
+
+
+async def execute_run(run_id: int):
+    """Run (or resume) an automation run in a session of its own (see app.worker)."""
+    db = SessionLocal()
+    try:
+        run = db.get(AutomationRun, run_id)
+        if run is None:
+            logger.error(f"Automation run {run_id} not found")
+            return
+        user = db.get(User, run.user_id)
+        await AutomationService(db, user, run).run()
+    finally:
+        db.close()
 
 
 class AutomationService:
     """Service for automated job search pipeline."""
 
-    def __init__(self, db: Session, user: User):
+    def __init__(self, db: Session, user: User, run: AutomationRun):
         self.db = db
         self.user = user
-        self.hh_client = HHClient(
-            access_token=user.hh_access_token,
-            refresh_token=user.hh_refresh_token,
+        self.run_id = run.id
+        self.config = run.config
+        # Working copy of the run row, written back by _checkpoint()
+        self.status = run_status(run)
+        self.status["should_stop"] = bool(run.should_stop)
+        # Events continue the run's sequence when a run is resumed
+        self._event_seq = (
+            db.query(func.max(AutomationRunEvent.seq)).filter(AutomationRunEvent.run_id == run.id).scalar() or 0
         )
+        self._emitted: dict = {}
+        self._progress_at = 0.0
+        self.hh_client = HHClient.for_user(user)
         self.vacancy_analyzer = VacancyAnalyzer(db)
         self.resume_generator = ResumeGenerator(db)
         self.cover_letter_service = CoverLetterService(db)
 
-    async def run(
-        self,
-        specializations: list[str],
-        cities: list[str],
-        auto_apply: bool = True,
-        max_resumes: int = 20,
-    ):
-        """Run the full automation pipeline."""
-        reset_status()
-        automation_status["status"] = "running"
+    async def run(self):
+        """Run the automation pipeline, continuing from the run's checkpoints.
+
+        Stages overlap: a vacancy goes to hydration and LLM scoring as soon as
+        it is saved, to resume generation as soon as it scores >= 60 and then
+        to applying. Stages are linked by bounded queues, so a slow stage
+        holds back the ones before it instead of piling up work.
 
+        Every vacancy of the run has an AutomationRunItem whose state is
+        saved after each stage; on resume, items continue from that state
+        and finished items (scores, resumes) are not redone.
+
+        HH requests and LLM calls are made under the run's share key, so
+        concurrent runs (of one user or of several) get turns round-robin.
+        """
+        share = share_key.set(f"run:{self.run_id}")
         try:
-            # Phase 1: Load vacancies
-            await self._load_vacancies(specializations, cities)
-            if automation_status["should_stop"]:
-                return
+            await self._run()
+        finally:
+            share_key.reset(share)
 
-            # Phase 2: Analyze vacancies with LLM
-            await self._analyze_vacancies()
-            if automation_status["should_stop"]:
-                return
+    async def _run(self):
+        specializations = self.config.get("specializations", [])
+        cities = self.config.get("cities", [])
+        auto_apply = self.config.get("auto_apply", True)
 
-            # Phase 3: Generate resumes for top matches
-            await self._generate_resumes(max_resumes)
-            if automation_status["should_stop"]:
-                return
+        self.status.update({"status": "running", "phase": "loading", "error": None})
+        self._checkpoint()
 
-            # Phase 4: Auto-apply if enabled
+        try:
+            self.profile = self.db.query(UserProfile).filter(UserProfile.user_id == self.user.id).first()
+            if not self.profile:
+                raise ValueError("User profile not found")
+            self.max_resumes = self.config.get("max_resumes", 20)
+            self._base_resume = None
+            self._latencies: list[float] = []
+
+            resumed = self.db.query(AutomationRunItem).filter(AutomationRunItem.run_id == self.run_id).all()
+            self._enqueued: set[int] = {item.vacancy_id for item in resumed}
+            if resumed:
+                logger.info(f"Resuming automation run {self.run_id} with {len(resumed)} items")
+
+            # Skip vacancies already applied to, here or on hh.ru
+            await self._sync_negotiations()
+            self._applied = applied_vacancy_ids(self.db, self.user.id)
+
+            stages = [
+                Stage(
+                    "hydrating",
+                    self._hydrate_vacancy,
+                    workers=settings.hh_hydration_concurrency,
+                    maxsize=STAGE_QUEUE_SIZE,
+                ),
+                Stage(
+                    "analyzing",
+                    self._analyze_vacancy,
+                    workers=settings.llm_analyze_concurrency,
+                    maxsize=STAGE_QUEUE_SIZE,
+                ),
+                Stage("generating", self._generate_resume, maxsize=STAGE_QUEUE_SIZE),
+            ]
             if auto_apply:
-                await self._auto_apply()
+                stages.append(Stage("applying", self._apply, maxsize=STAGE_QUEUE_SIZE))
+            pipeline = Pipeline(*stages)
+            self.status["stages"] = pipeline.snapshot()
+
+            async def source(first_stage: Stage):
+                # Leftovers of this run and earlier ones go straight to the later stages
+                leftovers = asyncio.create_task(self._feed_leftovers(pipeline, auto_apply, resumed))
+                for item in resumed:
+                    if item.state in ("loaded", "hydrated"):
+                        await first_stage.put(item.vacancy_id)
+                await self._load_vacancies(specializations, cities, first_stage)
+                await self._feed_backlog(first_stage)
+                await leftovers
+
+            self._open_analyzers(settings.llm_analyze_concurrency)
+            try:
+                await pipeline.run(source, on_finished=self._on_stage_finished)
+            finally:
+                self._close_analyzers()
 
-            automation_status["status"] = "completed"
-            automation_status["message"] = "Автоматизация успешно завершена!"
+            if self.status["should_stop"]:
+                self.status["status"] = "stopped"
+                self.status["message"] = "Автоматизация остановлена"
+            else:
+                self.status["status"] = "completed"
+                self.status["message"] = "Автоматизация успешно завершена!"
 
         except Exception as e:
             logger.error(f"Automation error: {e}", exc_info=True)
-            automation_status["status"] = "error"
-            automation_status["error"] = str(e)
-            automation_status["message"] = f"Ошибка: {str(e)}"
-
-    async def _load_vacancies(self, specializations: list[str], cities: list[str]):
-        """Load vacancies from HH.ru by specializations and cities."""
-        automation_status["phase"] = "loading"
-        automation_status["message"] = "Загрузка вакансий..."
-
-        all_vacancies = []
-
-        for city_id in cities:
-            for spec_id in specializations:
-                if automation_status["should_stop"]:
-                    return
-
-                try:
-                    automation_status["message"] = f"Загрузка: город {city_id}, специализация {spec_id}..."
-
-                    # Search vacancies
-                    result = await self.hh_client.search_vacancies(
-                        text="",  # No text filter, use specialization
-                        area=city_id,
-                        specialization=spec_id,
-                        per_page=100,
-                        page=0,
-                    )
-
-                    vacancies = result.get("items", [])
-                    total = result.get("found", 0)
-
-                    automation_status["vacancies_total"] += min(total, 100)  # Cap at 100 per query
-
-                    # Save vacancies to cache
-                    for vac in vacancies:
-                        await self._save_vacancy(vac)
-                        all_vacancies.append(vac)
-                        automation_status["vacancies_loaded"] += 1
-
-                    # Rate limiting
-                    await asyncio.sleep(0.5)
-
-                except Exception as e:
-                    logger.error(f"Error loading vacancies for {city_id}/{spec_id}: {e}")
-                    continue
-
-        automation_status["message"] = f"Загружено {automation_status['vacancies_loaded']} вакансий"
-        logger.info(f"Loaded {len(all_vacancies)} vacancies")
-
-    async def _save_vacancy(self, vacancy_data: dict):
-        """Save vacancy to database cache."""
-        vacancy_id = str(vacancy_data["id"])
-
-        # Check if already exists
-        existing = self.db.query(VacancyCache).filter(VacancyCache.hh_id == vacancy_id).first()
-        if existing:
-            return existing
-
-        # Extract salary
-        salary = vacancy_data.get("salary") or {}
-
-        # Create vacancy cache entry
-        vacancy = VacancyCache(
-            hh_id=vacancy_id,
-            title=vacancy_data.get("name", ""),
-            company_name=vacancy_data.get("employer", {}).get("name", ""),
-            salary_from=salary.get("from"),
-            salary_to=salary.get("to"),
-            salary_currency=salary.get("currency", "RUR"),
-            requirements=vacancy_data.get("snippet", {}).get("requirement", ""),
-            description=vacancy_data.get("snippet", {}).get("responsibility", ""),
-            url=vacancy_data.get("alternate_url", ""),
-            key_skills=[],  # Will be filled during analysis
-            raw_data=vacancy_data,
+            self.db.rollback()
+            self.status["status"] = "error"
+            self.status["error"] = str(e)
+            self.status["message"] = f"Ошибка: {str(e)}"
+
+        self._checkpoint(final=True, finished_at=datetime.utcnow(), lease_expires_at=None)
+
+    def _checkpoint(self, final: bool = False, **extra):
+        """Save status to the run row and pick up a stop request made through the API."""
+        stop = self.db.query(AutomationRun.should_stop).filter(AutomationRun.id == self.run_id).scalar()
+        if stop:
+            self.status["should_stop"] = True
+        self._emit_changes(force=final)
+        values = {field: self.status[field] for field in RUN_FIELDS}
+        values["updated_at"] = datetime.utcnow()
+        values.update(extra)
+        self.db.query(AutomationRun).filter(AutomationRun.id == self.run_id).update(
+            values, synchronize_session=False
         )
-
-        self.db.add(vacancy)
         self.db.commit()
-        return vacancy
-
-    async def _analyze_vacancies(self):
-        """Analyze vacancies with LLM to find best matches."""
-        automation_status["phase"] = "analyzing"
-        automation_status["message"] = "Анализ вакансий с помощью LLM..."
 
-        # Get user profile
-        profile = self.db.query(UserProfile).filter(UserProfile.user_id == self.user.id).first()
-        if not profile:
-            raise ValueError("User profile not found")
-
-        # Get all unanalyzed vacancies
-        vacancies = self.db.query(VacancyCache).filter(
-            VacancyCache.match_score == None
-        ).limit(200).all()
-
-        recommendations = []
+    def _track(self, vacancy_id: int, state: str, **fields):
+        """Record that a vacancy reached ``state`` in this run, and checkpoint."""
+        item = self.db.query(AutomationRunItem).filter(
+            AutomationRunItem.run_id == self.run_id,
+            AutomationRunItem.vacancy_id == vacancy_id,
+        ).first()
+        if item is None:
+            item = AutomationRunItem(run_id=self.run_id, vacancy_id=vacancy_id)
+            self.db.add(item)
+        item.state = state
+        for name, value in fields.items():
+            setattr(item, name, value)
+        self._checkpoint()
+
+    def _emit(self, kind: str, data: dict):
+        """Add a progress event; it is committed with the next checkpoint."""
+        self._event_seq += 1
+        self.db.add(AutomationRunEvent(run_id=self.run_id, seq=self._event_seq, type=kind, data=data))
+
+    def _emit_changes(self, force: bool = False):
+        """Events for what changed since the last checkpoint; counters at most every progress interval."""
+        progress = {field: self.status[field] for field in PROGRESS_FIELDS}
+        now = time.monotonic()
+        if progress != self._emitted.get("progress") and (
+            force or now - self._progress_at >= settings.automation_progress_interval
+        ):
+            self._emitted["progress"] = progress
+            self._progress_at = now
+            self._emit("progress", progress)
+
+        if self.status["phase"] != self._emitted.get("phase"):
+            self._emitted["phase"] = self.status["phase"]
+            self._emit("phase", {"phase": self.status["phase"]})
+
+        if self.status["status"] != self._emitted.get("status"):
+            self._emitted["status"] = self.status["status"]
+            self._emit("status", {"status": self.status["status"], "error": self.status["error"]})
+
+    def _on_stage_finished(self, name: str):
+        if name in NEXT_PHASE:
+            self.status["phase"] = NEXT_PHASE[name]
+            self._checkpoint()
+        logger.info(f"Automation stage {name} finished: {self.status['stages'].get(name)}")
+
+    async def _sync_negotiations(self):
+        """Refresh the local copy of the user's HH negotiations."""
+        self.status["message"] = "Загрузка откликов..."
+        try:
+            await sync_negotiations(self.db, self.hh_client, self.user.id)
+        except Exception as e:
+            # Fall back to what is already stored locally
+            logger.warning(f"Negotiations sync failed: {e}")
+
+    def _to_analyze(self):
+        """Query of open, not yet applied vacancies without a match score."""
+        return self.db.query(VacancyCache.id).filter(
+            VacancyCache.match_score == None,
+            VacancyCache.archived_at == None,
+            not_applied(self.user.id),
+        )
 
-        for vacancy in vacancies:
-            if automation_status["should_stop"]:
+    async def _enqueue(self, stage: Stage, vacancy_ids: list[int]):
+        """Send vacancies to the pipeline, each once and at most ANALYZE_LIMIT per run."""
+        for vacancy_id in vacancy_ids:
+            if len(self._enqueued) >= ANALYZE_LIMIT or self.status["should_stop"]:
                 return
-
-            try:
-                # Analyze match
-                analysis = await self.vacancy_analyzer.analyze_match(profile, vacancy)
-
-                # Update vacancy with analysis
-                vacancy.match_score = analysis.get("match_score", 0)
-                vacancy.match_reasons = analysis.get("reasons", [])
-                vacancy.key_skills = analysis.get("required_skills", [])
-                self.db.commit()
-
-                automation_status["vacancies_analyzed"] += 1
-                automation_status["message"] = f"Проанализировано {automation_status['vacancies_analyzed']} вакансий"
-
-                # Add to recommendations if good match (>60%)
-                if vacancy.match_score >= 60:
-                    recommendations.append({
-                        "vacancy_id": vacancy.hh_id,
-                        "title": vacancy.title,
-                        "company": vacancy.company_name,
-                        "match_score": vacancy.match_score,
-                        "reason": "; ".join(analysis.get("reasons", [])[:2]),
-                    })
-
-                # Rate limiting for LLM
-                await asyncio.sleep(0.2)
-
-            except Exception as e:
-                logger.error(f"Error analyzing vacancy {vacancy.id}: {e}")
+            if vacancy_id in self._enqueued:
                 continue
+            self._enqueued.add(vacancy_id)
+            self._track(vacancy_id, "loaded")
+            await stage.put(vacancy_id)
+
+    async def _load_vacancies(self, specializations: list[str], cities: list[str], stage: Stage):
+        """Sync new vacancies from HH.ru by specializations and cities."""
+        self.status["message"] = "Загрузка вакансий..."
+
+        sync = VacancySync(self.db, self.hh_client)
+
+        async def on_page(vacancy_ids: list[int]):
+            fresh = self._to_analyze().filter(VacancyCache.id.in_(vacancy_ids)).all()
+            await self._enqueue(stage, [vacancy_id for (vacancy_id,) in fresh])
+
+        # Every city x specialization slice; all are loaded concurrently,
+        # busiest first, each only since the previous run of that query
+        slices = [
+            {"area": city_id, "specialization": spec_id}
+            for city_id in cities
+            for spec_id in specializations
+        ]
+        synced = 0
+
+        def on_synced(params: dict, result: dict):
+            nonlocal synced
+            synced += 1
+            self.status["vacancies_total"] += result["found"]
+            self.status["vacancies_loaded"] += result["new"]
+            self.status["vacancies_duplicates"] += result["duplicates"]
+            self.status["message"] = f"Загружено срезов: {synced} из {len(slices)}"
+
+        await sync.sync_all(
+            slices,
+            on_page=on_page,
+            on_synced=on_synced,
+            should_stop=lambda: self.status["should_stop"],
+        )
+        if self.status["should_stop"]:
+            return
 
-        # Sort recommendations by match score
-        recommendations.sort(key=lambda x: x["match_score"], reverse=True)
-        automation_status["recommendations"] = recommendations[:50]  # Top 50
+        self.status["message"] = "Проверка закрытых вакансий..."
+        try:
+            await sync.check_archived()
+        except Exception as e:
+            logger.error(f"Archive check failed: {e}")
 
-        automation_status["message"] = f"Найдено {len(recommendations)} подходящих вакансий"
+        logger.info(
+            f"Loaded {self.status['vacancies_loaded']} new vacancies, "
+            f"dropped {self.status['vacancies_duplicates']} duplicates across slices"
+        )
 
-    async def _generate_resumes(self, max_resumes: int):
-        """Generate tailored resumes for top vacancies."""
-        automation_status["phase"] = "generating"
-        automation_status["message"] = "Генерация резюме..."
+    async def _feed_backlog(self, stage: Stage):
+        """Fill the rest of the run's analysis budget with older unscored vacancies."""
+        if len(self._enqueued) >= ANALYZE_LIMIT:
+            return
+        backlog = (
+            self._to_analyze()
+            .order_by(VacancyCache.published_at.desc().nullslast())
+            .limit(ANALYZE_LIMIT)
+            .all()
+        )
+        await self._enqueue(stage, [vacancy_id for (vacancy_id,) in backlog])
+
+    def _user_variations(self, *columns):
+        """Query over the resume variations of this run's user."""
+        return (
+            self.db.query(*columns)
+            .join(BaseResume, BaseResume.id == ResumeVariation.base_resume_id)
+            .filter(BaseResume.user_id == self.user.id)
+        )
 
-        # Get user profile and base resume
-        profile = self.db.query(UserProfile).filter(UserProfile.user_id == self.user.id).first()
-        base_resume = self.db.query(BaseResume).filter(
-            BaseResume.user_id == self.user.id,
-            BaseResume.is_active == True
+    async def _feed_leftovers(self, pipeline: Pipeline, auto_apply: bool, resumed: list[AutomationRunItem]):
+        """Queue good matches without a resume and unsent drafts.
+
+        Items of a resumed run that were scored or got a resume before the
+        interruption come first, then leftovers of earlier runs.
+        """
+        for item in resumed:
+            if item.state == "analyzed" and (item.match_score or 0) >= 60:
+                await pipeline["generating"].put(item.vacancy_id)
+        if auto_apply:
+            for item in resumed:
+                if item.state == "generated" and item.variation_id:
+                    await pipeline["applying"].put(item.variation_id)
+
+        # Only this user's matches, resumes and drafts: runs of other users share the tables
+        has_variation = self._user_variations(ResumeVariation.vacancy_id).filter(
+            ResumeVariation.vacancy_id != None
+        )
+        scored = (
+            self.db.query(AutomationRunItem.vacancy_id)
+            .join(AutomationRun, AutomationRun.id == AutomationRunItem.run_id)
+            .filter(AutomationRun.user_id == self.user.id, AutomationRunItem.match_score >= 60)
+        )
+        top_vacancies = self.db.query(VacancyCache.id).filter(
+            VacancyCache.match_score >= 60,
+            VacancyCache.archived_at == None,
+            VacancyCache.id.in_(scored),
+            not_applied(self.user.id),
+            VacancyCache.id.not_in(has_variation),
+        ).order_by(VacancyCache.match_score.desc()).limit(self.max_resumes).all()
+        for (vacancy_id,) in top_vacancies:
+            await pipeline["generating"].put(vacancy_id)
+
+        if auto_apply:
+            drafts = self._user_variations(ResumeVariation.id).filter(ResumeVariation.status == "draft").all()
+            for (variation_id,) in drafts:
+                await pipeline["applying"].put(variation_id)
+
+    async def _hydrate_vacancy(self, vacancy_id: int) -> int | None:
+        """Fetch full description and key skills if only the search snippet is stored."""
+        vacancy = self.db.get(VacancyCache, vacancy_id)
+        if vacancy is None or self.status["should_stop"]:
+            return None
+        if vacancy.details_fetched_at is None:
+            await hydrate_vacancies(self.db, self.hh_client, [vacancy])
+        if vacancy.archived_at is not None:
+            # Closed on HH: not worth an LLM call or a resume
+            self._track(vacancy_id, "archived")
+            return None
+        self._track(vacancy_id, "hydrated")
+        return vacancy_id
+
+    def _open_analyzers(self, count: int):
+        """Analyzers for the scoring workers, each with its own DB session."""
+        self._analyzers: asyncio.Queue = asyncio.Queue()
+        for _ in range(count):
+            self._analyzers.put_nowait(
+                VacancyAnalyzer(SessionLocal(), llm=self.vacancy_analyzer.llm)
+            )
+
+    def _close_analyzers(self):
+        while not self._analyzers.empty():
+            self._analyzers.get_nowait().db.close()
+
+    def _record_latency(self, seconds: float):
+        self._latencies.append(seconds)
+        latencies = sorted(self._latencies)
+        self.status["analysis_latency"] = {
+            "count": len(latencies),
+            "avg": round(sum(latencies) / len(latencies), 3),
+            "p95": round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 3),
+            "last": round(seconds, 3),
+        }
+
+    async def _analyze_vacancy(self, vacancy_id: int) -> int | None:
+        """Score a vacancy with the LLM; good matches go on to resume generation."""
+        if self.status["should_stop"]:
+            return None
+
+        analyzer = await self._analyzers.get()
+        try:
+            vacancy = analyzer.db.get(VacancyCache, vacancy_id)
+            if vacancy is None:
+                return None
+            if vacancy.match_score is not None:
+                # Scored before an interruption, but the item was not checkpointed
+                match_score = vacancy.match_score
+                self._track(vacancy_id, "analyzed", match_score=match_score)
+                return vacancy_id if match_score >= 60 else None
+
+            started = time.perf_counter()
+            analysis = await analyzer.analyze_match(self.profile, vacancy)
+            self._record_latency(time.perf_counter() - started)
+
+            if not vacancy.key_skills:
+                vacancy.key_skills = analysis.get("required_skills", [])
+                analyzer.db.commit()
+
+            match_score = analysis.get("match_score", 0)
+            recommendation = {
+                "vacancy_id": vacancy.hh_vacancy_id,
+                "title": vacancy.title,
+                "company": vacancy.company_name,
+                "match_score": match_score,
+                "reason": "; ".join(analysis.get("reasons", [])[:2]),
+            }
+        finally:
+            self._analyzers.put_nowait(analyzer)
+
+        self.status["vacancies_analyzed"] += 1
+        self.status["message"] = f"Проанализировано {self.status['vacancies_analyzed']} вакансий"
+
+        if match_score >= 60:
+            recommendations = self.status["recommendations"]
+            recommendations.append(recommendation)
+            recommendations.sort(key=lambda x: x["match_score"], reverse=True)
+            del recommendations[50:]  # Top 50
+            self._emit("recommendation", recommendation)
+        self._track(vacancy_id, "analyzed", match_score=match_score)
+        return vacancy_id if match_score >= 60 else None
+
+    async def _generate_resume(self, vacancy_id: int) -> int | None:
+        """Generate a tailored resume variation for a good match."""
+        if self.status["should_stop"] or self.status["resumes_generated"] >= self.max_resumes:
+            return None
+
+        vacancy = self.db.get(VacancyCache, vacancy_id)
+        if vacancy is None:
+            return None
+        if vacancy.hh_vacancy_id in self._applied:
+            # Responded to since it was scored (resumed and leftover items)
+            self._track(vacancy_id, "applied")
+            return None
+
+        # Check if variation already exists
+        existing = self._user_variations(ResumeVariation).filter(
+            ResumeVariation.vacancy_id == vacancy.id
         ).first()
-
-        if not base_resume:
+        if existing:
+            # Created before an interruption: checkpoint it and carry on
+            self._track(vacancy_id, "generated", variation_id=existing.id)
+            return existing.id if existing.status == "draft" else None
+
+        if self._base_resume is None:
+            self._base_resume = self.db.query(BaseResume).filter(
+                BaseResume.user_id == self.user.id,
+                BaseResume.is_active == True
+            ).first()
+        if self._base_resume is None:
             # Generate base resume first
-            automation_status["message"] = "Создание базового резюме..."
-            base_resume = await self.resume_generator.generate_base_resume(profile)
-
-        # Get top vacancies by match score
-        top_vacancies = self.db.query(VacancyCache).filter(
-            VacancyCache.match_score >= 60
-        ).order_by(VacancyCache.match_score.desc()).limit(max_resumes).all()
-
-        for vacancy in top_vacancies:
-            if automation_status["should_stop"]:
-                return
-
-            try:
-                # Check if variation already exists
-                existing = self.db.query(ResumeVariation).filter(
-                    ResumeVariation.vacancy_id == vacancy.id
-                ).first()
-
-                if existing:
-                    continue
-
-                automation_status["message"] = f"Создание резюме для {vacancy.company_name}..."
-
-                # Generate variation
-                await self.resume_generator.create_variation(base_resume, vacancy, profile)
-
-                automation_status["resumes_generated"] += 1
-
-                # Rate limiting
-                await asyncio.sleep(0.5)
-
-            except Exception as e:
-                logger.error(f"Error generating resume for vacancy {vacancy.id}: {e}")
-                continue
-
-        automation_status["message"] = f"Создано {automation_status['resumes_generated']} резюме"
-
-    async def _auto_apply(self):
-        """Auto-apply to vacancies."""
-        automation_status["phase"] = "applying"
-        automation_status["message"] = "Отправка откликов..."
-
-        # Get resume variations with draft status
-        variations = self.db.query(ResumeVariation).filter(
-            ResumeVariation.status == "draft"
-        ).all()
-
-        for variation in variations:
-            if automation_status["should_stop"]:
-                return
-
-            try:
-                vacancy = self.db.query(VacancyCache).filter(VacancyCache.id == variation.vacancy_id).first()
-                if not vacancy:
-                    continue
-
-                profile = self.db.query(UserProfile).filter(UserProfile.user_id == self.user.id).first()
-
-                # Generate cover letter
-                automation_status["message"] = f"Генерация сопроводительного письма для {vacancy.company_name}..."
-                cover_letter = await self.cover_letter_service.generate(profile, vacancy)
-
-                # Try to apply via HH.ru API
-                # Note: This requires resume to be published on HH.ru first
-                try:
-                    await self.hh_client.apply_to_vacancy(
-                        vacancy_id=vacancy.hh_id,
-                        resume_id=None,  # Would need HH resume ID
-                        message=cover_letter,
-                    )
-                    variation.status = "applied"
-                    automation_status["applications_sent"] += 1
-                except Exception as apply_error:
-                    logger.warning(f"Could not auto-apply: {apply_error}")
-                    variation.status = "ready"  # Mark as ready for manual apply
-
-                self.db.commit()
-
-                # Rate limiting
-                await asyncio.sleep(1)
-
-            except Exception as e:
-                logger.error(f"Error applying to vacancy: {e}")
-                continue
+            self.status["message"] = "Создание базового резюме..."
+            self._base_resume = await self.resume_generator.generate_base_resume(self.profile)
+
+        self.status["message"] = f"Создание резюме для {vacancy.company_name}..."
+        variation = await self.resume_generator.create_variation(self._base_resume, vacancy, self.profile)
+        self.status["resumes_generated"] += 1
+        self._track(vacancy_id, "generated", variation_id=variation.id)
+        return variation.id
+
+    async def _apply(self, variation_id: int) -> None:
+        """Send a response with a cover letter for a resume variation."""
+        if self.status["should_stop"]:
+            return None
+
+        variation = self._user_variations(ResumeVariation).filter(ResumeVariation.id == variation_id).first()
+        if variation is None or variation.status != "draft":
+            return None
+        vacancy = self.db.get(VacancyCache, variation.vacancy_id) if variation.vacancy_id else None
+        if not vacancy:
+            return None
+
+        if vacancy.hh_vacancy_id in self._applied:
+            # Already responded, don't spend a cover letter on it
+            variation.status = "applied"
+            self.db.commit()
+            self._track(vacancy.id, "applied", variation_id=variation.id)
+            return None
+
+        # Generate cover letter
+        self.status["message"] = f"Генерация сопроводительного письма для {vacancy.company_name}..."
+        cover_letter = await self.cover_letter_service.generate(self.profile, vacancy)
+
+        # Try to apply via HH.ru API
+        # Note: This requires resume to be published on HH.ru first
+        try:
+            await self.hh_client.apply_to_vacancy(
+                vacancy_id=vacancy.hh_vacancy_id,
+                resume_id=None,  # Would need HH resume ID
+                message=cover_letter,
+            )
+            variation.status = "applied"
+            record_application(self.db, self.user.id, vacancy.hh_vacancy_id)
+            self._applied.add(vacancy.hh_vacancy_id)
+            self.status["applications_sent"] += 1
+        except Exception as apply_error:
+            logger.warning(f"Could not auto-apply: {apply_error}")
+            variation.status = "ready"  # Mark as ready for manual apply
 
-        automation_status["message"] = f"Отправлено {automation_status['applications_sent']} откликов"
+        self.db.commit()
+        self.status["message"] = f"Отправлено {self.status['applications_sent']} откликов"
+        self._track(vacancy.id, variation.status, variation_id=variation.id)
+        return None
@@ -0,0 +1,134 @@
+"""Automation run queue on the automation_runs table.
+
+The API enqueues runs; worker processes (app.worker) claim them with a
+lease and renew it with heartbeats. Claims are conditional UPDATEs, so any
+number of workers can poll the same database (SQLite or PostgreSQL) without
+taking the same run twice. A run whose lease expired (worker killed) is
+claimed again and resumes from its checkpoints.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import AutomationRun
+
+logger = logging.getLogger(__name__)
+
+# Runs waiting for or held by a worker
+ACTIVE = ("queued", "running")
+
+
+def _lease_expiry(now: datetime) -> datetime:
+    return now + timedelta(seconds=settings.automation_lease_seconds)
+
+
+def _claimable(now: datetime):
+    return or_(
+        AutomationRun.status == "queued",
+        and_(AutomationRun.status == "running", AutomationRun.lease_expires_at < now),
+    )
+
+
+def enqueue_run(db: Session, run: AutomationRun):
+    """Put a new or resumed run in the queue."""
+    run.status = "queued"
+    run.message = "Ожидание свободного обработчика..."
+    run.should_stop = False
+    run.error = None
+    run.finished_at = None
+    run.worker_id = None
+    run.lease_expires_at = None
+    db.commit()
+
+
+def claim_run(db: Session, worker_id: str) -> Optional[int]:
+    """Take the oldest queued (or abandoned) run. Returns its id, or None."""
+    now = datetime.utcnow()
+
+    # Runs that keep killing their workers are left for a manual resume
+    given_up = (
+        db.query(AutomationRun)
+        .filter(
+            AutomationRun.status == "running",
+            AutomationRun.lease_expires_at < now,
+            AutomationRun.attempts >= settings.automation_max_attempts,
+        )
+        .update(
+            {"status": "interrupted", "message": "Обработчик несколько раз прервался", "worker_id": None},
+            synchronize_session=False,
+        )
+    )
+    if given_up:
+        logger.warning(f"Gave up on {given_up} automation runs after {settings.automation_max_attempts} attempts")
+    db.commit()
+
+    while True:
+        candidate = (
+            db.query(AutomationRun.id, AutomationRun.status)
+            .filter(_claimable(now))
+            .order_by(AutomationRun.id)
+            .first()
+        )
+        if candidate is None:
+            return None
+
+        run_id, previous = candidate
+        claimed = (
+            db.query(AutomationRun)
+            .filter(AutomationRun.id == run_id, _claimable(now))
+            .update(
+                {
+                    "status": "running",
+                    "worker_id": worker_id,
+                    "lease_expires_at": _lease_expiry(now),
+                    "heartbeat_at": now,
+                    "attempts": func.coalesce(AutomationRun.attempts, 0) + 1,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            if previous == "running":
+                logger.warning(f"Reclaimed automation run {run_id} after its lease expired")
+            return run_id
+        # Another worker was faster; try the next one
+
+
+def renew_lease(db: Session, run_id: int, worker_id: str) -> bool:
+    """Heartbeat. False if the run is no longer ours (lease lost or run finished)."""
+    now = datetime.utcnow()
+    renewed = (
+        db.query(AutomationRun)
+        .filter(
+            AutomationRun.id == run_id,
+            AutomationRun.worker_id == worker_id,
+            AutomationRun.status == "running",
+        )
+        .update({"lease_expires_at": _lease_expiry(now), "heartbeat_at": now}, synchronize_session=False)
+    )
+    db.commit()
+    return bool(renewed)
+
+
+def release_run(db: Session, run_id: int, worker_id: str):
+    """Give up a run we are still holding (worker shutdown): expire the lease now.
+
+    A clean shutdown does not count as a failed attempt.
+    """
+    db.query(AutomationRun).filter(
+        AutomationRun.id == run_id,
+        AutomationRun.worker_id == worker_id,
+        AutomationRun.status == "running",
+    ).update(
+        {
+            "lease_expires_at": datetime.utcnow(),
+            "attempts": func.coalesce(AutomationRun.attempts, 1) - 1,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
@@ -0,0 +1,81 @@
+"""Round-robin sharing of limited resources between automation runs.
+
+Waiters are grouped by a share key taken from a context variable. Automation
+runs set it to their run, so when the HH rate budget or the LLM slots are
+contended, turns rotate key by key instead of going first come first served,
+and a run with many workers cannot starve a small one.
+
+Turns are kept per process; the HH budget itself is shared by all processes
+through the database (see rate_limiter).
+"""
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+# Share of everything not running under an automation run (API requests)
+DEFAULT_SHARE = "api"
+
+share_key: ContextVar[str] = ContextVar("share_key", default=DEFAULT_SHARE)
+
+
+class FairSemaphore:
+    """Semaphore granting freed slots round-robin across share keys."""
+
+    def __init__(self, value: int):
+        if value < 1:
+            raise ValueError("Semaphore value must be positive")
+        self.value = value
+        self._waiters: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+        self.granted: dict[str, int] = {}  # Slots handed out per key, for stats
+
+    def waiting(self) -> dict[str, int]:
+        return {key: len(waiters) for key, waiters in self._waiters.items()}
+
+    async def acquire(self, key: str | None = None):
+        key = key or share_key.get()
+        if self.value > 0 and not self._waiters:
+            self.value -= 1
+            self.granted[key] = self.granted.get(key, 0) + 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled: pass it on
+                self.release()
+            else:
+                waiters = self._waiters.get(key)
+                if waiters and future in waiters:
+                    waiters.remove(future)
+                    if not waiters:
+                        del self._waiters[key]
+            raise
+
+    def release(self):
+        self.value += 1
+        self._wake()
+
+    def _wake(self):
+        while self.value > 0 and self._waiters:
+            # Serve the key at the front, then move it to the back of the line
+            key, waiters = self._waiters.popitem(last=False)
+            future = waiters.popleft()
+            if waiters:
+                self._waiters[key] = waiters
+            if future.done():
+                continue
+            self.value -= 1
+            self.granted[key] = self.granted.get(key, 0) + 1
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, key: str | None = None):
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
@@ -1,8 +1,9 @@
 """GitHub profile analyzer for extracting skills."""
 import logging
-import httpx
 from collections import Counter
 
+from app.services.http_pool import get_http_client
+
 logger = logging.getLogger(__name__)
 
 # Language to skill mapping
@@ -74,146 +75,146 @@ class GitHubAnalyzer:
 
     async def analyze(self, username: str) -> dict:
         """Analyze a GitHub profile."""
-        async with httpx.AsyncClient() as client:
-            # Get user info (for authenticated user, use /user endpoint)
-            if self.token:
-                # With token we can get the authenticated user's private info
-                user_response = await client.get(
-                    f"{self.base_url}/user",
-                    headers=self._headers(),
-                )
-            else:
-                user_response = await client.get(
-                    f"{self.base_url}/users/{username}",
-                    headers=self._headers(),
-                )
-
-            if user_response.status_code == 404:
-                raise ValueError(f"GitHub user '{username}' not found")
-
-            if user_response.status_code != 200:
-                raise ValueError(f"GitHub API error: {user_response.status_code}")
-
-            user_data = user_response.json()
-
-            # Get repositories (with token - includes private repos)
-            if self.token:
-                repos_response = await client.get(
-                    f"{self.base_url}/user/repos",
-                    params={"per_page": 100, "sort": "updated", "affiliation": "owner"},
-                    headers=self._headers(),
-                )
-            else:
-                repos_response = await client.get(
-                    f"{self.base_url}/users/{username}/repos",
-                    params={"per_page": 100, "sort": "updated"},
-                    headers=self._headers(),
-                )
-
-            repos = repos_response.json() if repos_response.status_code == 200 else []
-
-            # Count private repos if using token
-            private_repos_count = sum(1 for r in repos if r.get("private", False))
-
-            # Analyze languages
-            languages = Counter()
-            for repo in repos:
-                if repo.get("fork"):
-                    continue  # Skip forks
-                lang = repo.get("language")
-                if lang:
-                    languages[lang] += 1
-
-            # Extract skills from languages
-            skills = set()
-            for lang, count in languages.most_common(10):
-                if lang in LANGUAGE_SKILLS:
-                    skills.update(LANGUAGE_SKILLS[lang])
-
-            # Analyze repo names and descriptions for technologies
-            for repo in repos[:20]:  # Top 20 repos
-                name = repo.get("name", "").lower()
-                desc = (repo.get("description") or "").lower()
-                topics = repo.get("topics", [])
-
-                # Check topics
-                for topic in topics:
-                    topic_lower = topic.lower()
-                    if "react" in topic_lower:
-                        skills.add("React")
-                    elif "vue" in topic_lower:
-                        skills.add("Vue.js")
-                    elif "angular" in topic_lower:
-                        skills.add("Angular")
-                    elif "docker" in topic_lower:
-                        skills.add("Docker")
-                    elif "kubernetes" in topic_lower or "k8s" in topic_lower:
-                        skills.add("Kubernetes")
-                    elif "machine-learning" in topic_lower or "ml" in topic_lower:
-                        skills.add("Machine Learning")
-                    elif "deep-learning" in topic_lower:
-                        skills.add("Deep Learning")
-                    elif "tensorflow" in topic_lower:
-                        skills.add("TensorFlow")
-                    elif "pytorch" in topic_lower:
-                        skills.add("PyTorch")
-                    elif "fastapi" in topic_lower:
-                        skills.add("FastAPI")
-                    elif "django" in topic_lower:
-                        skills.add("Django")
-                    elif "flask" in topic_lower:
-                        skills.add("Flask")
-                    elif "postgres" in topic_lower:
-                        skills.add("PostgreSQL")
-                    elif "mongodb" in topic_lower:
-                        skills.add("MongoDB")
-                    elif "redis" in topic_lower:
-                        skills.add("Redis")
-                    elif "graphql" in topic_lower:
-                        skills.add("GraphQL")
-                    elif "rest" in topic_lower or "api" in topic_lower:
-                        skills.add("REST API")
-
-                # Check description keywords
-                tech_keywords = {
-                    "machine learning": "Machine Learning",
-                    "deep learning": "Deep Learning",
-                    "neural network": "Neural Networks",
-                    "nlp": "NLP",
-                    "computer vision": "Computer Vision",
-                    "data science": "Data Science",
-                    "data analysis": "Data Analysis",
-                    "api": "REST API",
-                    "microservice": "Microservices",
-                    "serverless": "Serverless",
-                    "aws": "AWS",
-                    "gcp": "Google Cloud",
-                    "azure": "Azure",
-                    "ci/cd": "CI/CD",
-                    "devops": "DevOps",
-                }
-
-                for keyword, skill in tech_keywords.items():
-                    if keyword in desc:
-                        skills.add(skill)
-
-            # Add general skills
-            if len(repos) > 0:
-                skills.add("Git")
-                skills.add("GitHub")
-
-            if len(repos) > 10:
-                skills.add("Version Control")
-
-            return {
-                "username": user_data.get("login", username),
-                "name": user_data.get("name") or username,
-                "bio": user_data.get("bio"),
-                "public_repos": user_data.get("public_repos", 0),
-                "private_repos_analyzed": private_repos_count,
-                "followers": user_data.get("followers", 0),
-                "languages": [lang for lang, _ in languages.most_common(10)],
-                "skills": sorted(list(skills)),
-                "repos_analyzed": len(repos),
-                "has_token": bool(self.token),
+        client = get_http_client()
+        # Get user info (for authenticated user, use /user endpoint)
+        if self.token:
+            # With token we can get the authenticated user's private info
+            user_response = await client.get(
+                f"{self.base_url}/user",
+                headers=self._headers(),
+            )
+        else:
+            user_response = await client.get(
+                f"{self.base_url}/users/{username}",
+                headers=self._headers(),
+            )
+
+        if user_response.status_code == 404:
+            raise ValueError(f"GitHub user '{username}' not found")
+
+        if user_response.status_code != 200:
+            raise ValueError(f"GitHub API error: {user_response.status_code}")
+
+        user_data = user_response.json()
+
+        # Get repositories (with token - includes private repos)
+        if self.token:
+            repos_response = await client.get(
+                f"{self.base_url}/user/repos",
+                params={"per_page": 100, "sort": "updated", "affiliation": "owner"},
+                headers=self._headers(),
+            )
+        else:
+            repos_response = await client.get(
+                f"{self.base_url}/users/{username}/repos",
+                params={"per_page": 100, "sort": "updated"},
+                headers=self._headers(),
+            )
+
+        repos = repos_response.json() if repos_response.status_code == 200 else []
+
+        # Count private repos if using token
+        private_repos_count = sum(1 for r in repos if r.get("private", False))
+
+        # Analyze languages
+        languages = Counter()
+        for repo in repos:
+            if repo.get("fork"):
+                continue  # Skip forks
+            lang = repo.get("language")
+            if lang:
+                languages[lang] += 1
+
+        # Extract skills from languages
+        skills = set()
+        for lang, count in languages.most_common(10):
+            if lang in LANGUAGE_SKILLS:
+                skills.update(LANGUAGE_SKILLS[lang])
+
+        # Analyze repo names and descriptions for technologies
+        for repo in repos[:20]:  # Top 20 repos
+            name = repo.get("name", "").lower()
+            desc = (repo.get("description") or "").lower()
+            topics = repo.get("topics", [])
+
+            # Check topics
+            for topic in topics:
+                topic_lower = topic.lower()
+                if "react" in topic_lower:
+                    skills.add("React")
+                elif "vue" in topic_lower:
+                    skills.add("Vue.js")
+                elif "angular" in topic_lower:
+                    skills.add("Angular")
+                elif "docker" in topic_lower:
+                    skills.add("Docker")
+                elif "kubernetes" in topic_lower or "k8s" in topic_lower:
+                    skills.add("Kubernetes")
+                elif "machine-learning" in topic_lower or "ml" in topic_lower:
+                    skills.add("Machine Learning")
+                elif "deep-learning" in topic_lower:
+                    skills.add("Deep Learning")
+                elif "tensorflow" in topic_lower:
+                    skills.add("TensorFlow")
+                elif "pytorch" in topic_lower:
+                    skills.add("PyTorch")
+                elif "fastapi" in topic_lower:
+                    skills.add("FastAPI")
+                elif "django" in topic_lower:
+                    skills.add("Django")
+                elif "flask" in topic_lower:
+                    skills.add("Flask")
+                elif "postgres" in topic_lower:
+                    skills.add("PostgreSQL")
+                elif "mongodb" in topic_lower:
+                    skills.add("MongoDB")
+                elif "redis" in topic_lower:
+                    skills.add("Redis")
+                elif "graphql" in topic_lower:
+                    skills.add("GraphQL")
+                elif "rest" in topic_lower or "api" in topic_lower:
+                    skills.add("REST API")
+
+            # Check description keywords
+            tech_keywords = {
+                "machine learning": "Machine Learning",
+                "deep learning": "Deep Learning",
+                "neural network": "Neural Networks",
+                "nlp": "NLP",
+                "computer vision": "Computer Vision",
+                "data science": "Data Science",
+                "data analysis": "Data Analysis",
+                "api": "REST API",
+                "microservice": "Microservices",
+                "serverless": "Serverless",
+                "aws": "AWS",
+                "gcp": "Google Cloud",
+                "azure": "Azure",
+                "ci/cd": "CI/CD",
+                "devops": "DevOps",
             }
+
+            for keyword, skill in tech_keywords.items():
+                if keyword in desc:
+                    skills.add(skill)
+
+        # Add general skills
+        if len(repos) > 0:
+            skills.add("Git")
+            skills.add("GitHub")
+
+        if len(repos) > 10:
+            skills.add("Version Control")
+
+        return {
+            "username": user_data.get("login", username),
+            "name": user_data.get("name") or username,
+            "bio": user_data.get("bio"),
+            "public_repos": user_data.get("public_repos", 0),
+            "private_repos_analyzed": private_repos_count,
+            "followers": user_data.get("followers", 0),
+            "languages": [lang for lang, _ in languages.most_common(10)],
+            "skills": sorted(list(skills)),
+            "repos_analyzed": len(repos),
+            "has_token": bool(self.token),
+        }
@@ -1,26 +1,70 @@
+import asyncio
 import httpx
 import logging
-from typing import Any
+import time
+from collections import deque
+from typing import Any, AsyncIterator
 from datetime import datetime, timedelta
 
 from app.config import settings
+from app.services.area_index import AreaIndex, get_area_index
+from app.services.hh_reference import hh_reference_cache
+from app.services.hh_resilience import Deadline, DeadlineExceeded, HHRateLimited, hh_breakers
+from app.services.hh_tokens import load_tokens, refresh_lock, save_tokens
+from app.services.http_pool import get_http_client
+from app.services.rate_limiter import hh_rate_limiter
+from app.services.retry import RetryPolicy
+from app.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Identical concurrent GETs (same endpoint, params and auth scope) share one request
+hh_inflight = SingleFlight()
+
 
 class HHClient:
     """HeadHunter API client."""
 
-    BASE_URL = "https://api.hh.ru"
+    BASE_URL = settings.hh_api_url
     OAUTH_URL = "https://hh.ru/oauth"
 
     # Endpoints that can work without auth
     PUBLIC_ENDPOINTS = ["/vacancies", "/areas", "/dictionaries"]
 
-    def __init__(self, access_token: str | None = None, refresh_token: str | None = None):
+    def __init__(
+        self,
+        access_token: str | None = None,
+        refresh_token: str | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        user_id: int | None = None,
+        token_expires_at: datetime | None = None,
+        deadline: Deadline | None = None,
+    ):
         self.access_token = access_token
         self.refresh_token = refresh_token
-        self.new_tokens = None  # Store refreshed tokens for caller to save
+        self.new_tokens = None  # Last refreshed tokens (already persisted if user_id is set)
+        self.user_id = user_id  # Owner of the tokens, enables central persistence
+        self.token_expires_at = token_expires_at
+        self._http_client = http_client  # Defaults to the shared app-wide pool
+        self.last_export_timings: list[dict] = []  # Per-page timings of the last export started
+        self.retry_policy = RetryPolicy()
+        self.deadline = deadline  # Time budget of the incoming request, if any
+
+    @classmethod
+    def for_user(cls, user, **kwargs) -> "HHClient":
+        """Create client with the user's tokens; refreshed tokens are saved automatically."""
+        return cls(
+            access_token=user.hh_access_token,
+            refresh_token=user.hh_refresh_token,
+            user_id=user.id,
+            token_expires_at=user.hh_token_expires_at,
+            **kwargs,
+        )
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """HTTP client used for requests (shared pool unless overridden)."""
+        return self._http_client or get_http_client()
 
     def get_auth_url(self) -> str:
         """Get OAuth authorization URL."""
@@ -34,52 +78,100 @@ class HHClient:
 
     async def get_resumes_safe(self) -> dict:
         """Get user's resumes with better error handling."""
-        url = f"{self.BASE_URL}/resumes/mine"
-        async with httpx.AsyncClient() as client:
-            headers = self._headers()
-            logger.info(f"Getting resumes with token: {self.access_token[:20] if self.access_token else 'None'}...")
+        await self._ensure_fresh_token()
+        headers = self._headers()
+        logger.info(f"Getting resumes with token: {self.access_token[:20] if self.access_token else 'None'}...")
 
-            response = await client.get(url, headers=headers)
-            logger.info(f"Resumes response: {response.status_code}")
+        response = await self._send("GET", "/resumes/mine", headers)
+        logger.info(f"Resumes response: {response.status_code}")
 
-            if response.status_code == 403:
-                error_data = response.json() if response.text else {}
-                logger.error(f"403 error details: {error_data}")
-                raise Exception(f"Доступ запрещён. Проверьте разрешения приложения HH.ru. Ответ: {error_data}")
+        if response.status_code == 403:
+            error_data = response.json() if response.text else {}
+            logger.error(f"403 error details: {error_data}")
+            raise Exception(f"Доступ запрещён. Проверьте разрешения приложения HH.ru. Ответ: {error_data}")
 
-            response.raise_for_status()
-            return response.json()
+        response.raise_for_status()
+        return response.json()
 
     async def exchange_code(self, code: str) -> dict:
         """Exchange authorization code for tokens."""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.OAUTH_URL}/token",
-                data={
-                    "grant_type": "authorization_code",
-                    "client_id": settings.hh_client_id,
-                    "client_secret": settings.hh_client_secret,
-                    "code": code,
-                    "redirect_uri": settings.hh_redirect_uri,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self.http.post(
+            f"{self.OAUTH_URL}/token",
+            data={
+                "grant_type": "authorization_code",
+                "client_id": settings.hh_client_id,
+                "client_secret": settings.hh_client_secret,
+                "code": code,
+                "redirect_uri": settings.hh_redirect_uri,
+            },
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def refresh_tokens(self, refresh_token: str) -> dict:
         """Refresh access token."""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.OAUTH_URL}/token",
-                data={
-                    "grant_type": "refresh_token",
-                    "refresh_token": refresh_token,
-                    "client_id": settings.hh_client_id,
-                    "client_secret": settings.hh_client_secret,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self.http.post(
+            f"{self.OAUTH_URL}/token",
+            data={
+                "grant_type": "refresh_token",
+                "refresh_token": refresh_token,
+                "client_id": settings.hh_client_id,
+                "client_secret": settings.hh_client_secret,
+            },
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _token_expiring(self) -> bool:
+        """Check if access token expires within the safety margin."""
+        if not self.token_expires_at:
+            return False
+        margin = timedelta(seconds=settings.hh_token_refresh_margin)
+        return datetime.utcnow() + margin >= self.token_expires_at
+
+    async def _ensure_fresh_token(self):
+        """Refresh access token ahead of expiry instead of waiting for a 403."""
+        if self.refresh_token and self._token_expiring():
+            logger.info("HH access token is about to expire, refreshing...")
+            try:
+                await self._refresh_access_token()
+            except Exception as e:
+                logger.warning(f"Proactive token refresh failed: {e}")
+
+    async def _refresh_access_token(self, rejected_token: str | None = None):
+        """Refresh tokens once per user, even with concurrent callers.
+
+        Inside the per-user lock, which holds across processes, the stored
+        tokens are re-read first: if another request or worker already
+        refreshed them (and they are not the token HH just rejected), they are
+        adopted instead of refreshing again.
+        """
+        lock_key = self.user_id if self.user_id is not None else self.refresh_token
+        async with refresh_lock(lock_key):
+            if self.user_id is not None:
+                stored = load_tokens(self.user_id)
+                if (
+                    stored
+                    and stored["access_token"]
+                    and stored["access_token"] != self.access_token
+                    and stored["access_token"] != rejected_token
+                ):
+                    self.access_token = stored["access_token"]
+                    self.refresh_token = stored["refresh_token"]
+                    self.token_expires_at = stored["expires_at"]
+                    if not self._token_expiring():
+                        logger.info("Using HH tokens refreshed by a concurrent request")
+                        return
+
+            self.new_tokens = await self.refresh_tokens(self.refresh_token)
+            self.access_token = self.new_tokens.get("access_token")
+            self.refresh_token = self.new_tokens.get("refresh_token") or self.refresh_token
+            if self.user_id is not None:
+                self.token_expires_at = save_tokens(self.user_id, self.new_tokens)
+            elif self.new_tokens.get("expires_in"):
+                self.token_expires_at = datetime.utcnow() + timedelta(
+                    seconds=self.new_tokens["expires_in"]
+                )
 
     def _headers(self, with_auth: bool = True) -> dict:
         """Get headers for API requests."""
@@ -93,41 +185,139 @@ class HHClient:
         """Check if endpoint is public (works without auth)."""
         return any(endpoint.startswith(pub) for pub in self.PUBLIC_ENDPOINTS)
 
-    async def _request(self, method: str, endpoint: str, require_auth: bool = False, **kwargs) -> Any:
-        """Make API request with automatic retry on auth failure."""
+    async def _send(self, method: str, endpoint: str, headers: dict, **kwargs) -> httpx.Response:
+        """Send HTTP request through the endpoint group's circuit breaker and the
+        shared rate limiter, retrying transient failures within the deadline."""
         url = f"{self.BASE_URL}{endpoint}"
+        deadline = self.deadline
+
+        async def attempt() -> httpx.Response:
+            if deadline:
+                deadline.check()
+            await hh_rate_limiter.acquire(endpoint)
+            if deadline:
+                deadline.check()
+                timeout = min(settings.http_timeout, deadline.remaining())
+                return await self.http.request(method, url, headers=headers, timeout=timeout, **kwargs)
+            return await self.http.request(method, url, headers=headers, **kwargs)
+
+        breaker = hh_breakers.get(hh_rate_limiter.classify(endpoint))
+        breaker.before_call()
+        try:
+            response = await self.retry_policy.run(
+                method, attempt, deadline.remaining if deadline else None
+            )
+        except httpx.TransportError:
+            breaker.record_failure()
+            if deadline and deadline.remaining() <= 0:
+                raise DeadlineExceeded(f"HH.ru did not respond within {deadline.seconds:.0f}s")
+            raise
+        except HHRateLimited:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def _auth_scope(self) -> object:
+        """Identity whose data a request can see (user, token, or anonymous)."""
+        if self.user_id is not None:
+            return ("user", self.user_id)
+        if self.access_token:
+            return ("token", hash(self.access_token))
+        return None
+
+    @staticmethod
+    def _normalize_params(params: dict | None) -> tuple:
+        """Hashable, order-independent form of query params."""
+        if not params:
+            return ()
+        return tuple(sorted(
+            (key, tuple(str(v) for v in value) if isinstance(value, list) else str(value))
+            for key, value in params.items()
+        ))
 
-        async with httpx.AsyncClient() as client:
-            # First attempt with auth if available
-            headers = self._headers()
-            logger.info(f"HH API request: {method} {endpoint}")
-
-            response = await client.request(method, url, headers=headers, **kwargs)
-
-            # If 403 and we have refresh token, try to refresh
-            if response.status_code == 403 and self.refresh_token:
-                logger.info("Got 403, trying to refresh token...")
-                try:
-                    self.new_tokens = await self.refresh_tokens(self.refresh_token)
-                    self.access_token = self.new_tokens.get("access_token")
-                    self.refresh_token = self.new_tokens.get("refresh_token")
-
-                    # Retry with new token
-                    headers = self._headers()
-                    response = await client.request(method, url, headers=headers, **kwargs)
-                    logger.info(f"Retry after refresh: {response.status_code}")
-                except Exception as e:
-                    logger.warning(f"Token refresh failed: {e}")
-
-            # If still 403/400 and this is a public endpoint, try without auth
-            if response.status_code in (403, 400) and self._is_public_endpoint(endpoint):
-                logger.info("Trying public endpoint without auth...")
-                headers = self._headers(with_auth=False)
-                response = await client.request(method, url, headers=headers, **kwargs)
-                logger.info(f"Public request result: {response.status_code}")
-
-            response.raise_for_status()
-            return response.json()
+    async def _request(self, method: str, endpoint: str, require_auth: bool = False, **kwargs) -> Any:
+        """Make API request; concurrent identical GETs are coalesced into one.
+
+        The parsed result is shared between coalesced callers and must not be mutated.
+        The shared call runs under the deadline of the caller that started it: if
+        that one runs out while this caller still has time, the call is issued again.
+        """
+        if method != "GET" or set(kwargs) - {"params"}:
+            return await self._request_uncoalesced(method, endpoint, **kwargs)
+
+        key = (endpoint, self._normalize_params(kwargs.get("params")), self._auth_scope())
+        while True:
+            try:
+                return await hh_inflight.run(
+                    key,
+                    lambda: self._request_uncoalesced(method, endpoint, **kwargs),
+                    timeout=self.deadline.remaining() if self.deadline else None,
+                )
+            except asyncio.TimeoutError:
+                if self.deadline is None:
+                    raise
+                raise DeadlineExceeded(f"HH.ru did not respond within {self.deadline.seconds:.0f}s")
+            except DeadlineExceeded:
+                if self.deadline is not None and self.deadline.remaining() <= 0:
+                    raise
+                logger.info(f"Shared HH request {endpoint} ran out of its caller's time, reissuing")
+
+    async def _request_uncoalesced(self, method: str, endpoint: str, **kwargs) -> Any:
+        """Make API request with automatic retry on auth failure."""
+        await self._ensure_fresh_token()
+
+        # First attempt with auth if available
+        headers = self._headers()
+        logger.info(f"HH API request: {method} {endpoint}")
+
+        response = await self._send(method, endpoint, headers, **kwargs)
+
+        # If 403 and we have refresh token, try to refresh
+        if response.status_code == 403 and self.refresh_token:
+            logger.info("Got 403, trying to refresh token...")
+            try:
+                await self._refresh_access_token(rejected_token=self.access_token)
+
+                # Retry with new token
+                headers = self._headers()
+                response = await self._send(method, endpoint, headers, **kwargs)
+                logger.info(f"Retry after refresh: {response.status_code}")
+            except Exception as e:
+                logger.warning(f"Token refresh failed: {e}")
+
+        # If still 403/400 and this is a public endpoint, try without auth
+        if response.status_code in (403, 400) and self._is_public_endpoint(endpoint):
+            logger.info("Trying public endpoint without auth...")
+            headers = self._headers(with_auth=False)
+            response = await self._send(method, endpoint, headers, **kwargs)
+            logger.info(f"Public request result: {response.status_code}")
+
+        response.raise_for_status()
+        return response.json()
+
+    async def _fetch_reference(self, endpoint: str, etag: str | None = None) -> httpx.Response:
+        """Fetch public reference data, conditionally if an ETag is known."""
+        headers = self._headers(with_auth=False)
+        if etag:
+            headers["If-None-Match"] = etag
+        logger.info(f"HH API request: GET {endpoint} (reference)")
+        return await self._send("GET", endpoint, headers)
+
+    async def get_reference_body(self, endpoint: str) -> bytes:
+        """Get cached raw JSON of a reference endpoint (see REFERENCE_ENDPOINTS)."""
+        return await hh_reference_cache.get_body(endpoint, self._fetch_reference)
+
+    async def warm_reference_cache(self):
+        """Fetch missing or stale reference data into the cache."""
+        await hh_reference_cache.warm(self._fetch_reference)
 
     async def get_me(self) -> dict:
         """Get current user info."""
@@ -143,6 +333,9 @@ class HHClient:
         schedule: str | None = None,
         specialization: str | None = None,
         professional_role: str | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        order_by: str | None = None,
         page: int = 0,
         per_page: int = 20,
     ) -> dict:
@@ -165,6 +358,12 @@ class HHClient:
             params["specialization"] = specialization
         if professional_role:
             params["professional_role"] = professional_role
+        if date_from:
+            params["date_from"] = date_from
+        if date_to:
+            params["date_to"] = date_to
+        if order_by:
+            params["order_by"] = order_by
 
         return await self._request("GET", "/vacancies", params=params)
 
@@ -189,12 +388,16 @@ class HHClient:
         return await self._request("GET", f"/resumes/{resume_id}")
 
     async def get_dictionaries(self) -> dict:
-        """Get HH dictionaries (skills, areas, etc.)."""
-        return await self._request("GET", "/dictionaries")
+        """Get HH dictionaries (skills, areas, etc.). Cached."""
+        return await hh_reference_cache.get("/dictionaries", self._fetch_reference)
 
     async def get_areas(self) -> list:
-        """Get regions/areas list."""
-        return await self._request("GET", "/areas")
+        """Get regions/areas list. Cached."""
+        return await hh_reference_cache.get("/areas", self._fetch_reference)
+
+    async def get_area_index(self) -> AreaIndex:
+        """Get index over the cached areas tree."""
+        return get_area_index(await self.get_areas())
 
     async def apply_to_vacancy(
         self,
@@ -211,17 +414,19 @@ class HHClient:
 
         return await self._request("POST", "/negotiations", json=data)
 
-    async def get_negotiations(self) -> dict:
-        """Get list of user's negotiations (applications)."""
-        return await self._request("GET", "/negotiations")
+    async def get_negotiations(self, page: int = 0, per_page: int = 100) -> dict:
+        """Get a page of user's negotiations (applications)."""
+        return await self._request(
+            "GET", "/negotiations", params={"page": page, "per_page": per_page}
+        )
 
     async def get_professional_roles(self) -> dict:
-        """Get list of professional roles (job categories)."""
-        return await self._request("GET", "/professional_roles")
+        """Get list of professional roles (job categories). Cached."""
+        return await hh_reference_cache.get("/professional_roles", self._fetch_reference)
 
     async def get_industries(self) -> list:
-        """Get list of industries."""
-        return await self._request("GET", "/industries")
+        """Get list of industries. Cached."""
+        return await hh_reference_cache.get("/industries", self._fetch_reference)
 
     async def search_vacancies_full(
         self,
@@ -236,6 +441,8 @@ class HHClient:
         industry: list[str] | str | None = None,
         search_field: list[str] | None = None,
         period: int | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
         order_by: str = "relevance",
         page: int = 0,
         per_page: int = 100,
@@ -286,33 +493,98 @@ class HHClient:
                 params.setdefault("search_field", []).append(sf)
         if period:
             params["period"] = period
+        if date_from:
+            params["date_from"] = date_from
+        if date_to:
+            params["date_to"] = date_to
 
         return await self._request("GET", "/vacancies", params=params)
 
-    async def export_all_vacancies(
+    async def _fetch_export_page(self, page: int, search_params: dict, timings: list[dict]) -> dict:
+        """Fetch one export page and record how long it took."""
+        start = time.perf_counter()
+        result = await self.search_vacancies_full(page=page, per_page=100, **search_params)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        timings.append(
+            {"page": page, "ms": round(elapsed_ms, 1), "items": len(result.get("items", []))}
+        )
+        return result
+
+    async def iter_export_pages(
         self,
         max_pages: int = 20,
+        concurrency: int | None = None,
         **search_params
-    ) -> list[dict]:
-        """Export all vacancies matching search criteria (up to max_pages * 100)."""
-        all_vacancies = []
-        page = 0
-
-        while page < max_pages:
-            result = await self.search_vacancies_full(page=page, per_page=100, **search_params)
-            items = result.get("items", [])
-
-            if not items:
-                break
+    ) -> AsyncIterator[list[dict]]:
+        """Yield export pages (lists of vacancies) in page order as they arrive.
+
+        Page 0 is fetched first to learn the page count, then a sliding window of
+        up to ``concurrency`` pages is kept in flight (on top of the shared rate
+        limiter), so memory stays bounded regardless of ``max_pages``.
+        """
+        # Per export: partitioned exports run several at once on one client
+        timings: list[dict] = []
+        self.last_export_timings = timings
+        if max_pages <= 0:
+            return
+
+        first = await self._fetch_export_page(0, search_params, timings)
+        items = first.get("items", [])
+        if not items:
+            return
+        yield items
+
+        last_page = min(first.get("pages", 0), max_pages)
+        window = concurrency or settings.hh_export_concurrency
+        pending: deque[asyncio.Task] = deque()
+        next_page = 1
+
+        try:
+            while next_page < last_page or pending:
+                while next_page < last_page and len(pending) < window:
+                    pending.append(
+                        asyncio.create_task(self._fetch_export_page(next_page, search_params, timings))
+                    )
+                    next_page += 1
+
+                result = await pending.popleft()
+                items = result.get("items", [])
+                if not items:
+                    break
+                yield items
+        finally:
+            for task in pending:
+                task.cancel()
+
+            timings.sort(key=lambda t: t["page"])
+            total_ms = sum(t["ms"] for t in timings)
+            logger.info(
+                f"Exported {len(timings)} pages "
+                f"(sum of page latencies {total_ms:.0f} ms)"
+            )
 
-            all_vacancies.extend(items)
-            logger.info(f"Loaded page {page + 1}, total: {len(all_vacancies)} vacancies")
+    async def iter_partitioned_pages(
+        self,
+        max_pages: int = 20,
+        **search_params
+    ) -> AsyncIterator[list[dict]]:
+        """Like iter_export_pages, but splits the query to get past HH's 2000-result cap."""
+        from app.services.query_partitioner import QueryPartitioner
 
-            # Check if we have more pages
-            pages = result.get("pages", 0)
-            if page + 1 >= pages:
-                break
+        async for items in QueryPartitioner(self).iter_pages(search_params, max_pages):
+            yield items
 
-            page += 1
+    async def export_all_vacancies(
+        self,
+        max_pages: int = 20,
+        concurrency: int | None = None,
+        **search_params
+    ) -> list[dict]:
+        """Export all vacancies matching search criteria (up to max_pages * 100).
 
+        Pages are fetched concurrently, output order matches page order.
+        """
+        all_vacancies = []
+        async for items in self.iter_export_pages(max_pages, concurrency, **search_params):
+            all_vacancies.extend(items)
         return all_vacancies
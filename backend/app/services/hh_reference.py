@@ -0,0 +1,160 @@
+"""Cache for HH.ru reference data (dictionaries, areas, roles, industries).
+
+Entries are kept in memory as both the raw JSON body (served to the frontend
+as-is) and the parsed object, and persisted to disk so restarts are warm.
+Stale entries are served immediately while a background task revalidates
+them with ``If-None-Match``.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# fetch(endpoint, etag) -> response (200 with body, or 304)
+Fetcher = Callable[[str, str | None], Awaitable[httpx.Response]]
+
+REFERENCE_ENDPOINTS = ("/dictionaries", "/areas", "/professional_roles", "/industries")
+
+
+class HHReferenceCache:
+    """TTL cache with disk persistence and ETag revalidation."""
+
+    def __init__(self, cache_dir: str, ttl: int):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self._entries: dict[str, dict] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+    def _path(self, endpoint: str) -> Path:
+        return self.cache_dir / (endpoint.strip("/").replace("/", "_") + ".json")
+
+    def _is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def load(self):
+        """Load persisted entries from disk (called on startup)."""
+        for endpoint in REFERENCE_ENDPOINTS:
+            path = self._path(endpoint)
+            meta_path = path.with_suffix(".meta.json")
+            if not path.exists() or not meta_path.exists():
+                continue
+            try:
+                body = path.read_bytes()
+                meta = json.loads(meta_path.read_text())
+                self._entries[endpoint] = {
+                    "body": body,
+                    "data": json.loads(body),
+                    "etag": meta.get("etag"),
+                    "fetched_at": meta.get("fetched_at", 0),
+                }
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring broken reference cache for {endpoint}: {e}")
+        logger.info(f"Reference cache loaded: {sorted(self._entries)}")
+
+    def _persist(self, endpoint: str, entry: dict):
+        """Write entry to disk atomically."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(endpoint)
+        meta_path = path.with_suffix(".meta.json")
+        for target, content in (
+            (path, entry["body"]),
+            (meta_path, json.dumps({"etag": entry["etag"], "fetched_at": entry["fetched_at"]}).encode()),
+        ):
+            tmp = target.with_suffix(target.suffix + ".tmp")
+            tmp.write_bytes(content)
+            os.replace(tmp, target)
+
+    async def refresh(self, endpoint: str, fetch: Fetcher) -> dict:
+        """Fetch or revalidate an entry. Keeps the stale entry if HH fails."""
+        lock = self._locks.setdefault(endpoint, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(endpoint)
+            # Another caller may have refreshed while we waited for the lock
+            if entry and self._is_fresh(entry):
+                return entry
+
+            try:
+                response = await fetch(endpoint, entry["etag"] if entry else None)
+                if response.status_code == 304 and entry:
+                    entry = {**entry, "fetched_at": time.time()}
+                    logger.info(f"Reference {endpoint} not modified")
+                else:
+                    response.raise_for_status()
+                    entry = {
+                        "body": response.content,
+                        "data": response.json(),
+                        "etag": response.headers.get("ETag"),
+                        "fetched_at": time.time(),
+                    }
+                    logger.info(f"Reference {endpoint} updated ({len(entry['body'])} bytes)")
+            except Exception as e:
+                if entry:
+                    logger.warning(f"Reference {endpoint} refresh failed, serving stale: {e}")
+                    return entry
+                raise
+
+            self._entries[endpoint] = entry
+            try:
+                await asyncio.to_thread(self._persist, endpoint, entry)
+            except OSError as e:
+                logger.warning(f"Could not persist reference {endpoint}: {e}")
+            return entry
+
+    def _refresh_in_background(self, endpoint: str, fetch: Fetcher):
+        task = self._refreshing.get(endpoint)
+        if task and not task.done():
+            return
+
+        async def run():
+            try:
+                await self.refresh(endpoint, fetch)
+            except Exception as e:
+                logger.warning(f"Background refresh of {endpoint} failed: {e}")
+
+        self._refreshing[endpoint] = asyncio.create_task(run())
+
+    async def get_entry(self, endpoint: str, fetch: Fetcher) -> dict:
+        """Get entry; stale entries are returned at once and refreshed in background."""
+        entry = self._entries.get(endpoint)
+        if entry is None:
+            return await self.refresh(endpoint, fetch)
+        if not self._is_fresh(entry):
+            self._refresh_in_background(endpoint, fetch)
+        return entry
+
+    async def get(self, endpoint: str, fetch: Fetcher) -> Any:
+        """Get parsed data (shared object, do not mutate)."""
+        return (await self.get_entry(endpoint, fetch))["data"]
+
+    async def get_body(self, endpoint: str, fetch: Fetcher) -> bytes:
+        """Get raw JSON body, ready to be sent to the client."""
+        return (await self.get_entry(endpoint, fetch))["body"]
+
+    async def warm(self, fetch: Fetcher):
+        """Refresh every missing or stale reference endpoint."""
+        for endpoint in REFERENCE_ENDPOINTS:
+            entry = self._entries.get(endpoint)
+            if entry is None or not self._is_fresh(entry):
+                try:
+                    await self.refresh(endpoint, fetch)
+                except Exception as e:
+                    logger.warning(f"Could not warm reference {endpoint}: {e}")
+
+    async def close(self):
+        """Cancel pending background refreshes."""
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
+
+
+hh_reference_cache = HHReferenceCache(settings.hh_reference_cache_dir, settings.hh_reference_ttl)
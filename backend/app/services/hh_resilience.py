@@ -0,0 +1,145 @@
+"""Circuit breakers and request deadlines for HH.ru API calls.
+
+When an endpoint group keeps failing, its breaker opens and calls fail
+immediately with ``CircuitOpenError`` instead of piling up connections.
+After ``recovery_timeout`` one probe request is let through (half-open);
+its outcome closes or re-opens the breaker.
+
+A ``Deadline`` is created per API request (see ``app.api.deps.get_deadline``)
+and passed to ``HHClient``, which stops waiting/retrying once it is spent.
+"""
+import logging
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HHUnavailableError(Exception):
+    """HH.ru call was not attempted or abandoned; routes map it to 503/504."""
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(HHUnavailableError):
+    """Breaker for the endpoint group is open."""
+
+    status_code = 503
+
+
+class HHRateLimited(HHUnavailableError):
+    """HH.ru answered 429 and asked to wait longer than the call may."""
+
+    status_code = 429
+
+
+class DeadlineExceeded(HHUnavailableError):
+    """Request deadline ran out before HH answered."""
+
+    status_code = 504
+
+
+class Deadline:
+    """Absolute time budget for one incoming request."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self):
+        """Raise DeadlineExceeded if no time is left."""
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(f"HH.ru did not respond within {self.seconds:.0f}s")
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open probe -> closed."""
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now."""
+        if self.state == "open":
+            waited = time.monotonic() - self.opened_at
+            if waited < self.recovery_timeout:
+                raise CircuitOpenError(
+                    f"HH.ru {self.name} API is unavailable, try again later",
+                    retry_after=self.recovery_timeout - waited,
+                )
+            self.state = "half_open"
+            self._probing = False
+            logger.info(f"Circuit {self.name} half-open, probing")
+
+        if self.state == "half_open":
+            if self._probing:
+                raise CircuitOpenError(
+                    f"HH.ru {self.name} API is recovering, try again later",
+                    retry_after=1.0,
+                )
+            self._probing = True
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info(f"Circuit {self.name} closed")
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self._probing = False
+        if self.state == "half_open":
+            self._open()
+            return
+        self.failures += 1
+        if self.failures >= self.failure_threshold and self.state == "closed":
+            self._open()
+
+    def release(self):
+        """Call ended without a verdict (cancelled, deadline); free the probe slot."""
+        self._probing = False
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        logger.warning(f"Circuit {self.name} opened after {self.failures} failures")
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "failures": self.failures}
+
+
+class CircuitBreakers:
+    """Breaker registry keyed by endpoint group."""
+
+    def __init__(self):
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, group: str) -> CircuitBreaker:
+        breaker = self._breakers.get(group)
+        if breaker is None:
+            breaker = self._breakers[group] = CircuitBreaker(
+                group,
+                settings.hh_breaker_failure_threshold,
+                settings.hh_breaker_recovery_timeout,
+            )
+        return breaker
+
+    def snapshot(self) -> dict:
+        return {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+
+
+hh_breakers = CircuitBreakers()
@@ -0,0 +1,116 @@
+"""Central storage and refresh coordination for HH.ru OAuth tokens.
+
+Refreshes are serialized per user, so concurrent requests never refresh (and
+overwrite each other's tokens) at the same time. HH refresh tokens are single
+use, so this holds across processes too: besides an in-process lock, the
+refresher takes a short lease on the user row (users.hh_refresh_locked_until)
+that the API and every worker respect. Refreshed tokens are saved here in
+their own session instead of by each route handler.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Longer than a refresh round trip; a crashed refresher blocks others at most this long
+REFRESH_LEASE = timedelta(seconds=30)
+REFRESH_POLL_INTERVAL = 0.2
+
+_refresh_locks: dict[object, asyncio.Lock] = {}
+
+
+def get_refresh_lock(key: object) -> asyncio.Lock:
+    """In-process lock guarding token refresh for one user (or one refresh token)."""
+    lock = _refresh_locks.get(key)
+    if lock is None:
+        lock = _refresh_locks[key] = asyncio.Lock()
+    return lock
+
+
+def _take_refresh_lease(user_id: int) -> bool:
+    from app.models import User
+
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        taken = db.execute(
+            update(User)
+            .where(
+                User.id == user_id,
+                or_(User.hh_refresh_locked_until.is_(None), User.hh_refresh_locked_until < now),
+            )
+            .values(hh_refresh_locked_until=now + REFRESH_LEASE)
+        ).rowcount
+        db.commit()
+    return taken == 1
+
+
+def _drop_refresh_lease(user_id: int):
+    from app.models import User
+
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.id == user_id).values(hh_refresh_locked_until=None))
+        db.commit()
+
+
+@asynccontextmanager
+async def refresh_lock(key: object):
+    """Hold the token refresh lock for a user across all processes.
+
+    ``key`` is a user id, or a refresh token for clients without a stored
+    user (those only lock within the process).
+    """
+    async with get_refresh_lock(key):
+        if not isinstance(key, int):
+            yield
+            return
+
+        while not _take_refresh_lease(key):
+            await asyncio.sleep(REFRESH_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            _drop_refresh_lease(key)
+
+
+def load_tokens(user_id: int) -> dict | None:
+    """Read the currently stored tokens of a user."""
+    from app.models import User
+
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return None
+        return {
+            "access_token": user.hh_access_token,
+            "refresh_token": user.hh_refresh_token,
+            "expires_at": user.hh_token_expires_at,
+        }
+
+
+def save_tokens(user_id: int, tokens: dict) -> datetime | None:
+    """Persist tokens returned by HH OAuth. Returns the new expiry time."""
+    from app.models import User
+
+    expires_at = None
+    if tokens.get("expires_in"):
+        expires_at = datetime.utcnow() + timedelta(seconds=tokens["expires_in"])
+
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            logger.warning(f"Cannot save HH tokens: user {user_id} not found")
+            return expires_at
+        user.hh_access_token = tokens.get("access_token")
+        user.hh_refresh_token = tokens.get("refresh_token") or user.hh_refresh_token
+        user.hh_token_expires_at = expires_at
+        user.updated_at = datetime.utcnow()
+        db.commit()
+
+    logger.info(f"Saved refreshed HH tokens for user {user_id}")
+    return expires_at
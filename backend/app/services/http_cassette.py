@@ -0,0 +1,113 @@
+"""Record/replay httpx transport for HH API traffic.
+
+``record`` passes HH requests through to the network and stores every
+response in a JSON cassette; ``replay`` answers them from the cassette
+without touching the network. Requests to other hosts always go through.
+
+Requests are matched on method, path, sorted query and body; the
+Authorization header is ignored. Repeated identical requests are replayed
+in recorded order (the last response is reused once they run out).
+"""
+import json
+import logging
+import os
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Headers that no longer match the stored (decoded) body
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMissError(LookupError):
+    """Replay mode got a request that was never recorded."""
+
+
+def request_key(request: httpx.Request) -> str:
+    query = urlencode(sorted(parse_qsl(request.url.query.decode())))
+    body = request.content.decode("utf-8", errors="replace")
+    return f"{request.method} {request.url.path}?{query} {body}"
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """Records or replays requests to ``base_url``; others use ``inner``."""
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "replay",
+        base_url: str = "https://api.hh.ru",
+        inner: httpx.AsyncBaseTransport | None = None,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.base_url = base_url.rstrip("/")
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self.interactions: list[dict] = []
+        self._by_key: dict[str, list[dict]] = defaultdict(list)
+        self._replayed: dict[str, int] = defaultdict(int)
+
+        if mode == "replay" or os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with open(self.path, encoding="utf-8") as f:
+            self.interactions = json.load(f)["interactions"]
+        self._by_key.clear()
+        for interaction in self.interactions:
+            self._by_key[interaction["key"]].append(interaction["response"])
+        logger.info(f"Cassette {self.path}: {len(self.interactions)} interactions loaded")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"interactions": self.interactions}, f, ensure_ascii=False, indent=1)
+
+    def _handles(self, request: httpx.Request) -> bool:
+        return str(request.url).startswith(self.base_url)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self._handles(request):
+            return await self.inner.handle_async_request(request)
+
+        key = request_key(request)
+        if self.mode == "replay":
+            return self._replay(key, request)
+
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        recorded = {
+            "status": response.status_code,
+            "headers": headers,
+            "body": body.decode("utf-8", errors="replace"),
+        }
+        self.interactions.append({"key": key, "response": recorded})
+        self._by_key[key].append(recorded)
+        return httpx.Response(recorded["status"], headers=headers, content=body, request=request)
+
+    def _replay(self, key: str, request: httpx.Request) -> httpx.Response:
+        responses = self._by_key.get(key)
+        if not responses:
+            raise CassetteMissError(f"No recorded response for {key}")
+        index = min(self._replayed[key], len(responses) - 1)
+        self._replayed[key] += 1
+        recorded = responses[index]
+        return httpx.Response(
+            recorded["status"],
+            headers=recorded["headers"],
+            content=recorded["body"].encode("utf-8"),
+            request=request,
+        )
+
+    async def aclose(self):
+        if self.mode == "record":
+            self.save()
+            logger.info(f"Cassette {self.path}: {len(self.interactions)} interactions saved")
+        await self.inner.aclose()
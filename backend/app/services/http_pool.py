@@ -0,0 +1,101 @@
+"""Shared HTTP connection pool for outbound API calls.
+
+A single ``httpx.AsyncClient`` is created in the FastAPI lifespan and reused by
+``HHClient`` and ``GitHubAnalyzer``, so keep-alive connections (and TLS sessions)
+survive between calls instead of being re-established for every request.
+"""
+import importlib.util
+import logging
+import urllib.request
+
+import httpx
+
+from app.config import settings
+from app.services.http_cassette import CassetteTransport
+
+logger = logging.getLogger(__name__)
+
+_client: httpx.AsyncClient | None = None
+
+
+def _env_proxy(url: str) -> str | None:
+    """Proxy the environment (HTTP(S)_PROXY, NO_PROXY) sets for ``url``."""
+    parsed = httpx.URL(url)
+    if urllib.request.proxy_bypass(parsed.host):
+        return None
+    proxies = urllib.request.getproxies()
+    return proxies.get(parsed.scheme) or proxies.get("all")
+
+
+def create_http_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    """Create a pooled client configured from settings.
+
+    ``transport`` replaces the network transport (tests, benchmarks); with
+    hh_cassette_mode set, HH traffic is recorded or replayed. Otherwise httpx
+    builds the transports itself, so HTTP(S)_PROXY / NO_PROXY are honoured.
+    """
+    http2 = settings.http2_enabled
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 enabled but 'h2' package is not installed, falling back to HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    timeout = httpx.Timeout(settings.http_timeout)
+
+    def cassette(inner: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+        return CassetteTransport(
+            settings.hh_cassette_path,
+            mode=settings.hh_cassette_mode,
+            base_url=settings.hh_api_url,
+            inner=inner,
+        )
+
+    if transport is not None:
+        if settings.hh_cassette_mode != "off":
+            transport = cassette(transport)
+        # The substitute gets all traffic, env proxies would route around it
+        return httpx.AsyncClient(transport=transport, timeout=timeout, trust_env=False)
+
+    mounts = {}
+    if settings.hh_cassette_mode != "off":
+        hh_url = httpx.URL(settings.hh_api_url)
+        inner = httpx.AsyncHTTPTransport(
+            limits=limits, http2=http2, proxy=_env_proxy(settings.hh_api_url)
+        )
+        mounts[f"{hh_url.scheme}://{hh_url.netloc.decode()}"] = cassette(inner)
+    return httpx.AsyncClient(limits=limits, http2=http2, mounts=mounts, timeout=timeout)
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """Create the app-lifetime client (called from lifespan)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+        logger.info(
+            f"HTTP pool ready: max_connections={settings.http_max_connections}, "
+            f"keepalive={settings.http_max_keepalive_connections}, http2={settings.http2_enabled}"
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the app-lifetime client (called on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared client.
+
+    Created lazily when used outside the app lifespan (scripts, workers).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
@@ -2,6 +2,12 @@ from abc import ABC, abstractmethod
 from pydantic import BaseModel
 from typing import Literal
 
+from app.config import settings
+from app.services.fair_share import FairSemaphore
+
+# Process-wide LLM call slots, handed out round-robin per user (see fair_share)
+llm_slots = FairSemaphore(settings.llm_max_concurrency)
+
 
 class LLMMessage(BaseModel):
     role: Literal["system", "user", "assistant"]
@@ -1,7 +1,7 @@
 import json
 from anthropic import AsyncAnthropic
 
-from app.services.llm.base import LLMProvider, LLMMessage
+from app.services.llm.base import LLMProvider, LLMMessage, llm_slots
 
 
 class ClaudeProvider(LLMProvider):
@@ -43,7 +43,8 @@ class ClaudeProvider(LLMProvider):
         if system_message:
             kwargs["system"] = system_message
 
-        response = await self.client.messages.create(**kwargs)
+        async with llm_slots.slot():
+            response = await self.client.messages.create(**kwargs)
         return response.content[0].text
 
     async def chat_json(
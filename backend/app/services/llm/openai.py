@@ -1,7 +1,7 @@
 import json
 from openai import AsyncOpenAI
 
-from app.services.llm.base import LLMProvider, LLMMessage
+from app.services.llm.base import LLMProvider, LLMMessage, llm_slots
 
 
 class OpenAIProvider(LLMProvider):
@@ -25,12 +25,13 @@ class OpenAIProvider(LLMProvider):
         """Send messages to OpenAI and get response."""
         chat_messages = [{"role": msg.role, "content": msg.content} for msg in messages]
 
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=chat_messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        async with llm_slots.slot():
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=chat_messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
 
         return response.choices[0].message.content
 
@@ -43,13 +44,14 @@ class OpenAIProvider(LLMProvider):
         """Send messages to OpenAI and get JSON response."""
         chat_messages = [{"role": msg.role, "content": msg.content} for msg in messages]
 
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=chat_messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"},
-        )
+        async with llm_slots.slot():
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=chat_messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"},
+            )
 
         response_text = response.choices[0].message.content
 
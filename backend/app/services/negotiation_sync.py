@@ -0,0 +1,85 @@
+"""Local cache of a user's HH negotiations.
+
+Automation checks it before analysing, generating resumes or applying, so no
+LLM tokens or HH calls are spent on vacancies the user already responded to
+(in a previous run or by hand on hh.ru).
+"""
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Negotiation, User, VacancyCache
+from app.services.vacancy_store import parse_hh_datetime
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGES = 20
+
+
+async def sync_negotiations(db: Session, client, user_id: int, force: bool = False) -> int:
+    """Page through /negotiations into the local table unless synced recently.
+
+    Returns the number of negotiations fetched (0 if the cache was fresh).
+    """
+    user = db.get(User, user_id)
+    if user is None:
+        return 0
+    last_synced = user.hh_negotiations_synced_at
+    if not force and last_synced and datetime.utcnow() - last_synced < timedelta(seconds=settings.hh_negotiations_ttl):
+        return 0
+
+    items = []
+    for page in range(MAX_PAGES):
+        result = await client.get_negotiations(page=page, per_page=100)
+        items.extend(result.get("items", []))
+        if page + 1 >= result.get("pages", 0):
+            break
+
+    existing = {
+        n.hh_negotiation_id or f"vacancy:{n.hh_vacancy_id}": n
+        for n in db.query(Negotiation).filter(Negotiation.user_id == user_id)
+    }
+    now = datetime.utcnow()
+    for item in items:
+        vacancy_id = str((item.get("vacancy") or {}).get("id") or "")
+        if not vacancy_id:
+            continue
+        negotiation_id = str(item["id"])
+        # Rows recorded locally on apply have no HH id yet
+        negotiation = existing.get(negotiation_id) or existing.pop(f"vacancy:{vacancy_id}", None)
+        if negotiation is None:
+            negotiation = Negotiation(user_id=user_id, hh_vacancy_id=vacancy_id)
+            db.add(negotiation)
+            existing[negotiation_id] = negotiation
+        negotiation.hh_negotiation_id = negotiation_id
+        negotiation.state = (item.get("state") or {}).get("id")
+        negotiation.updated_at = parse_hh_datetime(item.get("updated_at"))
+        negotiation.synced_at = now
+    # Kept on the user, so users without any negotiations are not re-synced every run
+    user.hh_negotiations_synced_at = now
+    db.commit()
+
+    logger.info(f"Synced {len(items)} negotiations for user {user_id}")
+    return len(items)
+
+
+def applied_vacancy_ids(db: Session, user_id: int) -> set[str]:
+    """HH ids of vacancies the user has a negotiation for."""
+    rows = db.query(Negotiation.hh_vacancy_id).filter(Negotiation.user_id == user_id)
+    return {hh_vacancy_id for (hh_vacancy_id,) in rows}
+
+
+def not_applied(user_id: int):
+    """Filter clause: VacancyCache rows the user has no negotiation for."""
+    return ~exists().where(
+        Negotiation.user_id == user_id,
+        Negotiation.hh_vacancy_id == VacancyCache.hh_vacancy_id,
+    )
+
+
+def record_application(db: Session, user_id: int, hh_vacancy_id: str):
+    """Remember an application sent by us until the next sync picks it up. Does not commit."""
+    db.add(Negotiation(user_id=user_id, hh_vacancy_id=hh_vacancy_id, state="response"))
@@ -0,0 +1,115 @@
+"""Minimal staged pipeline over bounded asyncio queues.
+
+Each stage has a bounded input queue and a number of workers. A handler
+returns the item to pass to the next stage (or None to drop it), so items
+flow downstream as soon as they are processed, and a full queue makes the
+upstream stage wait (backpressure).
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+_CLOSED = object()
+
+
+class Stage:
+    """Workers consuming a bounded queue."""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[object], Awaitable[object | None]],
+        workers: int = 1,
+        maxsize: int = 50,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.next: "Stage | None" = None
+        # Live counters, exposed as-is in status
+        self.stats = {"queued": 0, "active": 0, "processed": 0, "failed": 0}
+
+    async def put(self, item):
+        await self.queue.put(item)
+        self.stats["queued"] = self.queue.qsize()
+
+    async def close(self):
+        """No more items will be put; workers exit once the queue is drained."""
+        await self.queue.put(_CLOSED)
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            if item is _CLOSED:
+                # Leave the marker for the other workers
+                self.queue.put_nowait(_CLOSED)
+                return
+            self.stats["queued"] = self.queue.qsize()
+
+            self.stats["active"] += 1
+            try:
+                result = await self.handler(item)
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Stage {self.name} failed on {item!r}: {e}", exc_info=True)
+                continue
+            finally:
+                self.stats["active"] -= 1
+
+            self.stats["processed"] += 1
+            if result is not None and self.next:
+                await self.next.put(result)
+
+    async def run(self):
+        await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        self.stats["queued"] = 0
+        if self.next:
+            await self.next.close()
+
+
+class Pipeline:
+    """Chain of stages fed by a source coroutine."""
+
+    def __init__(self, *stages: Stage):
+        self.stages = {stage.name: stage for stage in stages}
+        self._order = list(stages)
+        for upstream, downstream in zip(self._order, self._order[1:]):
+            upstream.next = downstream
+
+    def __getitem__(self, name: str) -> Stage:
+        return self.stages[name]
+
+    def snapshot(self) -> dict:
+        return {name: stage.stats for name, stage in self.stages.items()}
+
+    async def _feed(self, source: Callable[[Stage], Awaitable[None]]):
+        await source(self._order[0])
+        await self._order[0].close()
+
+    async def run(
+        self,
+        source: Callable[[Stage], Awaitable[None]],
+        on_finished: Callable[[str], None] | None = None,
+    ):
+        """Run until the source is exhausted and every stage is drained.
+
+        ``source`` receives the first stage and puts items into it.
+        ``on_finished`` is called with "source" and then each stage name as
+        they complete, in order.
+        """
+        source_task = asyncio.create_task(self._feed(source))
+        stage_tasks = [asyncio.create_task(stage.run()) for stage in self._order]
+        try:
+            await source_task
+            if on_finished:
+                on_finished("source")
+            for stage, task in zip(self._order, stage_tasks):
+                await task
+                if on_finished:
+                    on_finished(stage.name)
+        finally:
+            for task in (source_task, *stage_tasks):
+                task.cancel()
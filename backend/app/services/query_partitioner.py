@@ -0,0 +1,177 @@
+"""Split broad vacancy searches into slices under HH's depth limit.
+
+HH returns at most 2000 results (20 pages x 100) for any query. The planner
+probes ``found`` for a query and, while it is above the limit, splits it:
+
+1. by area, where that is exact: a list of areas into single areas, no area
+   into countries;
+2. by publication date: the ``date_from``/``date_to`` window is bisected
+   (starting from ``period`` or the last 30 days);
+3. only once the window cannot be bisected further, a single area into its
+   child areas. That misses vacancies attached to the area itself (rather
+   than to one of its cities); their number is logged and kept in
+   ``uncovered``.
+
+Slices are then exported concurrently and deduplicated by vacancy id.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+from app.config import settings
+from app.services.vacancy_store import HH_DATE_FORMAT
+
+logger = logging.getLogger(__name__)
+
+HH_MAX_RESULTS = 2000
+DEFAULT_WINDOW_DAYS = 30
+MIN_WINDOW = timedelta(hours=1)
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, list) else [value]
+
+
+class QueryPartitioner:
+    """Plans and runs partitioned exports for an ``HHClient``."""
+
+    def __init__(self, client, max_slices: int | None = None):
+        self.client = client
+        self.max_slices = max_slices or settings.hh_partition_max_slices
+        self.probes = 0
+        self.uncovered = 0  # Vacancies left out by splits into child areas
+        self._planned = 0
+
+    async def probe(self, params: dict) -> int:
+        """Number of vacancies matching params (a 1-item page request)."""
+        self.probes += 1
+        result = await self.client.search_vacancies_full(page=0, per_page=1, **params)
+        return result.get("found", 0)
+
+    async def _split_by_area(self, params: dict) -> list[dict] | None:
+        """Exact area split: a list of areas into single areas, no area into countries."""
+        areas = _as_list(params.get("area"))
+        if len(areas) > 1:
+            return [{**params, "area": area_id} for area_id in areas]
+        if areas:
+            return None
+
+        index = await self.client.get_area_index()
+        countries = [area_id for area_id, parent in index.parent.items() if parent is None]
+        return [{**params, "area": area_id} for area_id in countries] or None
+
+    async def _split_by_child_area(self, params: dict) -> list[dict] | None:
+        """Split a single area into its child areas (not exact, see module docstring)."""
+        areas = _as_list(params.get("area"))
+        if len(areas) != 1:
+            return None
+        index = await self.client.get_area_index()
+        node = index.get(areas[0]) or {}
+        children = [str(child["id"]) for child in node.get("areas") or []]
+        return [{**params, "area": area_id} for area_id in children] or None
+
+    @staticmethod
+    def _split_by_date(params: dict) -> list[dict] | None:
+        now = datetime.now(timezone.utc)
+        if params.get("date_from"):
+            start = datetime.strptime(params["date_from"], HH_DATE_FORMAT)
+        else:
+            start = now - timedelta(days=params.get("period") or DEFAULT_WINDOW_DAYS)
+        end = datetime.strptime(params["date_to"], HH_DATE_FORMAT) if params.get("date_to") else now
+
+        if end - start < MIN_WINDOW * 2:
+            return None
+
+        middle = start + (end - start) / 2
+        base = {key: value for key, value in params.items() if key != "period"}
+        return [
+            {**base, "date_from": start.strftime(HH_DATE_FORMAT), "date_to": middle.strftime(HH_DATE_FORMAT)},
+            {**base, "date_from": middle.strftime(HH_DATE_FORMAT), "date_to": end.strftime(HH_DATE_FORMAT)},
+        ]
+
+    async def plan(self, params: dict, found: int | None = None) -> list[dict]:
+        """Return search params slices, each (ideally) under HH_MAX_RESULTS."""
+        if found is None:
+            found = await self.probe(params)
+        if found == 0:
+            return []
+        if found <= HH_MAX_RESULTS:
+            return [params]
+
+        children, children_found = None, None
+        if self._planned < self.max_slices:
+            children = await self._split_by_area(params) or self._split_by_date(params)
+            if not children:
+                children = await self._split_by_child_area(params)
+                if children:
+                    children_found = await asyncio.gather(*(self.probe(child) for child in children))
+                    uncovered = found - sum(children_found)
+                    if uncovered > 0:
+                        self.uncovered += uncovered
+                        logger.warning(
+                            f"{uncovered} vacancies attached to area {params['area']} itself "
+                            f"are not covered by its child areas: {params}"
+                        )
+        if not children:
+            logger.warning(f"Cannot split slice further ({found} found), it will be capped: {params}")
+            return [params]
+
+        self._planned += len(children) - 1
+        slices = await asyncio.gather(*(
+            self.plan(child, children_found[i] if children_found else None)
+            for i, child in enumerate(children)
+        ))
+        return [s for group in slices for s in group]
+
+    async def iter_pages(self, params: dict, max_pages: int = 20) -> AsyncIterator[list[dict]]:
+        """Export every slice concurrently, yielding deduplicated pages as they arrive."""
+        slices = await self.plan(params)
+        logger.info(f"Partitioned export: {len(slices)} slices after {self.probes} probes")
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.hh_partition_concurrency * 2)
+        semaphore = asyncio.Semaphore(settings.hh_partition_concurrency)
+        done = object()
+
+        async def export_slice(slice_params: dict):
+            async with semaphore:
+                async for items in self.client.iter_export_pages(max_pages=max_pages, **slice_params):
+                    await queue.put(items)
+
+        async def run_all():
+            try:
+                # TaskGroup cancels the remaining slices if one fails
+                async with asyncio.TaskGroup() as group:
+                    for slice_params in slices:
+                        group.create_task(export_slice(slice_params))
+            except asyncio.CancelledError:
+                # The consumer stopped reading and cancelled us; nobody waits for ``done``
+                raise
+            except BaseException:
+                await queue.put(done)
+                raise
+            await queue.put(done)
+
+        producer = asyncio.create_task(run_all())
+        seen: set[str] = set()
+        duplicates = 0
+        try:
+            while (items := await queue.get()) is not done:
+                fresh = []
+                for vacancy in items:
+                    if vacancy["id"] in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(vacancy["id"])
+                    fresh.append(vacancy)
+                if fresh:
+                    yield fresh
+            await producer  # Re-raise slice errors
+        finally:
+            producer.cancel()
+            logger.info(
+                f"Partitioned export: {len(seen)} unique vacancies, {duplicates} duplicates dropped, "
+                f"{self.uncovered} not covered"
+            )
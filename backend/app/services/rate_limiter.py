@@ -0,0 +1,183 @@
+"""HH.ru API rate limiter shared by every process on the database.
+
+The API and any number of ``app.worker`` processes draw from one budget per
+endpoint class instead of each sleeping on its own. A budget is a row in
+hh_rate_slots run as GCRA: the row holds the time the next request is due,
+and a request reserves its slot with one atomic UPDATE (no lock is held
+while waiting), then sleeps until that slot.
+
+Within a process, waiters take turns round-robin per share key (see
+fair_share) and at most one reservation per bucket is pending at a time, so
+processes alternate on the shared budget and a big run cannot starve
+another's small one. Reservations run in a thread, off the event loop; if
+the row cannot be written (database locked), the bucket paces requests
+in-process at the last known rate until it can.
+"""
+import asyncio
+import logging
+import math
+import time
+
+from sqlalchemy import case, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import HHRateSlot
+from app.services.fair_share import FairSemaphore
+
+logger = logging.getLogger(__name__)
+
+# Requests per second per endpoint class. Overridable via AppSettings keys
+# "hh_rate_<class>" (see load_rate_limits / PUT /api/settings/hh-rate-limits).
+DEFAULT_HH_RATES = {
+    "search": 2.0,
+    "detail": 5.0,
+    "negotiations": 1.0,
+    "resumes": 1.0,
+    "default": 5.0,
+}
+
+
+def _burst(rate: float) -> int:
+    return max(1, math.ceil(rate))
+
+
+def _store_rates(rates: dict[str, float]):
+    """Create or update bucket rows; rows are shared by all processes."""
+    for attempt in range(2):
+        with SessionLocal() as db:
+            for name, rate in rates.items():
+                row = db.get(HHRateSlot, name)
+                if row is None:
+                    db.add(HHRateSlot(name=name, rate=rate, burst=_burst(rate), tat=0.0))
+                else:
+                    row.rate = rate
+                    row.burst = _burst(rate)
+            try:
+                db.commit()
+                return
+            except IntegrityError:
+                # Another process created a row first; update it instead
+                db.rollback()
+    raise RuntimeError(f"Could not store HH rate limits {rates}")
+
+
+class SharedTokenBucket:
+    """Token bucket kept in an hh_rate_slots row: ``rate`` per second, bursts up to ``burst``."""
+
+    def __init__(self, name: str, default_rate: float):
+        self.name = name
+        self.default_rate = default_rate
+        self.rate = default_rate  # As last read from the row
+        self._local_tat = 0.0  # In-process fallback state, same scheme as the row
+        self._turns = FairSemaphore(1)
+
+    def _reserve(self) -> float:
+        """Reserve the next free slot. Returns seconds until it."""
+        now = time.time()
+        # An idle bucket has ``burst`` slots available right away
+        floor = now - (HHRateSlot.burst - 1) / HHRateSlot.rate
+        start = case((HHRateSlot.tat > floor, HHRateSlot.tat), else_=floor)
+        statement = (
+            update(HHRateSlot)
+            .where(HHRateSlot.name == self.name)
+            .values(tat=start + 1.0 / HHRateSlot.rate)
+            .returning(HHRateSlot.tat, HHRateSlot.rate)
+        )
+        with SessionLocal() as db:
+            row = db.execute(statement).first()
+            db.commit()
+        if row is None:
+            _store_rates({self.name: self.default_rate})
+            return self._reserve()
+
+        tat, rate = row
+        self.rate = rate
+        self._local_tat = tat
+        return max(0.0, tat - 1.0 / rate - now)
+
+    def _reserve_locally(self) -> float:
+        """Reserve a slot in this process only, at the last known rate."""
+        now = time.time()
+        start = max(self._local_tat, now - (_burst(self.rate) - 1) / self.rate)
+        self._local_tat = start + 1.0 / self.rate
+        return max(0.0, start - now)
+
+    async def acquire(self) -> float:
+        """Take one slot, sleeping only as long as needed. Returns time waited."""
+        async with self._turns.slot():
+            try:
+                waited = await asyncio.to_thread(self._reserve)
+            except OperationalError as e:
+                logger.warning(f"HH rate slot {self.name} unavailable ({e.orig}), pacing in-process")
+                waited = self._reserve_locally()
+            if waited:
+                await asyncio.sleep(waited)
+            return waited
+
+
+class HHRateLimiter:
+    """Per-endpoint-class shared token buckets for the HH.ru API."""
+
+    def __init__(self, rates: dict[str, float] | None = None):
+        self.buckets = {
+            name: SharedTokenBucket(name, rate) for name, rate in (rates or DEFAULT_HH_RATES).items()
+        }
+
+    @staticmethod
+    def classify(endpoint: str) -> str:
+        """Map an API endpoint to its bucket name."""
+        path = endpoint.split("?", 1)[0].rstrip("/")
+        if path == "/vacancies":
+            return "search"
+        if path.startswith("/vacancies/"):
+            return "detail"
+        if path.startswith("/negotiations"):
+            return "negotiations"
+        if path.startswith("/resumes"):
+            return "resumes"
+        return "default"
+
+    async def acquire(self, endpoint: str) -> float:
+        """Wait for a slot in the endpoint's bucket."""
+        bucket = self.buckets.get(self.classify(endpoint)) or self.buckets["default"]
+        return await bucket.acquire()
+
+    def configure(self, rates: dict[str, float]):
+        """Update rates for known buckets, for every process."""
+        known = {}
+        for name, rate in rates.items():
+            if name not in self.buckets or not rate:
+                continue
+            if rate <= 0:
+                raise ValueError("Rate must be positive")
+            known[name] = rate
+        if known:
+            _store_rates(known)
+
+    def get_rates(self) -> dict[str, float]:
+        with SessionLocal() as db:
+            stored = dict(db.query(HHRateSlot.name, HHRateSlot.rate).all())
+        return {name: stored.get(name, bucket.default_rate) for name, bucket in self.buckets.items()}
+
+
+hh_rate_limiter = HHRateLimiter()
+
+
+def load_rate_limits(db: Session) -> dict[str, float]:
+    """Apply defaults plus rate overrides stored in AppSettings to the shared buckets."""
+    from app.models import AppSettings
+
+    keys = {f"hh_rate_{name}": name for name in DEFAULT_HH_RATES}
+    rows = db.query(AppSettings).filter(AppSettings.key.in_(keys)).all()
+
+    rates = dict(DEFAULT_HH_RATES)
+    for row in rows:
+        try:
+            rates[keys[row.key]] = float(row.value)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring invalid rate limit setting {row.key}={row.value!r}")
+
+    hh_rate_limiter.configure(rates)
+    return hh_rate_limiter.get_rates()
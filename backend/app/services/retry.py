@@ -0,0 +1,134 @@
+"""Retry policy for HH.ru API calls.
+
+Retries 429/502/503/504 and timeouts with decorrelated-jitter backoff,
+honouring ``Retry-After``: never retrying sooner than HH asked, and raising
+``HHRateLimited`` when the wait does not fit the call's limits. Non-idempotent
+requests are only retried when HH did not process them (429 or connection
+failure). Each call has its own budget of attempts and total sleep time.
+"""
+import asyncio
+import logging
+import random
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable
+
+import httpx
+
+from app.config import settings
+from app.services.hh_resilience import HHRateLimited
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Process-wide counters, exposed via /api/settings/hh-client-stats
+retry_stats: Counter = Counter()
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse Retry-After (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Backoff configuration; ``run`` executes one call under a fresh budget."""
+
+    def __init__(
+        self,
+        attempts: int | None = None,
+        base_delay: float | None = None,
+        max_delay: float | None = None,
+        budget: float | None = None,
+    ):
+        self.attempts = settings.hh_retry_attempts if attempts is None else attempts
+        self.base_delay = settings.hh_retry_base_delay if base_delay is None else base_delay
+        self.max_delay = settings.hh_retry_max_delay if max_delay is None else max_delay
+        self.budget = settings.hh_retry_budget if budget is None else budget
+
+    def _next_delay(self, previous: float) -> float:
+        """Decorrelated jitter: uniform(base, previous * 3), capped."""
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+    def _reason(self, method: str, response: httpx.Response | None, error: Exception | None) -> str | None:
+        """Why this outcome should be retried, or None if it should not."""
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        if error is not None:
+            if isinstance(error, httpx.ConnectError | httpx.ConnectTimeout | httpx.PoolTimeout):
+                return "connect"
+            if isinstance(error, httpx.TimeoutException) and idempotent:
+                return "timeout"
+            return None
+        if response.status_code == 429:
+            return "429"
+        if response.status_code in RETRY_STATUSES and idempotent:
+            return str(response.status_code)
+        return None
+
+    async def run(
+        self,
+        method: str,
+        send: Callable[[], Awaitable[httpx.Response]],
+        time_left: Callable[[], float] | None = None,
+    ) -> httpx.Response:
+        """Call ``send`` until it succeeds, is not retryable, or the budget runs out.
+
+        ``time_left`` (e.g. ``Deadline.remaining``) caps how long we may sleep.
+        """
+        delay = self.base_delay
+        slept = 0.0
+        attempt = 0
+
+        while True:
+            response, error = None, None
+            try:
+                response = await send()
+            except httpx.TransportError as e:
+                error = e
+
+            reason = self._reason(method, response, error)
+            if reason is None:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self._next_delay(delay)
+            retry_after = None
+            if response is not None:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    delay = retry_after
+
+            out_of_time = time_left is not None and delay >= time_left()
+            too_long = retry_after is not None and retry_after > self.max_delay
+            if attempt >= self.attempts or slept + delay > self.budget or out_of_time or too_long:
+                retry_stats["gave_up"] += 1
+                logger.warning(f"Giving up after {attempt + 1} attempts ({reason})")
+                if error is not None:
+                    raise error
+                if retry_after is not None and response.status_code == 429:
+                    raise HHRateLimited(
+                        f"HH.ru rate limit hit, retry in {retry_after:.0f}s", retry_after=retry_after
+                    )
+                return response
+
+            retry_stats["retries"] += 1
+            retry_stats[f"retries_{reason}"] += 1
+            logger.info(f"Retrying in {delay:.2f}s ({reason}, attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+            slept += delay
+            attempt += 1
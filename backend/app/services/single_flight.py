@@ -0,0 +1,49 @@
+"""Coalescing of identical concurrent calls ("single flight").
+
+The first caller for a key starts the work, later callers with the same key
+await the same task and share its result (or exception).
+"""
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Map of in-flight tasks keyed by call identity."""
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.stats: Counter = Counter()
+
+    async def run(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        timeout: float | None = None,
+    ) -> Any:
+        """Run ``factory()`` once per key among concurrent callers.
+
+        ``timeout`` limits how long this caller waits (asyncio.TimeoutError);
+        the shared call keeps running for the others.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.stats["started"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        # Shield: a cancelled waiter must not cancel the call others share
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark exception as retrieved even if every waiter left
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
@@ -1,21 +1,39 @@
+import asyncio
+import logging
+import time
+
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.models import UserProfile, VacancyCache
 from app.services.llm import get_llm_service, LLMMessage
 from app.services.llm.prompts import VACANCY_MATCH_PROMPT
 
+logger = logging.getLogger(__name__)
+
 
 class VacancyAnalyzer:
     """Service for analyzing vacancy match with user profile."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, llm=None):
         self.db = db
-        self.llm = get_llm_service(db=db)
+        self.llm = llm or get_llm_service(db=db)  # Can be shared between analyzers
 
     async def analyze_match(
         self, profile: UserProfile, vacancy: VacancyCache
     ) -> dict:
         """Analyze how well vacancy matches user profile."""
+        result = await self.score(profile, vacancy)
+
+        # Update vacancy with match data
+        vacancy.match_score = result.get("match_score", 0)
+        vacancy.match_analysis = result
+        self.db.commit()
+
+        return result
+
+    async def score(self, profile: UserProfile, vacancy: VacancyCache) -> dict:
+        """Ask the LLM for a match analysis without touching the database."""
         # Format profile data
         profile_text = f"""
 Позиция: {profile.preferred_position}
@@ -52,21 +70,40 @@ class VacancyAnalyzer:
             LLMMessage(role="user", content=prompt),
         ]
 
+        started = time.perf_counter()
         result = await self.llm.chat_json(llm_messages)
-
-        # Update vacancy with match data
-        vacancy.match_score = result.get("match_score", 0)
-        vacancy.match_analysis = result
-        self.db.commit()
+        logger.info(f"Scored vacancy {vacancy.id} in {time.perf_counter() - started:.2f}s")
 
         return result
 
     async def batch_analyze(
-        self, profile: UserProfile, vacancies: list[VacancyCache]
+        self,
+        profile: UserProfile,
+        vacancies: list[VacancyCache],
+        concurrency: int | None = None,
     ) -> list[dict]:
-        """Analyze multiple vacancies."""
+        """Analyze multiple vacancies, up to ``concurrency`` LLM calls at a time.
+
+        Results are written in one commit once all calls are done.
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.llm_analyze_concurrency)
+
+        async def score(vacancy: VacancyCache) -> dict | None:
+            async with semaphore:
+                try:
+                    return await self.score(profile, vacancy)
+                except Exception as e:
+                    logger.error(f"Error analyzing vacancy {vacancy.id}: {e}")
+                    return None
+
+        scores = await asyncio.gather(*(score(v) for v in vacancies))
+
         results = []
-        for vacancy in vacancies:
-            result = await self.analyze_match(profile, vacancy)
+        for vacancy, result in zip(vacancies, scores):
+            if result is None:
+                continue
+            vacancy.match_score = result.get("match_score", 0)
+            vacancy.match_analysis = result
             results.append({"vacancy_id": vacancy.id, **result})
+        self.db.commit()
         return results
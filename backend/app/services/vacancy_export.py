@@ -0,0 +1,179 @@
+"""Streaming writers for vacancy export.
+
+Each writer takes an async iterator of pages (lists of HH vacancy dicts, as
+yielded by ``HHClient.iter_export_pages``) and yields encoded chunks, one per
+page, so the response never holds more than a page in memory.
+
+Parquet output requires the optional ``pyarrow`` package.
+"""
+import csv
+import importlib.util
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator
+
+# Flat export columns, in CSV order
+EXPORT_COLUMNS = [
+    "id", "name", "employer", "area", "salary_from", "salary_to",
+    "salary_currency", "experience", "employment", "schedule", "url", "published_at",
+]
+
+CSV_HEADER = [
+    "ID", "Название", "Компания", "Город", "Зарплата от", "Зарплата до",
+    "Валюта", "Опыт", "Занятость", "График", "URL", "Дата публикации"
+]
+
+
+def vacancy_to_record(v: dict) -> dict:
+    """Flatten an HH vacancy into EXPORT_COLUMNS (missing values are None)."""
+    salary = v.get("salary") or {}
+    area = v.get("area") or {}
+    employer = v.get("employer") or {}
+    experience = v.get("experience") or {}
+    employment = v.get("employment") or {}
+    schedule = v.get("schedule") or {}
+
+    return {
+        "id": v.get("id"),
+        "name": v.get("name"),
+        "employer": employer.get("name"),
+        "area": area.get("name"),
+        "salary_from": salary.get("from"),
+        "salary_to": salary.get("to"),
+        "salary_currency": salary.get("currency"),
+        "experience": experience.get("name"),
+        "employment": employment.get("name"),
+        "schedule": schedule.get("name"),
+        "url": v.get("alternate_url"),
+        "published_at": v.get("published_at"),
+    }
+
+
+def vacancy_to_row(v: dict) -> list:
+    """Flatten an HH vacancy into a CSV row (same order as CSV_HEADER)."""
+    return [value if value is not None else "" for value in vacancy_to_record(v).values()]
+
+
+async def stream_csv(pages: AsyncIterator[list[dict]]) -> AsyncIterator[str]:
+    """Yield CSV text: header first, then one chunk of rows per page."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(CSV_HEADER)
+    yield buffer.getvalue()
+
+    async for items in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        for v in items:
+            writer.writerow(vacancy_to_row(v))
+        yield buffer.getvalue()
+
+
+async def stream_json(pages: AsyncIterator[list[dict]]) -> AsyncIterator[str]:
+    """Yield a JSON document ``{"items": [...], "total": N}`` element by element."""
+    total = 0
+    yield '{"items": ['
+
+    async for items in pages:
+        chunk = ",".join(json.dumps(v, ensure_ascii=False) for v in items)
+        if chunk:
+            yield ("," if total else "") + chunk
+            total += len(items)
+
+    yield f'], "total": {total}}}'
+
+
+async def stream_ndjson(pages: AsyncIterator[list[dict]]) -> AsyncIterator[str]:
+    """Yield newline-delimited JSON, one full vacancy per line."""
+    async for items in pages:
+        if items:
+            yield "".join(json.dumps(v, ensure_ascii=False) + "\n" for v in items)
+
+
+def parquet_available() -> bool:
+    """Check whether the optional pyarrow dependency is installed."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _parse_published_at(value: str | None) -> datetime | None:
+    """Parse HH timestamps like 2024-01-15T10:00:00+0300."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        return None
+
+
+def _to_int(value) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back page by page."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_parquet(pages: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    """Yield a Parquet file with typed flat columns, one row group per page."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("name", pa.string()),
+        ("employer", pa.string()),
+        ("area", pa.string()),
+        ("salary_from", pa.int64()),
+        ("salary_to", pa.int64()),
+        ("salary_currency", pa.dictionary(pa.int8(), pa.string())),
+        ("experience", pa.dictionary(pa.int8(), pa.string())),
+        ("employment", pa.dictionary(pa.int8(), pa.string())),
+        ("schedule", pa.dictionary(pa.int8(), pa.string())),
+        ("url", pa.string()),
+        ("published_at", pa.timestamp("s", tz="UTC")),
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for items in pages:
+            columns = {name: [] for name in EXPORT_COLUMNS}
+            for v in items:
+                for name, value in vacancy_to_record(v).items():
+                    columns[name].append(value)
+
+            columns["id"] = [_to_int(x) for x in columns["id"]]
+            columns["salary_from"] = [_to_int(x) for x in columns["salary_from"]]
+            columns["salary_to"] = [_to_int(x) for x in columns["salary_to"]]
+            columns["published_at"] = [_parse_published_at(x) for x in columns["published_at"]]
+
+            writer.write_table(pa.table(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
@@ -0,0 +1,79 @@
+"""Bulk fetching of full vacancy details into VacancyCache.
+
+Search results only carry snippets; description and key_skills need one
+``/vacancies/{id}`` request per vacancy. Those requests are made
+concurrently (bounded, and paced by the client's rate limiter) and stored
+with one commit per batch.
+"""
+import asyncio
+import logging
+
+import httpx
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import User, VacancyCache
+from app.services.hh_client import HHClient
+from app.services.vacancy_store import apply_vacancy_details, mark_archived
+
+logger = logging.getLogger(__name__)
+
+# fetch() result for a vacancy HH no longer has (404)
+GONE = object()
+
+
+async def hydrate_vacancies(db: Session, client, vacancies: list[VacancyCache]) -> int:
+    """Fetch and store details for the given vacancies. Returns number hydrated."""
+    semaphore = asyncio.Semaphore(settings.hh_hydration_concurrency)
+
+    async def fetch(vacancy: VacancyCache) -> dict | None:
+        async with semaphore:
+            try:
+                return await client.get_vacancy(vacancy.hh_vacancy_id)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    return GONE
+                logger.warning(f"Could not fetch vacancy {vacancy.hh_vacancy_id}: {e}")
+            except Exception as e:
+                logger.warning(f"Could not fetch vacancy {vacancy.hh_vacancy_id}: {e}")
+            return None
+
+    hydrated = 0
+    batch_size = settings.hh_hydration_batch
+    for start in range(0, len(vacancies), batch_size):
+        batch = vacancies[start:start + batch_size]
+        results = await asyncio.gather(*(fetch(v) for v in batch))
+        for vacancy, details in zip(batch, results):
+            if details is None:
+                continue
+            if details is GONE:
+                mark_archived(vacancy)
+            else:
+                apply_vacancy_details(vacancy, details)
+            hydrated += 1
+        db.commit()
+
+    logger.info(f"Hydrated {hydrated} of {len(vacancies)} vacancies")
+    return hydrated
+
+
+async def hydrate_in_background(user_id: int, hh_vacancy_ids: list[str]):
+    """Background task: hydrate the given vacancies with a session of its own."""
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        vacancies = (
+            db.query(VacancyCache)
+            .filter(
+                VacancyCache.hh_vacancy_id.in_(hh_vacancy_ids),
+                VacancyCache.details_fetched_at == None,
+            )
+            .all()
+        )
+        if user and vacancies:
+            await hydrate_vacancies(db, HHClient.for_user(user), vacancies)
+    except Exception as e:
+        logger.error(f"Background hydration failed: {e}")
+    finally:
+        db.close()
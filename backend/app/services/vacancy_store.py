@@ -0,0 +1,162 @@
+"""Storing HH vacancies in the local VacancyCache."""
+from datetime import datetime, timezone
+
+from sqlalchemy import case, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import VacancyCache
+
+HH_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+# Columns replaced by full details (see apply_vacancy_details) and not overwritten afterwards
+SNIPPET_COLUMNS = ("requirements", "description", "raw_data")
+
+
+def parse_hh_datetime(value: str | None) -> datetime | None:
+    """Parse an HH timestamp into a naive UTC datetime (as stored in the DB)."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.strptime(value, HH_DATE_FORMAT)
+    except ValueError:
+        return None
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def format_hh_datetime(value: datetime) -> str:
+    """Format a naive UTC datetime for HH date_from/date_to params."""
+    return value.replace(tzinfo=timezone.utc).strftime(HH_DATE_FORMAT)
+
+
+def search_item_values(item: dict) -> dict:
+    """Column values of VacancyCache taken from an HH search result item."""
+    salary_data = item.get("salary") or {}
+    snippet = item.get("snippet") or {}
+    return {
+        "hh_vacancy_id": str(item["id"]),
+        "title": item.get("name"),
+        "company_name": (item.get("employer") or {}).get("name"),
+        "salary_from": salary_data.get("from"),
+        "salary_to": salary_data.get("to"),
+        "salary_currency": salary_data.get("currency"),
+        "location": (item.get("area") or {}).get("name"),
+        "experience": (item.get("experience") or {}).get("name"),
+        "employment_type": (item.get("employment") or {}).get("name"),
+        "requirements": snippet.get("requirement"),
+        "description": snippet.get("responsibility"),
+        "raw_data": item,
+        "published_at": parse_hh_datetime(item.get("published_at")),
+        "last_seen_at": datetime.utcnow(),
+        "archived_at": None,
+    }
+
+
+def apply_search_item(cached: VacancyCache, item: dict):
+    """Copy search result fields of an HH vacancy onto a cache row."""
+    for column, value in search_item_values(item).items():
+        # Keep full details once fetched; search results only carry snippets
+        if column in SNIPPET_COLUMNS and cached.details_fetched_at is not None:
+            continue
+        setattr(cached, column, value)
+
+
+def mark_archived(cached: VacancyCache):
+    """Record that a vacancy was closed; its stored content is kept as is."""
+    cached.archived_at = cached.archived_at or datetime.utcnow()
+
+
+def apply_vacancy_details(cached: VacancyCache, details: dict):
+    """Copy full /vacancies/{id} data onto a cache row.
+
+    Archived vacancies are only marked as such: their details are not
+    taken, so the snippet columns stay refreshable by later searches.
+    """
+    if details.get("archived"):
+        mark_archived(cached)
+        return
+    cached.description = details.get("description")
+    cached.key_skills = [s.get("name") for s in details.get("key_skills") or []]
+    cached.raw_data = details
+    cached.details_fetched_at = datetime.utcnow()
+
+
+def store_search_items(db: Session, items: list[dict]) -> list[VacancyCache]:
+    """Insert or refresh search results through the ORM; returns their rows.
+
+    One IN lookup for the whole page. Does not commit, so new rows still
+    have ``id`` None until flushed. Prefer ``upsert_search_items``.
+    """
+    ids = [str(item["id"]) for item in items]
+    existing = {
+        v.hh_vacancy_id: v
+        for v in db.query(VacancyCache).filter(VacancyCache.hh_vacancy_id.in_(ids))
+    }
+
+    rows = {}
+    for item in items:
+        hh_id = str(item["id"])
+        cached = existing.get(hh_id)
+        if cached is None:
+            cached = VacancyCache(hh_vacancy_id=hh_id)
+            db.add(cached)
+            existing[hh_id] = cached
+        apply_search_item(cached, item)
+        rows[hh_id] = cached
+    return list(rows.values())
+
+
+_INSERT_BY_DIALECT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def upsert_search_items(db: Session, items: list[dict]) -> tuple[list[int], int]:
+    """Insert or refresh a page of search results with native upserts.
+
+    Uses INSERT ... ON CONFLICT (hh_vacancy_id) DO UPDATE, batched into
+    multi-row statements by SQLAlchemy, in the session's transaction (not
+    committed). Rows already loaded in the session are not refreshed.
+    Falls back to ``store_search_items`` on other databases.
+
+    Returns (VacancyCache ids in item order, number of new rows).
+    """
+    if not items:
+        return [], 0
+
+    insert = _INSERT_BY_DIALECT.get(db.get_bind().dialect.name)
+    if insert is None:
+        rows = store_search_items(db, items)
+        new = sum(1 for row in rows if row.id is None)
+        db.flush()
+        return [row.id for row in rows], new
+
+    values = {}
+    for item in items:
+        row = search_item_values(item)
+        values[row["hh_vacancy_id"]] = row  # Last occurrence wins
+
+    table = VacancyCache.__table__
+    existing = set(db.scalars(
+        select(table.c.hh_vacancy_id).where(table.c.hh_vacancy_id.in_(list(values)))
+    ))
+
+    statement = insert(table)
+    updates = {}
+    for column in next(iter(values.values())):
+        if column == "hh_vacancy_id":
+            continue
+        if column in SNIPPET_COLUMNS:
+            updates[column] = case(
+                (table.c.details_fetched_at == None, statement.excluded[column]),
+                else_=table.c[column],
+            )
+        else:
+            updates[column] = statement.excluded[column]
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.hh_vacancy_id], set_=updates
+    ).returning(table.c.id, table.c.hh_vacancy_id)
+
+    # executemany; SQLAlchemy batches it into multi-row INSERTs ("insertmanyvalues")
+    result = db.execute(statement, list(values.values()))
+    ids = {hh_vacancy_id: row_id for row_id, hh_vacancy_id in result}
+
+    return [ids[str(item["id"])] for item in items], len(values.keys() - existing)
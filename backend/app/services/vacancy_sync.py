@@ -0,0 +1,269 @@
+"""Incremental vacancy sync.
+
+Each search query keeps a watermark: everything published up to it has been
+read. Later runs only ask HH for vacancies published after it (``date_from``),
+so a repeat run costs roughly one request per 100 new postings. Vacancies that
+stopped showing up are re-checked by a separate, bounded archive pass.
+
+A sync reads at most ``max_pages`` pages, newest first. When that cuts it off,
+the watermark stays put and the oldest ``published_at`` read is kept as a
+backfill cursor; the following runs read the gap below it (``date_to``) until
+it is drained, and only then move the watermark past it.
+
+Pages of a query, and queries of a run (``sync_all``), are fetched
+concurrently; the shared HH rate limiter paces the requests. A vacancy that
+shows up in several queries (specializations, neighbouring areas) is stored
+and passed on only the first time an instance sees it.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import VacancyCache, VacancySyncState
+from app.services.vacancy_store import format_hh_datetime, parse_hh_datetime, upsert_search_items
+
+logger = logging.getLogger(__name__)
+
+# HH indexes new postings with a small lag; re-read a bit before the watermark
+WATERMARK_OVERLAP = timedelta(minutes=10)
+
+
+def query_key(params: dict) -> str:
+    """Stable key of a search query (None values ignored)."""
+    return json.dumps({k: v for k, v in sorted(params.items()) if v is not None}, ensure_ascii=False)
+
+
+def _seen_key(hh_id) -> int | str:
+    # HH ids are numeric; small ints keep the seen-set compact
+    hh_id = str(hh_id)
+    return int(hh_id) if hh_id.isdigit() else hh_id
+
+
+class VacancySync:
+    """Incremental search sync into VacancyCache for an ``HHClient``.
+
+    One instance per run: ``seen`` holds the HH ids already ingested by it,
+    ``duplicates`` counts the copies dropped.
+    """
+
+    def __init__(self, db: Session, client, max_pages: int | None = None):
+        self.db = db
+        self.client = client
+        self.max_pages = max_pages or settings.hh_sync_max_pages
+        self.seen: set[int | str] = set()
+        self.duplicates = 0
+
+    async def _search(self, params: dict, date_from: str | None, date_to: str | None, page: int) -> dict:
+        return await self.client.search_vacancies(
+            **params,
+            date_from=date_from,
+            date_to=date_to,
+            order_by="publication_time",
+            page=page,
+            per_page=100,
+        )
+
+    async def sync(
+        self,
+        on_page: Callable[[list[int]], Awaitable[None]] | None = None,
+        **params,
+    ) -> dict:
+        """Fetch vacancies newer than the query's watermark.
+
+        While a backfill is pending only its gap is read, otherwise everything
+        after the watermark. The first page tells how many pages there are;
+        the rest (up to ``max_pages``) are fetched concurrently. ``on_page`` is awaited with
+        the VacancyCache ids of each page as soon as they are committed.
+        Returns counters: found (new on HH since watermark), fetched, new
+        (rows added) and duplicates (already ingested by this instance).
+        """
+        key = query_key(params)
+        state = self.db.get(VacancySyncState, key)
+        if state is None:
+            state = VacancySyncState(query_key=key, params=params)
+            self.db.add(state)
+
+        date_from = date_to = None
+        if state.watermark:
+            date_from = format_hh_datetime(state.watermark - WATERMARK_OVERLAP)
+        if state.backfill_to:
+            date_to = format_hh_datetime(state.backfill_to)
+
+        fetched = new = duplicates = 0
+        newest = state.watermark
+        oldest = None
+
+        async def ingest(items: list[dict]):
+            nonlocal fetched, new, duplicates, newest, oldest
+            fetched += len(items)
+            fresh = []
+            for item in items:
+                # The watermark covers copies too, they are part of this query
+                published = parse_hh_datetime(item.get("published_at"))
+                if published and (newest is None or published > newest):
+                    newest = published
+                if published and (oldest is None or published < oldest):
+                    oldest = published
+                key = _seen_key(item["id"])
+                if key in self.seen:
+                    duplicates += 1
+                    continue
+                self.seen.add(key)
+                fresh.append(item)
+            if not fresh:
+                return
+            ids, page_new = upsert_search_items(self.db, fresh)
+            self.db.commit()
+            new += page_new
+            if on_page:
+                await on_page(ids)
+
+        async def fetch_page(page: int):
+            result = await self._search(params, date_from, date_to, page)
+            await ingest(result.get("items", []))
+
+        first = await self._search(params, date_from, date_to, 0)
+        found = first.get("found", 0)
+        pages = first.get("pages", 0)
+        await ingest(first.get("items", []))
+
+        if pages > 1 and self.max_pages > 1:
+            # TaskGroup cancels the remaining pages if one fails; the watermark then stays put
+            async with asyncio.TaskGroup() as group:
+                for page in range(1, min(pages, self.max_pages)):
+                    group.create_task(fetch_page(page))
+
+        if pages > self.max_pages and oldest is not None:
+            # Newest first, so the gap is between the old watermark and the last page read
+            logger.warning(
+                f"Sync of {key} stopped at {self.max_pages} pages, {found} found; backfill from {oldest}"
+            )
+            if state.backfill_to is None:
+                state.backfill_watermark = newest
+            state.backfill_to = oldest
+        elif state.backfill_to is not None:
+            logger.info(f"Backfill of {key} drained")
+            state.watermark = state.backfill_watermark
+            state.backfill_to = state.backfill_watermark = None
+        else:
+            state.watermark = newest
+
+        state.last_found = found
+        state.last_synced_at = datetime.utcnow()
+        self.db.commit()
+
+        self.duplicates += duplicates
+        logger.info(
+            f"Synced {key}: {fetched} fetched, {new} new, {duplicates} duplicates "
+            f"(since {date_from or 'start'}{f', until {date_to}' if date_to else ''})"
+        )
+        return {"found": found, "fetched": fetched, "new": new, "duplicates": duplicates}
+
+    def by_priority(self, queries: list[dict]) -> list[dict]:
+        """Queries never synced first, then by ``found`` in their last sync, largest first."""
+        keys = [query_key(params) for params in queries]
+        last_found = dict(
+            self.db.query(VacancySyncState.query_key, VacancySyncState.last_found)
+            .filter(VacancySyncState.query_key.in_(keys))
+            .all()
+        )
+        order = sorted(
+            range(len(queries)),
+            key=lambda i: (keys[i] in last_found, -(last_found.get(keys[i]) or 0)),
+        )
+        return [queries[i] for i in order]
+
+    async def sync_all(
+        self,
+        queries: list[dict],
+        on_page: Callable[[list[int]], Awaitable[None]] | None = None,
+        on_synced: Callable[[dict, dict], None] | None = None,
+        should_stop: Callable[[], bool] | None = None,
+        concurrency: int | None = None,
+    ) -> dict:
+        """Sync several queries concurrently, in ``by_priority`` order.
+
+        ``on_synced(params, result)`` is called as each query finishes. A
+        failed query is logged and counted, the others carry on; once
+        ``should_stop()`` is true no further queries are started. Returns
+        summed counters plus ``failed``.
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.hh_sync_slice_concurrency)
+        totals = {"found": 0, "fetched": 0, "new": 0, "duplicates": 0, "failed": 0}
+
+        async def sync_one(params: dict):
+            # Waiters acquire in creation order, so priority order is kept
+            async with semaphore:
+                if should_stop and should_stop():
+                    return
+                try:
+                    result = await self.sync(on_page=on_page, **params)
+                except Exception as e:
+                    logger.error(f"Sync of {query_key(params)} failed: {e}")
+                    totals["failed"] += 1
+                    return
+            for name in ("found", "fetched", "new", "duplicates"):
+                totals[name] += result[name]
+            if on_synced:
+                on_synced(params, result)
+
+        await asyncio.gather(*(sync_one(params) for params in self.by_priority(queries)))
+        return totals
+
+    async def check_archived(self, limit: int | None = None) -> int:
+        """Re-check cached vacancies not seen for a while; mark closed ones archived.
+
+        Returns the number of vacancies newly marked archived.
+        """
+        limit = limit or settings.hh_archive_check_batch
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.hh_archive_check_age)
+        vacancies = (
+            self.db.query(VacancyCache)
+            .filter(
+                VacancyCache.archived_at == None,
+                or_(VacancyCache.last_seen_at == None, VacancyCache.last_seen_at < stale_before),
+            )
+            .order_by(VacancyCache.last_seen_at.asc().nullsfirst())
+            .limit(limit)
+            .all()
+        )
+        if not vacancies:
+            return 0
+
+        async def is_archived(vacancy: VacancyCache) -> bool | None:
+            try:
+                details = await self.client.get_vacancy(vacancy.hh_vacancy_id)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    return True
+                logger.warning(f"Archive check of {vacancy.hh_vacancy_id} failed: {e}")
+                return None
+            except Exception as e:
+                logger.warning(f"Archive check of {vacancy.hh_vacancy_id} failed: {e}")
+                return None
+            return bool(details.get("archived"))
+
+        # Requests are paced by the client's rate limiter
+        results = await asyncio.gather(*(is_archived(v) for v in vacancies))
+
+        now = datetime.utcnow()
+        archived = 0
+        for vacancy, result in zip(vacancies, results):
+            if result is None:
+                continue
+            if result:
+                vacancy.archived_at = now
+                archived += 1
+            else:
+                vacancy.last_seen_at = now
+        self.db.commit()
+
+        logger.info(f"Archive check: {archived} of {len(vacancies)} vacancies archived")
+        return archived
@@ -0,0 +1,122 @@
+"""Automation worker: executes queued automation runs outside the web process.
+
+    cd backend && python -m app.worker [--concurrency 2]
+
+Any number of workers can run against the same database. Each claims runs
+from automation_runs with a lease and renews it while the run is going; if a
+worker dies, its runs are claimed again once their leases expire and resume
+from their checkpoints. On SIGTERM/SIGINT the worker releases its runs right
+away so another worker can take them over.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+
+from app.config import settings
+from app.database import SessionLocal, init_db
+from app.services.automation import execute_run
+from app.services.automation_queue import claim_run, release_run, renew_lease
+from app.services.http_pool import close_http_client, init_http_client
+from app.services.rate_limiter import load_rate_limits
+
+logger = logging.getLogger(__name__)
+
+
+class AutomationWorker:
+    """Polls the run queue and executes up to ``concurrency`` runs at a time."""
+
+    def __init__(self, concurrency: int | None = None):
+        self.concurrency = concurrency or settings.automation_worker_concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._runs: dict[int, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        logger.info(f"Worker {self.worker_id} stopping")
+        self._stopping.set()
+
+    async def run_forever(self):
+        logger.info(f"Worker {self.worker_id} started, {self.concurrency} runs at a time")
+        while not self._stopping.is_set():
+            run_id = None
+            if len(self._runs) < self.concurrency:
+                with SessionLocal() as db:
+                    run_id = claim_run(db, self.worker_id)
+
+            if run_id is not None:
+                logger.info(f"Worker {self.worker_id} claimed automation run {run_id}")
+                self._runs[run_id] = asyncio.create_task(self._execute(run_id))
+                continue
+
+            try:
+                await asyncio.wait_for(self._stopping.wait(), settings.automation_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+        await self._shutdown()
+
+    async def _execute(self, run_id: int):
+        run_task = asyncio.create_task(execute_run(run_id))
+        heartbeat = asyncio.create_task(self._heartbeat(run_id, run_task))
+        try:
+            await run_task
+        except asyncio.CancelledError:
+            logger.warning(f"Automation run {run_id} cancelled on worker {self.worker_id}")
+        except Exception as e:
+            logger.error(f"Automation run {run_id} crashed: {e}", exc_info=True)
+        finally:
+            heartbeat.cancel()
+            self._runs.pop(run_id, None)
+
+    async def _heartbeat(self, run_id: int, run_task: asyncio.Task):
+        while True:
+            await asyncio.sleep(settings.automation_heartbeat_interval)
+            with SessionLocal() as db:
+                if renew_lease(db, run_id, self.worker_id):
+                    continue
+            if not run_task.done():
+                # Taken over by another worker after we missed our lease
+                logger.warning(f"Lost lease on automation run {run_id}, cancelling")
+                run_task.cancel()
+            return
+
+    async def _shutdown(self):
+        runs = dict(self._runs)
+        for task in runs.values():
+            task.cancel()
+        await asyncio.gather(*runs.values(), return_exceptions=True)
+        with SessionLocal() as db:
+            for run_id in runs:
+                release_run(db, run_id, self.worker_id)
+        if runs:
+            logger.info(f"Released automation runs {sorted(runs)}")
+
+
+async def main(concurrency: int | None = None):
+    init_db()
+    with SessionLocal() as db:
+        load_rate_limits(db)
+    await init_http_client()
+
+    worker = AutomationWorker(concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run_forever()
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--concurrency", type=int, default=None)
+    asyncio.run(main(parser.parse_args().concurrency))
@@ -0,0 +1,12 @@
+"""Benchmarks. They run against a throwaway SQLite database, never the app's:
+the shared HH rate limits live in the database and benchmarks lift them.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+import app.models  # noqa: E402,F401  Registers the tables
+from app.database import init_db  # noqa: E402
+
+init_db()
@@ -0,0 +1,89 @@
+"""Benchmark: a small automation run next to a big one on a shared HH budget.
+
+A "big" run hammers the search bucket with many workers while a "small"
+run needs a handful of requests. With a FIFO lock the small run waits
+behind the big run's queue; with round-robin turns (fair_share) it gets
+every other token.
+
+    cd backend && python -m benchmarks.bench_fair_share [--rate 20] [--big-workers 16]
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.fair_share import share_key
+from app.services.rate_limiter import HHRateLimiter
+
+
+class FifoBucket:
+    """In-process token bucket as it was before fair turns: one FIFO lock."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self._updated = time.monotonic()
+        self._fifo = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.rate, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        async with self._fifo:
+            self._refill(time.monotonic())
+            waited = 0.0
+            if self.tokens < 1:
+                waited = (1 - self.tokens) / self.rate
+                await asyncio.sleep(waited)
+                self._refill(time.monotonic())
+            self.tokens -= 1
+            return waited
+
+
+def shared_bucket(rate: float):
+    """The search bucket of the shared limiter, set to ``rate``."""
+    limiter = HHRateLimiter()
+    limiter.configure({"search": rate})
+    return limiter.buckets["search"]
+
+
+async def automation_run(bucket, key: str, workers: int, requests: int) -> float:
+    share_key.set(key)
+    start = time.perf_counter()
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await bucket.acquire()
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return time.perf_counter() - start
+
+
+async def scenario(label: str, bucket, args):
+    big = asyncio.create_task(automation_run(bucket, "run:big", args.big_workers, args.big_requests))
+    await asyncio.sleep(0.2)  # Big run already has a queue when the small one starts
+    small = await automation_run(bucket, "run:small", 1, args.small_requests)
+    big_elapsed = await big
+    print(
+        f"{label:<12} small run: {args.small_requests} requests in {small:6.2f}s   "
+        f"big run: {args.big_requests} requests in {big_elapsed:6.2f}s"
+    )
+
+
+async def main(args):
+    ideal = args.small_requests / args.rate
+    print(f"rate {args.rate}/s; small run alone would take {ideal:.2f}s")
+    await scenario("FIFO", FifoBucket(args.rate), args)
+    await scenario("round-robin", shared_bucket(args.rate), args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rate", type=float, default=20.0)
+    parser.add_argument("--big-workers", type=int, default=16)
+    parser.add_argument("--big-requests", type=int, default=200)
+    parser.add_argument("--small-requests", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,100 @@
+"""Benchmark: HHClient throughput and latency against the local HH stub.
+
+Measures a bulk export (search pages) and concurrent vacancy detail fetches
+with injected latency and 429s, then replays the recorded export from a
+cassette without any server. Nothing talks to hh.ru.
+
+    cd backend && python -m benchmarks.bench_hh_client [--latency 0.05] [--error-rate 0.05]
+
+Pass --rate-limited to keep the production HH rate limits (by default they
+are lifted so the client itself is measured).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from app.services.hh_client import HHClient
+from app.services.http_cassette import CassetteTransport
+from app.services.http_pool import create_http_client
+from app.services.rate_limiter import hh_rate_limiter
+from app.services.retry import retry_stats
+from benchmarks.hh_stub import HHStubServer
+
+
+def _client(http, base_url: str) -> HHClient:
+    client = HHClient(http_client=http)
+    client.BASE_URL = base_url
+    return client
+
+
+async def bench_export(client: HHClient, label: str, pages: int):
+    start = time.perf_counter()
+    items = 0
+    async for page_items in client.iter_export_pages(max_pages=pages, text="python"):
+        items += len(page_items)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {items} vacancies, {pages} pages in {elapsed:.3f}s ({pages / elapsed:.1f} pages/s)")
+
+
+async def bench_details(client: HHClient, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await client.get_vacancy(str(i + 1))
+            latencies.append(time.perf_counter() - started)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{'vacancy details':<22} {total} requests in {elapsed:.3f}s ({total / elapsed:.1f} req/s), "
+        f"p50 {statistics.median(latencies) * 1000:.1f}ms, p95 {p95 * 1000:.1f}ms"
+    )
+
+
+async def main(args):
+    if not args.rate_limited:
+        hh_rate_limiter.configure({name: 1000.0 for name in hh_rate_limiter.get_rates()})
+
+    cassette = os.path.join(tempfile.mkdtemp(), "hh_cassette.json")
+    server = HHStubServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    async with server:
+        async with create_http_client() as http:
+            client = _client(http, server.url)
+            await bench_export(client, "export (stub)", args.pages)
+            await bench_details(client, args.details, args.concurrency)
+        print(
+            f"stub: {server.requests} requests, {server.connections} connections, "
+            f"{server.throttled} throttled (429); client retries: {retry_stats['retries']}"
+        )
+
+        # Record the export into a cassette
+        server.error_rate = 0
+        transport = CassetteTransport(cassette, mode="record", base_url=server.url)
+        async with create_http_client(transport=transport) as http:
+            await bench_export(_client(http, server.url), "export (recording)", args.pages)
+
+    # Server is gone, answers come from the cassette
+    transport = CassetteTransport(cassette, mode="replay", base_url=server.url)
+    async with create_http_client(transport=transport) as http:
+        await bench_export(_client(http, server.url), "export (replay)", args.pages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--details", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate-limited", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,64 @@
+"""Benchmark: shared pooled client vs. a new AsyncClient per HH call.
+
+Runs against a local stub server, so it measures connection setup overhead
+only (TCP handshake; on real HH.ru every new connection also pays TLS).
+
+    cd backend && python -m benchmarks.bench_http_pool [requests] [concurrency]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from app.services.hh_client import HHClient
+from app.services.http_pool import create_http_client
+from app.services.rate_limiter import hh_rate_limiter
+from benchmarks.stub_server import StubServer
+
+
+class PerCallClient(HHClient):
+    """Old behaviour: every request opens and closes its own AsyncClient."""
+
+    async def _request(self, method: str, endpoint: str, require_auth: bool = False, **kwargs):
+        async with httpx.AsyncClient() as http:
+            # A throwaway client per call; self is shared by concurrent requests
+            client = HHClient(http_client=http)
+            client.BASE_URL = self.BASE_URL
+            return await client._request(method, endpoint, require_auth, **kwargs)
+
+
+async def _run(client: HHClient, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await client.get_vacancy(str(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - start
+
+
+async def main(total: int, concurrency: int):
+    # Measure connection handling, not the HH rate limits
+    hh_rate_limiter.configure({name: 1000.0 for name in hh_rate_limiter.get_rates()})
+
+    async with StubServer() as server:
+        per_call = PerCallClient()
+        per_call.BASE_URL = server.url
+        elapsed = await _run(per_call, total, concurrency)
+        print(f"per-call client: {total} requests in {elapsed:.3f}s, {server.connections} connections")
+
+        server.reset_counters()
+        async with create_http_client() as http:
+            pooled = HHClient(http_client=http)
+            pooled.BASE_URL = server.url
+            elapsed = await _run(pooled, total, concurrency)
+        print(f"pooled client:   {total} requests in {elapsed:.3f}s, {server.connections} connections")
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(main(total, concurrency))
@@ -0,0 +1,97 @@
+"""Benchmark: loading city x specialization slices for an automation run.
+
+Compares the sequential walk (one slice after another, one page after
+another) with VacancySync.sync_all (slices and their pages concurrently),
+against the local HH stub with injected latency, into a temporary SQLite DB.
+
+    cd backend && python -m benchmarks.bench_vacancy_sync [--slices 6] [--pages 5] [--latency 0.3]
+
+Pass --rate-limited to keep the production HH rate limits (by default they
+are lifted so the loader itself is measured; at the default 2 searches/s the
+limiter, not the loader, sets the pace).
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import VacancyCache
+from app.services.hh_client import HHClient
+from app.services.http_pool import create_http_client
+from app.services.rate_limiter import hh_rate_limiter
+from app.services.vacancy_store import upsert_search_items
+from app.services.vacancy_sync import VacancySync
+from benchmarks.hh_stub import HHStubServer
+
+
+def _session():
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+async def sequential(client: HHClient, db, slices: list[dict], pages: int) -> int:
+    """The loader before: slices and pages strictly one after another."""
+    fetched = 0
+    for params in slices:
+        for page in range(pages):
+            result = await client.search_vacancies(**params, page=page, per_page=100)
+            items = result.get("items", [])
+            if not items:
+                break
+            upsert_search_items(db, items)
+            db.commit()
+            fetched += len(items)
+            if page + 1 >= result.get("pages", 0):
+                break
+    return fetched
+
+
+async def concurrent(client: HHClient, db, slices: list[dict], pages: int, concurrency: int) -> int:
+    totals = await VacancySync(db, client, max_pages=pages).sync_all(slices, concurrency=concurrency)
+    return totals["fetched"]
+
+
+async def main(args):
+    if not args.rate_limited:
+        hh_rate_limiter.configure({name: 1000.0 for name in hh_rate_limiter.get_rates()})
+
+    slices = [{"area": str(area), "specialization": "1.221"} for area in range(1, args.slices + 1)]
+    server = HHStubServer(latency=args.latency, jitter=args.jitter)
+    async with server:
+        async with create_http_client() as http:
+            client = HHClient(http_client=http)
+            client.BASE_URL = server.url
+            print(f"{args.slices} slices x {args.pages} pages, {args.latency * 1000:.0f}ms latency")
+
+            for label, run in (
+                ("sequential", lambda db: sequential(client, db, slices, args.pages)),
+                (
+                    f"sync_all ({args.concurrency} slices)",
+                    lambda db: concurrent(client, db, slices, args.pages, args.concurrency),
+                ),
+            ):
+                db = _session()
+                start = time.perf_counter()
+                fetched = await run(db)
+                elapsed = time.perf_counter() - start
+                stored = db.query(VacancyCache).count()
+                db.close()
+                print(f"{label:<24} {fetched} fetched, {stored} stored in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--slices", type=int, default=6)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate-limited", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,91 @@
+"""Benchmark: storing a batch of HH search results in VacancyCache on SQLite.
+
+Compares the old per-item SELECT (+ COMMIT per item, as automation did),
+the ORM path with a single IN lookup (store_search_items) and the native
+INSERT ... ON CONFLICT upsert (upsert_search_items), for a fresh batch and
+for re-ingesting the same batch.
+
+    cd backend && python -m benchmarks.bench_vacancy_upsert [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import VacancyCache
+from app.services.vacancy_store import apply_search_item, store_search_items, upsert_search_items
+
+
+def make_items(total: int) -> list[dict]:
+    return [
+        {
+            "id": str(100000 + i),
+            "name": f"Python-разработчик #{i}",
+            "area": {"id": "1", "name": "Москва"},
+            "salary": {"from": 150000, "to": 250000, "currency": "RUR"},
+            "employer": {"id": str(i % 300), "name": f"Компания {i % 300}"},
+            "experience": {"id": "between1And3", "name": "От 1 года до 3 лет"},
+            "employment": {"id": "full", "name": "Полная занятость"},
+            "published_at": "2026-10-01T10:00:00+0300",
+            "snippet": {"requirement": "Python, FastAPI, PostgreSQL", "responsibility": "Разработка API"},
+        }
+        for i in range(total)
+    ]
+
+
+def per_item(db, items: list[dict], commit_each: bool):
+    for item in items:
+        cached = db.query(VacancyCache).filter(VacancyCache.hh_vacancy_id == str(item["id"])).first()
+        if not cached:
+            cached = VacancyCache(hh_vacancy_id=str(item["id"]))
+            db.add(cached)
+        apply_search_item(cached, item)
+        if commit_each:
+            db.commit()
+    db.commit()
+
+
+def orm_batch(db, items: list[dict]):
+    store_search_items(db, items)
+    db.commit()
+
+
+def native_upsert(db, items: list[dict]):
+    upsert_search_items(db, items)
+    db.commit()
+
+
+def run(label: str, func, items: list[dict], **kwargs):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    timings = []
+    for _ in range(2):  # Fresh insert, then the same batch again (updates)
+        with Session() as db:
+            start = time.perf_counter()
+            func(db, items, **kwargs)
+            timings.append(time.perf_counter() - start)
+
+    with Session() as db:
+        assert db.query(VacancyCache).count() == len(items)
+    engine.dispose()
+    print(f"{label:<32} insert {timings[0] * 1000:8.1f}ms   re-ingest {timings[1] * 1000:8.1f}ms")
+
+
+def main(total: int):
+    items = make_items(total)
+    print(f"{total} vacancies, SQLite")
+    run("per-item SELECT + COMMIT each", per_item, items, commit_each=True)
+    run("per-item SELECT, one COMMIT", per_item, items, commit_each=False)
+    run("ORM, one IN lookup", orm_batch, items)
+    run("INSERT ... ON CONFLICT", native_upsert, items)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,214 @@
+"""Local stand-in for the HH API, for offline benchmarks and load tests.
+
+Serves /vacancies (paginated, with HH's 2000-result depth limit),
+/vacancies/{id}, /areas, /dictionaries and /negotiations from generated
+data. Latency and 429 responses can be injected.
+
+    cd backend && python -m benchmarks.hh_stub --port 8765 --latency 0.05 --error-rate 0.05
+
+then run the app with HH_API_URL=http://127.0.0.1:8765.
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.stub_server import StubServer
+
+HH_MAX_RESULTS = 2000
+
+AREAS = [
+    {
+        "id": "113",
+        "parent_id": None,
+        "name": "Россия",
+        "areas": [
+            {"id": "1", "parent_id": "113", "name": "Москва", "areas": []},
+            {"id": "2", "parent_id": "113", "name": "Санкт-Петербург", "areas": []},
+            {
+                "id": "1620",
+                "parent_id": "113",
+                "name": "Республика Татарстан",
+                "areas": [{"id": "88", "parent_id": "1620", "name": "Казань", "areas": []}],
+            },
+        ],
+    },
+]
+
+DICTIONARIES = {
+    "experience": [
+        {"id": "noExperience", "name": "Нет опыта"},
+        {"id": "between1And3", "name": "От 1 года до 3 лет"},
+        {"id": "between3And6", "name": "От 3 до 6 лет"},
+        {"id": "moreThan6", "name": "Более 6 лет"},
+    ],
+    "employment": [
+        {"id": "full", "name": "Полная занятость"},
+        {"id": "part", "name": "Частичная занятость"},
+    ],
+}
+
+
+class HHStubServer(StubServer):
+    """Keep-alive stub of the HH API endpoints used by HHClient.
+
+    Args:
+        vacancies: Number of vacancies matching any search
+        latency: Seconds added to every response
+        jitter: Extra random latency, up to this many seconds
+        error_rate: Fraction of requests answered with 429 and Retry-After
+        retry_after: Retry-After value of injected 429s, seconds
+        negotiations: Number of negotiations of the (single) stub user
+        seed: Random seed, for reproducible runs
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        vacancies: int = 5000,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 0,
+        negotiations: int = 0,
+        seed: int = 0,
+    ):
+        super().__init__(host, port)
+        self.vacancies = vacancies
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.negotiations = negotiations
+        self.random = random.Random(seed)
+        self.throttled = 0
+        self._now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def reset_counters(self):
+        super().reset_counters()
+        self.throttled = 0
+
+    def vacancy(self, index: int, full: bool = False) -> dict:
+        published = self._now - timedelta(minutes=index)
+        item = {
+            "id": str(index + 1),
+            "name": f"Python-разработчик #{index + 1}",
+            "area": {"id": "1", "name": "Москва"},
+            "salary": {"from": 100000 + index % 50 * 5000, "to": None, "currency": "RUR"},
+            "employer": {"id": str(index % 300), "name": f"Компания {index % 300}"},
+            "experience": {"id": "between1And3", "name": "От 1 года до 3 лет"},
+            "employment": {"id": "full", "name": "Полная занятость"},
+            "published_at": published.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "alternate_url": f"https://hh.ru/vacancy/{index + 1}",
+            "snippet": {"requirement": "Опыт с Python, FastAPI", "responsibility": "Разработка бэкенда"},
+        }
+        if full:
+            item["description"] = "<p>Разрабатывать сервисы на Python.</p>" * 20
+            item["key_skills"] = [{"name": "Python"}, {"name": "FastAPI"}, {"name": "PostgreSQL"}]
+            item["archived"] = False
+        return item
+
+    def _search(self, query: dict) -> dict:
+        per_page = min(int(query.get("per_page", ["20"])[0]), 100)
+        page = int(query.get("page", ["0"])[0])
+        found = self.vacancies
+        reachable = min(found, HH_MAX_RESULTS)
+        start = page * per_page
+        if start >= reachable:
+            items = []
+        else:
+            items = [self.vacancy(i) for i in range(start, min(start + per_page, reachable))]
+        return {
+            "items": items,
+            "found": found,
+            "page": page,
+            "pages": (reachable + per_page - 1) // per_page,
+            "per_page": per_page,
+        }
+
+    def _negotiations(self, query: dict) -> dict:
+        per_page = min(int(query.get("per_page", ["20"])[0]), 100)
+        page = int(query.get("page", ["0"])[0])
+        start = page * per_page
+        items = [
+            {
+                "id": f"n{i}",
+                "state": {"id": "response"},
+                "vacancy": {"id": str(i + 1)},
+                "updated_at": self._now.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            }
+            for i in range(start, min(start + per_page, self.negotiations))
+        ]
+        return {
+            "items": items,
+            "found": self.negotiations,
+            "page": page,
+            "pages": (self.negotiations + per_page - 1) // per_page,
+            "per_page": per_page,
+        }
+
+    async def respond(self, method: str, path: str, headers: dict, body: bytes):
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.throttled += 1
+            return 429, {"Retry-After": str(self.retry_after)}, {"errors": [{"type": "too_many_requests"}]}
+
+        url = urlsplit(path)
+        query = parse_qs(url.query)
+        parts = url.path.strip("/").split("/")
+
+        if parts == ["vacancies"]:
+            return 200, {}, self._search(query)
+        if len(parts) == 2 and parts[0] == "vacancies":
+            index = int(parts[1]) - 1 if parts[1].isdigit() else -1
+            if not 0 <= index < self.vacancies:
+                return 404, {}, {"errors": [{"type": "not_found"}]}
+            return 200, {}, self.vacancy(index, full=True)
+        if parts == ["areas"]:
+            return 200, {}, AREAS
+        if parts == ["dictionaries"]:
+            return 200, {}, DICTIONARIES
+        if parts == ["negotiations"]:
+            if method == "POST":
+                return 201, {}, {}
+            return 200, {}, self._negotiations(query)
+        return 404, {}, {"errors": [{"type": "not_found"}]}
+
+
+async def _serve(args):
+    server = HHStubServer(
+        host=args.host,
+        port=args.port,
+        vacancies=args.vacancies,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        negotiations=args.negotiations,
+        seed=args.seed,
+    )
+    async with server:
+        print(f"HH stub listening on {server.url}")
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--vacancies", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0)
+    parser.add_argument("--negotiations", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
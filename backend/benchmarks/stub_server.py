@@ -0,0 +1,88 @@
+"""Minimal local HTTP/1.1 server used by the benchmarks.
+
+Pure asyncio, no extra dependencies. Supports keep-alive and counts accepted
+TCP connections so pooled vs. per-call clients can be compared.
+"""
+import asyncio
+import json
+
+
+class StubServer:
+    """Keep-alive HTTP server answering every request with a JSON body."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.requests = 0
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def reset_counters(self):
+        self.connections = 0
+        self.requests = 0
+
+    async def respond(self, method: str, path: str, headers: dict, body: bytes) -> tuple[int, dict, object]:
+        """Build a response: (status, extra headers, JSON payload). Override in subclasses."""
+        return 200, {}, {"method": method, "path": path}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+                self.requests += 1
+
+                status, extra_headers, payload = await self.respond(method, path, headers, body)
+                data = json.dumps(payload, ensure_ascii=False).encode()
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                response_headers = {
+                    "Content-Type": "application/json; charset=utf-8",
+                    "Content-Length": str(len(data)),
+                    "Connection": "keep-alive" if keep_alive else "close",
+                    **extra_headers,
+                }
+                lines = [f"HTTP/1.1 {status} X"] + [f"{k}: {v}" for k, v in response_headers.items()]
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
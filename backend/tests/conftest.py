@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+# Point the app at a throwaway database before anything imports app.database
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+
+import pytest
+
+from app.database import Base, SessionLocal, engine, init_db
+
+
+@pytest.fixture
+def db():
+    """Session on freshly created tables."""
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+class FakeHHClient:
+    """HHClient stand-in serving canned vacancies.
+
+    ``vacancies`` maps HH id to details; ids missing from it answer 404.
+    """
+
+    def __init__(self, vacancies: dict[str, dict] | None = None):
+        self.vacancies = vacancies or {}
+        self.requests: list[tuple] = []
+
+    async def get_vacancy(self, vacancy_id: str) -> dict:
+        import httpx
+
+        self.requests.append(("get_vacancy", vacancy_id))
+        if vacancy_id not in self.vacancies:
+            request = httpx.Request("GET", f"https://api.hh.ru/vacancies/{vacancy_id}")
+            raise httpx.HTTPStatusError(
+                "Not Found", request=request, response=httpx.Response(404, request=request)
+            )
+        return self.vacancies[vacancy_id]
+
+
+@pytest.fixture
+def fake_hh():
+    return FakeHHClient()
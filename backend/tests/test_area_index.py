@@ -0,0 +1,41 @@
+from app.services.area_index import TRIE_NODE_CAPACITY, AreaIndex
+
+
+def _tree() -> list[dict]:
+    # A big country fills every "ма" trie node before the small one is ranked
+    big = [{"id": f"1{i:03}", "name": f"Ма{i:03}", "areas": []} for i in range(TRIE_NODE_CAPACITY + 5)]
+    small = [{"id": "2001", "name": "Марксштадт", "areas": []}]
+    region = {"id": "200", "name": "Область", "areas": small}
+    return [
+        {"id": "1", "name": "Большая", "areas": big},
+        {"id": "2", "name": "Малая", "areas": [region]},
+    ]
+
+
+def test_country_filter_finds_areas_crowded_out_of_the_global_trie():
+    index = AreaIndex(_tree())
+
+    assert "2001" not in index.autocomplete("ма", TRIE_NODE_CAPACITY)
+    assert index.autocomplete("мар", 10, country_id="2") == ["2001"]
+    assert index.autocomplete("ма", 10, country_id="2") == ["2", "2001"]
+
+
+def test_filter_below_country_level():
+    index = AreaIndex(_tree())
+
+    assert index.autocomplete("ма", 10, country_id="200") == ["2001"]
+    assert index.autocomplete("ма", 10, country_id="404") == []
+
+
+def test_region_filter_finds_cities_crowded_out_of_the_country_trie():
+    # One region's cities fill the country's "ма" nodes before the other region's city
+    crowded = [{"id": f"3{i:03}", "name": f"Ма{i:03}", "areas": []} for i in range(TRIE_NODE_CAPACITY + 5)]
+    tree = [{"id": "3", "name": "Страна", "areas": [
+        {"id": "30", "name": "Первая область", "areas": crowded},
+        {"id": "31", "name": "Вторая область", "areas": [{"id": "3100", "name": "Марьино", "areas": []}]},
+    ]}]
+    index = AreaIndex(tree)
+
+    assert "3100" not in index.autocomplete("ма", TRIE_NODE_CAPACITY, country_id="3")
+    assert index.autocomplete("ма", 10, country_id="31") == ["3100"]
+    assert index.autocomplete("ма0", 3, country_id="30") == ["3000", "3001", "3002"]
@@ -0,0 +1,128 @@
+import asyncio
+
+from app.models import AutomationRun, AutomationRunItem, BaseResume, ResumeVariation, User, VacancyCache
+from app.services.automation import AutomationService
+from app.services.fair_share import FairSemaphore
+from app.services.vacancy_store import upsert_search_items
+
+
+def _service(db, hh_client) -> AutomationService:
+    user = User()
+    db.add(user)
+    db.commit()
+    run = AutomationRun(user_id=user.id, config={"specializations": [], "cities": []}, status="running")
+    db.add(run)
+    db.commit()
+    service = AutomationService(db, user, run)
+    service.hh_client = hh_client
+    return service
+
+
+def _vacancy(db, hh_id: str) -> VacancyCache:
+    (vacancy_id,), _ = upsert_search_items(db, [{"id": hh_id, "name": "Python-разработчик"}])
+    db.commit()
+    return db.get(VacancyCache, vacancy_id)
+
+
+def test_hydrate_drops_vacancy_found_closed(db, fake_hh):
+    service = _service(db, fake_hh)
+    vacancy = _vacancy(db, "10")  # Unknown to fake_hh: 404
+
+    assert asyncio.run(service._hydrate_vacancy(vacancy.id)) is None
+
+    item = db.query(AutomationRunItem).filter_by(vacancy_id=vacancy.id).one()
+    assert item.state == "archived"
+
+
+def test_hydrate_passes_open_vacancy_on(db, fake_hh):
+    service = _service(db, fake_hh)
+    vacancy = _vacancy(db, "11")
+    fake_hh.vacancies["11"] = {"id": "11", "archived": False, "description": "d", "key_skills": []}
+
+    assert asyncio.run(service._hydrate_vacancy(vacancy.id)) == vacancy.id
+
+    item = db.query(AutomationRunItem).filter_by(vacancy_id=vacancy.id).one()
+    assert item.state == "hydrated"
+
+
+def test_generate_skips_vacancy_applied_to_meanwhile(db, fake_hh):
+    service = _service(db, fake_hh)
+    service.max_resumes = 20
+    service.resume_generator = None  # Must not be reached
+    vacancy = _vacancy(db, "12")
+    service._applied = {"12"}
+
+    assert asyncio.run(service._generate_resume(vacancy.id)) is None
+
+    item = db.query(AutomationRunItem).filter_by(vacancy_id=vacancy.id).one()
+    assert item.state == "applied"
+
+
+class _Collector:
+    def __init__(self):
+        self.items = []
+
+    async def put(self, item):
+        self.items.append(item)
+
+
+def _scored_with_draft(db, service: AutomationService, hh_id: str, draft: bool) -> tuple[int, int | None]:
+    """A vacancy the service's user scored 80, optionally with a draft resume for it."""
+    vacancy = _vacancy(db, hh_id)
+    vacancy.match_score = 80
+    db.add(AutomationRunItem(run_id=service.run_id, vacancy_id=vacancy.id, state="analyzed", match_score=80))
+    variation_id = None
+    if draft:
+        base = BaseResume(user_id=service.user.id, is_active=True)
+        db.add(base)
+        db.flush()
+        variation = ResumeVariation(base_resume_id=base.id, vacancy_id=vacancy.id, status="draft")
+        db.add(variation)
+        db.flush()
+        variation_id = variation.id
+    db.commit()
+    return vacancy.id, variation_id
+
+
+def test_leftovers_are_scoped_to_the_runs_user(db, fake_hh):
+    mine = _service(db, fake_hh)
+    theirs = _service(db, fake_hh)
+    mine.max_resumes = theirs.max_resumes = 20
+    my_vacancy, _ = _scored_with_draft(db, mine, "20", draft=False)
+    their_vacancy, _ = _scored_with_draft(db, theirs, "21", draft=False)
+    _, their_draft = _scored_with_draft(db, theirs, "22", draft=True)
+    pipeline = {"generating": _Collector(), "applying": _Collector()}
+
+    asyncio.run(mine._feed_leftovers(pipeline, auto_apply=True, resumed=[]))
+
+    assert pipeline["generating"].items == [my_vacancy]
+    assert their_vacancy not in pipeline["generating"].items
+    assert pipeline["applying"].items == []
+    # Not sent with this user's token even if its id shows up
+    assert asyncio.run(mine._apply(their_draft)) is None
+    assert db.get(ResumeVariation, their_draft).status == "draft"
+
+
+def test_concurrent_runs_take_turns(db, fake_hh):
+    first, second = _service(db, fake_hh), _service(db, fake_hh)
+    slots = FairSemaphore(1)
+    order = []
+
+    async def busy_run(service: AutomationService):
+        async def request():
+            async with slots.slot():
+                order.append(service.run_id)
+                await asyncio.sleep(0.001)
+
+        await asyncio.gather(*(request() for _ in range(4)))
+
+    async def scenario():
+        for service in (first, second):
+            service._run = lambda service=service: busy_run(service)
+        await asyncio.gather(first.run(), second.run())
+
+    asyncio.run(scenario())
+
+    # Both queued all requests at once; first come first served would give 1,1,1,1,2,2,2,2
+    a, b = first.run_id, second.run_id
+    assert order == [a, a, b, a, b, a, b, b]
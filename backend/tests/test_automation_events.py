@@ -0,0 +1,75 @@
+import asyncio
+
+import httpx
+
+from app.config import settings
+from app.main import app
+from app.models import AutomationRun, AutomationRunEvent, User
+
+
+def _run_with_events(db, status: str, *events: tuple[str, dict]) -> AutomationRun:
+    user = User()
+    db.add(user)
+    db.commit()
+    run = AutomationRun(user_id=user.id, config={"specializations": [], "cities": []}, status=status)
+    db.add(run)
+    db.commit()
+    for seq, (kind, data) in enumerate(events, start=1):
+        db.add(AutomationRunEvent(run_id=run.id, seq=seq, type=kind, data=data))
+    db.commit()
+    return run
+
+
+async def _get(path: str, **kwargs) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, **kwargs)
+
+
+def _events(body: str) -> list[tuple[str, str]]:
+    """(id, event) pairs of an SSE body."""
+    parsed = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            parsed.append((fields["id"], fields["event"]))
+    return parsed
+
+
+def test_stream_sends_new_events_and_ends_with_the_run(db, monkeypatch):
+    monkeypatch.setattr(settings, "automation_stream_poll_interval", 0.01)
+    run = _run_with_events(db, "running", ("progress", {"vacancies_loaded": 10}))
+
+    async def finish_run():
+        await asyncio.sleep(0.1)
+        db.add(AutomationRunEvent(run_id=run.id, seq=2, type="status", data={"status": "completed"}))
+        run.status = "completed"
+        db.commit()
+
+    async def scenario():
+        response, _ = await asyncio.gather(_get(f"/api/automation/runs/{run.id}/events"), finish_run())
+        return response
+
+    response = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert _events(response.text) == [("1", "progress"), ("2", "status")]
+
+
+def test_stream_resumes_after_last_event_id(db):
+    run = _run_with_events(
+        db, "completed", ("progress", {}), ("phase", {"phase": "analyze"}), ("status", {"status": "completed"})
+    )
+
+    response = asyncio.run(_get(f"/api/automation/runs/{run.id}/events", headers={"Last-Event-ID": "1"}))
+
+    assert _events(response.text) == [("2", "phase"), ("3", "status")]
+
+
+def test_finished_run_with_nothing_left_answers_204(db):
+    run = _run_with_events(db, "completed", ("status", {"status": "completed"}))
+
+    response = asyncio.run(_get(f"/api/automation/runs/{run.id}/events", params={"after": 1}))
+
+    assert response.status_code == 204
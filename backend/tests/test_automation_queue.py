@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.models import AutomationRun, User
+from app.services.automation_queue import claim_run, enqueue_run, release_run, renew_lease
+
+
+def _queued_run(db) -> AutomationRun:
+    user = User()
+    db.add(user)
+    db.commit()
+    run = AutomationRun(user_id=user.id, config={"specializations": [], "cities": []})
+    db.add(run)
+    enqueue_run(db, run)
+    return run
+
+
+def _expire_lease(db, run: AutomationRun):
+    run.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+
+def test_runs_are_claimed_once_in_order(db):
+    first, second = _queued_run(db), _queued_run(db)
+
+    assert claim_run(db, "worker-a") == first.id
+    assert claim_run(db, "worker-b") == second.id
+    assert claim_run(db, "worker-c") is None
+
+    db.refresh(first)
+    assert first.status == "running"
+    assert first.worker_id == "worker-a"
+    assert first.attempts == 1
+    assert first.lease_expires_at > datetime.utcnow()
+
+
+def test_only_the_holder_renews_its_lease(db):
+    run = _queued_run(db)
+    claim_run(db, "worker-a")
+
+    assert renew_lease(db, run.id, "worker-a")
+    assert not renew_lease(db, run.id, "worker-b")
+
+    run.status = "completed"
+    db.commit()
+    assert not renew_lease(db, run.id, "worker-a")
+
+
+def test_run_with_expired_lease_is_reclaimed(db):
+    run = _queued_run(db)
+    claim_run(db, "worker-a")
+    assert claim_run(db, "worker-b") is None
+
+    _expire_lease(db, run)
+    assert claim_run(db, "worker-b") == run.id
+
+    db.refresh(run)
+    assert run.worker_id == "worker-b"
+    assert run.attempts == 2
+    # The first worker has lost the run
+    assert not renew_lease(db, run.id, "worker-a")
+
+
+def test_run_is_given_up_after_max_attempts(db):
+    run = _queued_run(db)
+    for attempt in range(settings.automation_max_attempts):
+        assert claim_run(db, f"worker-{attempt}") == run.id
+        _expire_lease(db, run)
+
+    assert claim_run(db, "worker-last") is None
+    db.refresh(run)
+    assert run.status == "interrupted"
+    assert run.worker_id is None
+
+
+def test_released_run_is_claimed_again_without_using_an_attempt(db):
+    run = _queued_run(db)
+    claim_run(db, "worker-a")
+
+    release_run(db, run.id, "worker-a")
+    assert claim_run(db, "worker-b") == run.id
+
+    db.refresh(run)
+    assert run.attempts == 1
+
+
+def test_release_by_another_worker_is_ignored(db):
+    run = _queued_run(db)
+    claim_run(db, "worker-a")
+
+    release_run(db, run.id, "worker-b")
+    assert claim_run(db, "worker-b") is None
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.services.fair_share import DEFAULT_SHARE, FairSemaphore, share_key
+
+
+async def _queue_up(semaphore: FairSemaphore, order: list, key: str, label: str):
+    async with semaphore.slot(key):
+        order.append(label)
+        await asyncio.sleep(0)
+
+
+def test_freed_slots_rotate_between_keys():
+    async def scenario():
+        semaphore = FairSemaphore(1)
+        order = []
+        await semaphore.acquire("holder")
+        tasks = [
+            asyncio.create_task(_queue_up(semaphore, order, key, f"{key}{i}"))
+            for key, count in (("big", 3), ("small", 2))
+            for i in range(count)
+        ]
+        await asyncio.sleep(0)
+        assert semaphore.waiting() == {"big": 3, "small": 2}
+
+        semaphore.release()
+        await asyncio.gather(*tasks)
+        return semaphore, order
+
+    semaphore, order = asyncio.run(scenario())
+    # First come first served would be big0, big1, big2, small0, small1
+    assert order == ["big0", "small0", "big1", "small1", "big2"]
+    assert semaphore.granted == {"holder": 1, "big": 3, "small": 2}
+    assert semaphore.waiting() == {}
+    assert semaphore.value == 1
+
+
+def test_key_defaults_to_the_context_share():
+    async def run_in(key: str | None, semaphore: FairSemaphore):
+        if key:
+            share_key.set(key)
+        async with semaphore.slot():
+            pass
+
+    async def scenario():
+        semaphore = FairSemaphore(2)
+        await asyncio.gather(run_in("run:1", semaphore), run_in(None, semaphore))
+        return semaphore.granted
+
+    assert asyncio.run(scenario()) == {"run:1": 1, DEFAULT_SHARE: 1}
+
+
+def test_cancelled_waiter_leaves_the_line():
+    async def scenario():
+        semaphore = FairSemaphore(1)
+        order = []
+        await semaphore.acquire("holder")
+        gone = asyncio.create_task(_queue_up(semaphore, order, "a", "a0"))
+        stays = asyncio.create_task(_queue_up(semaphore, order, "b", "b0"))
+        await asyncio.sleep(0)
+
+        gone.cancel()
+        await asyncio.sleep(0)
+        assert semaphore.waiting() == {"b": 1}
+
+        semaphore.release()
+        await stays
+        return semaphore, order
+
+    semaphore, order = asyncio.run(scenario())
+    assert order == ["b0"]
+    assert semaphore.value == 1
+
+
+def test_slot_handed_to_a_cancelled_waiter_is_passed_on():
+    async def scenario():
+        semaphore = FairSemaphore(1)
+        order = []
+        await semaphore.acquire("holder")
+        unlucky = asyncio.create_task(_queue_up(semaphore, order, "a", "a0"))
+        next_up = asyncio.create_task(_queue_up(semaphore, order, "b", "b0"))
+        await asyncio.sleep(0)
+
+        # The slot goes to "a", which is cancelled before it gets to run
+        semaphore.release()
+        unlucky.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await unlucky
+        await asyncio.wait_for(next_up, timeout=1)
+        return semaphore, order
+
+    semaphore, order = asyncio.run(scenario())
+    assert order == ["b0"]
+    assert semaphore.value == 1
+
+
+def test_value_must_be_positive():
+    with pytest.raises(ValueError):
+        FairSemaphore(0)
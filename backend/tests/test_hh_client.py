@@ -0,0 +1,34 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.hh_client import HHClient
+from app.services.hh_resilience import Deadline, DeadlineExceeded
+
+
+def test_follower_reissues_call_after_leader_deadline(db):
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            # Outlives the leader's deadline
+            await asyncio.sleep(0.2)
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(200, json={"id": "42"})
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            leader = HHClient(http_client=http, deadline=Deadline(0.1))
+            follower = HHClient(http_client=http, deadline=Deadline(5))
+            leader_call = asyncio.create_task(leader.get_vacancy("42"))
+            await asyncio.sleep(0)
+            result = await follower.get_vacancy("42")
+            with pytest.raises(DeadlineExceeded):
+                await leader_call
+            return result
+
+    assert asyncio.run(scenario()) == {"id": "42"}
+    assert calls == 2
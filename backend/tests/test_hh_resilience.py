@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from app.services import hh_resilience
+from app.services.hh_resilience import (
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitOpenError,
+    Deadline,
+    DeadlineExceeded,
+)
+
+
+class Clock:
+    """Stand-in for time.monotonic in hh_resilience."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(hh_resilience.time, "monotonic", clock)
+    return clock
+
+
+def _opened(clock) -> CircuitBreaker:
+    breaker = CircuitBreaker("search", failure_threshold=3, recovery_timeout=30.0)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("search", failure_threshold=3, recovery_timeout=30.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # Resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += 10
+    with pytest.raises(CircuitOpenError) as raised:
+        breaker.before_call()
+    assert raised.value.retry_after == pytest.approx(20.0)
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = _opened(clock)
+    clock.now += 30
+
+    breaker.before_call()  # The probe
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Everyone else waits for its verdict
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = _opened(clock)
+    clock.now += 30
+    breaker.before_call()
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_released_probe_frees_the_slot(clock):
+    breaker = _opened(clock)
+    clock.now += 30
+    breaker.before_call()
+
+    breaker.release()  # E.g. the probe was cancelled
+
+    breaker.before_call()
+    assert breaker.state == "half_open"
+
+
+def test_breakers_are_kept_per_group():
+    breakers = CircuitBreakers()
+
+    assert breakers.get("search") is breakers.get("search")
+    assert breakers.get("search") is not breakers.get("detail")
+    assert set(breakers.snapshot()) == {"search", "detail"}
+
+
+def test_deadline_counts_down_and_raises_when_spent():
+    deadline = Deadline(0.05)
+    assert 0 < deadline.remaining() <= 0.05
+    deadline.check()
+
+    time.sleep(0.06)
+
+    assert deadline.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded) as raised:
+        deadline.check()
+    assert raised.value.status_code == 504
@@ -0,0 +1,27 @@
+import asyncio
+
+from app.models import User
+from app.services.negotiation_sync import sync_negotiations
+
+
+class FakeNegotiationsClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_negotiations(self, page: int = 0, per_page: int = 100) -> dict:
+        self.calls += 1
+        return {"items": [], "pages": 0}
+
+
+def test_user_without_negotiations_is_not_resynced_within_ttl(db):
+    user = User()
+    db.add(user)
+    db.commit()
+    client = FakeNegotiationsClient()
+
+    asyncio.run(sync_negotiations(db, client, user.id))
+    asyncio.run(sync_negotiations(db, client, user.id))
+    assert client.calls == 1
+
+    asyncio.run(sync_negotiations(db, client, user.id, force=True))
+    assert client.calls == 2
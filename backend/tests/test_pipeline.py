@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.services.pipeline import Pipeline, Stage
+
+
+def test_items_flow_through_stages_and_dropped_ones_stop():
+    async def double(item):
+        return item * 2
+
+    async def keep_big(item):
+        return item if item >= 4 else None
+
+    collected = []
+
+    async def collect(item):
+        collected.append(item)
+
+    pipeline = Pipeline(Stage("double", double), Stage("filter", keep_big), Stage("collect", collect))
+    finished = []
+
+    async def source(first: Stage):
+        for item in range(4):
+            await first.put(item)
+
+    asyncio.run(pipeline.run(source, on_finished=finished.append))
+
+    assert sorted(collected) == [4, 6]
+    assert finished == ["source", "double", "filter", "collect"]
+    assert pipeline["filter"].stats["processed"] == 4
+
+
+def test_full_queue_holds_back_upstream():
+    release = asyncio.Event()
+    fed = 0
+
+    async def slow(item):
+        await release.wait()
+
+    pipeline = Pipeline(Stage("slow", slow, maxsize=2))
+
+    async def source(first: Stage):
+        nonlocal fed
+        for item in range(10):
+            await first.put(item)
+            fed += 1
+
+    async def scenario():
+        running = asyncio.create_task(pipeline.run(source))
+        await asyncio.sleep(0.01)
+        # One item in the handler, two queued; the source waits for room
+        assert fed == 3
+        release.set()
+        await running
+
+    asyncio.run(scenario())
+    assert fed == 10
+
+
+def test_failing_item_is_counted_and_the_rest_carry_on():
+    async def picky(item):
+        if item == 2:
+            raise ValueError("bad item")
+        return item
+
+    passed = []
+
+    async def collect(item):
+        passed.append(item)
+
+    pipeline = Pipeline(Stage("picky", picky, workers=2), Stage("collect", collect))
+
+    async def source(first: Stage):
+        for item in range(5):
+            await first.put(item)
+
+    asyncio.run(pipeline.run(source))
+
+    assert sorted(passed) == [0, 1, 3, 4]
+    assert pipeline["picky"].stats["failed"] == 1
+
+
+def test_source_error_propagates_and_stops_the_stages():
+    async def handle(item):
+        return None
+
+    pipeline = Pipeline(Stage("only", handle))
+
+    async def source(first: Stage):
+        await first.put(1)
+        raise RuntimeError("search failed")
+
+    async def scenario():
+        with pytest.raises(RuntimeError, match="search failed"):
+            await pipeline.run(source)
+        await asyncio.sleep(0.01)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    # The stage workers were cancelled rather than left waiting for items
+    assert asyncio.run(scenario()) == []
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.services.area_index import AreaIndex
+from app.services.hh_client import HHClient
+from app.services.query_partitioner import QueryPartitioner
+from app.services.vacancy_store import HH_DATE_FORMAT
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+# Region "1" with cities "2" and "3"
+AREAS = [{"id": "1", "name": "Область", "areas": [
+    {"id": "2", "name": "Город", "areas": []},
+    {"id": "3", "name": "Посёлок", "areas": []},
+]}]
+
+
+class FakeHH:
+    """Search over (id, area, published) postings; HH's 2000-result cap included."""
+
+    def __init__(self, postings: list[tuple[str, str, datetime]]):
+        self.postings = postings
+        self.index = AreaIndex(AREAS)
+
+    async def get_area_index(self):
+        return self.index
+
+    def _matching(self, area=None, date_from=None, date_to=None, **params) -> list[dict]:
+        since = datetime.strptime(date_from, HH_DATE_FORMAT) if date_from else None
+        until = datetime.strptime(date_to, HH_DATE_FORMAT) if date_to else None
+        return [
+            {"id": vacancy_id}
+            for vacancy_id, vacancy_area, published in self.postings
+            if (area is None or self.index.is_within(vacancy_area, area))
+            and (since is None or published >= since)
+            and (until is None or published <= until)
+        ]
+
+    async def search_vacancies_full(self, page=0, per_page=20, **params) -> dict:
+        return {"found": len(self._matching(**params))}
+
+    async def iter_export_pages(self, max_pages=20, **params):
+        matching = self._matching(**params)[:max_pages * 100]
+        for start in range(0, len(matching), 100):
+            yield matching[start:start + 100]
+
+
+async def _export(partitioner: QueryPartitioner, params: dict) -> set[str]:
+    ids = set()
+    async for items in partitioner.iter_pages(params):
+        ids.update(item["id"] for item in items)
+    return ids
+
+
+def test_area_with_children_is_bisected_by_date_without_losing_its_own_vacancies():
+    postings = [
+        (f"r{i}", "1", NOW - timedelta(hours=i % 48)) for i in range(1500)  # On the region itself
+    ] + [
+        (f"c{i}", "2", NOW - timedelta(hours=i % 48)) for i in range(1500)
+    ]
+    partitioner = QueryPartitioner(FakeHH(postings), max_slices=50)
+
+    ids = asyncio.run(_export(partitioner, {"area": "1", "period": 3}))
+
+    assert len(ids) == 3000
+    assert partitioner.uncovered == 0
+
+
+def test_uncovered_vacancies_are_reported_when_only_child_areas_are_left():
+    # All at one instant: the date window cannot be bisected
+    postings = [(f"r{i}", "1", NOW) for i in range(500)] + [(f"c{i}", "2", NOW) for i in range(1800)]
+    window = {"date_from": NOW.strftime(HH_DATE_FORMAT), "date_to": NOW.strftime(HH_DATE_FORMAT)}
+    partitioner = QueryPartitioner(FakeHH(postings), max_slices=50)
+
+    ids = asyncio.run(_export(partitioner, {"area": "1", **window}))
+
+    assert len(ids) == 1800
+    assert partitioner.uncovered == 500
+
+
+def test_consumer_stopping_early_does_not_leave_the_producer_stuck():
+    postings = [(f"c{i}", "2", NOW - timedelta(minutes=i)) for i in range(1500)]
+    partitioner = QueryPartitioner(FakeHH(postings))
+
+    async def scenario():
+        pages = partitioner.iter_pages({"area": "2"})
+        await anext(pages)
+        await asyncio.sleep(0.01)  # Let the producer fill the queue
+        await pages.aclose()
+        await asyncio.sleep(0.01)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(scenario()) == []
+
+
+def test_concurrent_exports_log_their_own_page_timings(db, caplog):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        area = request.url.params["area"]
+        pages = {"1": 3, "2": 2}[area]
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"found": pages * 100, "pages": pages, "items": [{"id": area}] * 100})
+
+    async def export(client: HHClient, area: str):
+        async for _ in client.iter_export_pages(max_pages=5, area=area):
+            pass
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            client = HHClient(http_client=http)
+            await asyncio.gather(export(client, "1"), export(client, "2"))
+
+    with caplog.at_level(logging.INFO, logger="app.services.hh_client"):
+        asyncio.run(scenario())
+
+    exported = sorted(r.getMessage().split(" (")[0] for r in caplog.records if r.getMessage().startswith("Exported"))
+    assert exported == ["Exported 2 pages", "Exported 3 pages"]
@@ -0,0 +1,129 @@
+import asyncio
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.database import engine
+from app.models import AppSettings, User
+from app.services.hh_tokens import _take_refresh_lease, refresh_lock
+from app.services.rate_limiter import DEFAULT_HH_RATES, HHRateLimiter, load_rate_limits
+
+
+def test_processes_share_one_budget(db):
+    # Two limiters stand in for the API and a worker on the same database
+    api, worker = HHRateLimiter(), HHRateLimiter()
+    api.configure({"search": 2.0})
+
+    waits = [
+        api.buckets["search"]._reserve(),
+        worker.buckets["search"]._reserve(),
+        api.buckets["search"]._reserve(),
+        worker.buckets["search"]._reserve(),
+    ]
+
+    # Burst of 2 goes through, then one slot per 0.5s across both
+    assert waits[:2] == [0.0, 0.0]
+    assert 0.4 < waits[2] <= 0.5
+    assert 0.9 < waits[3] <= 1.0
+
+
+def test_configure_applies_to_every_process(db):
+    api, worker = HHRateLimiter(), HHRateLimiter()
+    api.configure({"detail": 7.0})
+
+    assert worker.get_rates()["detail"] == 7.0
+
+
+def test_refresh_lock_excludes_other_processes(db):
+    user = User(hh_user_id="lock")
+    db.add(user)
+    db.commit()
+
+    async def scenario():
+        async with refresh_lock(user.id):
+            # What another process would try while this one refreshes
+            assert not _take_refresh_lease(user.id)
+        assert _take_refresh_lease(user.id)
+
+    asyncio.run(scenario())
+
+
+def test_refresh_lease_of_crashed_process_expires(db):
+    user = User(hh_user_id="crash", hh_refresh_locked_until=datetime.utcnow() - timedelta(seconds=1))
+    db.add(user)
+    db.commit()
+
+    assert _take_refresh_lease(user.id)
+
+
+def test_locked_database_neither_blocks_the_loop_nor_fails_the_request(db, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "database_busy_timeout", 0.3)
+    engine.dispose()  # Reconnect with the short busy_timeout
+    limiter = HHRateLimiter()
+    limiter.configure({"detail": 5.0})
+
+    writer = sqlite3.connect(engine.url.database)
+    writer.execute("BEGIN IMMEDIATE")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.02)
+            ticks += 1
+
+    async def scenario():
+        ticking = asyncio.create_task(ticker())
+        try:
+            return await limiter.acquire("/vacancies/1")
+        finally:
+            ticking.cancel()
+
+    try:
+        waited = asyncio.run(scenario())
+    finally:
+        writer.rollback()
+        writer.close()
+        engine.dispose()
+
+    assert "pacing in-process" in caplog.text  # Instead of raising "database is locked"
+    assert waited == 0.0
+    assert ticks >= 5  # The loop kept running while the reservation waited
+
+
+def test_classify_endpoints():
+    assert HHRateLimiter.classify("/vacancies?text=python") == "search"
+    assert HHRateLimiter.classify("/vacancies/123") == "detail"
+    assert HHRateLimiter.classify("/negotiations/active") == "negotiations"
+    assert HHRateLimiter.classify("/resumes/mine") == "resumes"
+    assert HHRateLimiter.classify("/dictionaries") == "default"
+
+
+def test_acquire_paces_requests_after_the_burst(db):
+    limiter = HHRateLimiter()
+    limiter.configure({"detail": 5.0})  # Burst of 5, then one per 200ms
+
+    async def scenario():
+        start = time.monotonic()
+        waits = [await limiter.acquire("/vacancies/1") for _ in range(7)]
+        return waits, time.monotonic() - start
+
+    waits, elapsed = asyncio.run(scenario())
+
+    assert waits[:5] == [0.0] * 5
+    assert all(wait > 0 for wait in waits[5:])
+    assert 0.3 <= elapsed < 0.6
+
+
+def test_load_rate_limits_applies_overrides_and_skips_invalid_ones(db):
+    db.add_all([
+        AppSettings(key="hh_rate_search", value="0.5"),
+        AppSettings(key="hh_rate_detail", value="fast"),
+    ])
+    db.commit()
+
+    rates = load_rate_limits(db)
+
+    assert rates["search"] == 0.5
+    assert rates["detail"] == DEFAULT_HH_RATES["detail"]
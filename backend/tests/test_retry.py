@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import retry
+from app.services.hh_resilience import HHRateLimited
+from app.services.retry import RetryPolicy, parse_retry_after
+
+
+@pytest.fixture
+def slept(monkeypatch):
+    """Record backoff sleeps instead of waiting."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(retry.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def _sender(*outcomes):
+    """send() answering with the given statuses/exceptions in turn."""
+    calls = []
+
+    async def send():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        request = httpx.Request("GET", "https://api.hh.ru/vacancies")
+        if isinstance(outcome, Exception):
+            raise outcome
+        status, headers = outcome if isinstance(outcome, tuple) else (outcome, {})
+        return httpx.Response(status, headers=headers, request=request)
+
+    send.calls = calls
+    return send
+
+
+def _policy() -> RetryPolicy:
+    return RetryPolicy(attempts=3, base_delay=0.1, max_delay=10.0, budget=30.0)
+
+
+def test_waits_exactly_as_long_as_retry_after_asks(slept):
+    send = _sender((429, {"Retry-After": "7"}), 200)
+
+    response = asyncio.run(_policy().run("GET", send))
+
+    assert response.status_code == 200
+    assert slept == [7.0]
+
+
+def test_retry_after_beyond_max_delay_raises_instead_of_retrying_early(slept):
+    send = _sender((429, {"Retry-After": "60"}), 200)
+
+    with pytest.raises(HHRateLimited) as raised:
+        asyncio.run(_policy().run("GET", send))
+
+    assert raised.value.retry_after == 60.0
+    assert raised.value.status_code == 429
+    assert len(send.calls) == 1
+    assert slept == []
+
+
+def test_retry_after_beyond_deadline_raises(slept):
+    send = _sender((429, {"Retry-After": "5"}), 200)
+
+    with pytest.raises(HHRateLimited):
+        asyncio.run(_policy().run("GET", send, time_left=lambda: 2.0))
+    assert slept == []
+
+
+def test_retry_after_beyond_remaining_budget_raises(slept):
+    policy = RetryPolicy(attempts=5, base_delay=0.1, max_delay=10.0, budget=12.0)
+    send = _sender((429, {"Retry-After": "8"}), (429, {"Retry-After": "8"}), 200)
+
+    with pytest.raises(HHRateLimited):
+        asyncio.run(policy.run("GET", send))
+    assert slept == [8.0]
+
+
+def test_server_errors_are_retried_only_for_idempotent_methods(slept):
+    assert asyncio.run(_policy().run("GET", _sender(503, 200))).status_code == 200
+    assert asyncio.run(_policy().run("POST", _sender(503, 200))).status_code == 503
+
+
+def test_gives_up_after_attempts(slept):
+    error = httpx.ConnectError("refused")
+    send = _sender(error, error, error, error)
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(_policy().run("POST", send))
+    assert len(send.calls) == 4
+    assert all(0.1 <= delay <= 10.0 for delay in slept)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # In the past
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
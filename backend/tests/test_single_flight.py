@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"id": "1"}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.run("key", fetch) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats == {"started": 1, "coalesced": 4}
+    assert flight.inflight == 0
+
+
+def test_failure_is_shared_and_not_cached():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.run("key", fetch) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        with pytest.raises(ValueError):
+            await flight.run("key", fetch)  # A new call, not the failed one
+
+    asyncio.run(scenario())
+    assert calls == 2
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.create_task(flight.run("key", fetch))
+        follower = asyncio.create_task(flight.run("key", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_waiter_timeout_leaves_the_call_running_for_others():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        patient = asyncio.create_task(flight.run("key", fetch))
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.run("key", fetch, timeout=0.01)
+        return await patient
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0)
+        return object()
+
+    async def scenario():
+        return await asyncio.gather(flight.run("a", fetch), flight.run("b", fetch))
+
+    first, second = asyncio.run(scenario())
+    assert first is not second
+    assert flight.stats["started"] == 2
@@ -0,0 +1,63 @@
+import asyncio
+
+from app.models import VacancyCache
+from app.services.vacancy_hydration import hydrate_vacancies
+from app.services.vacancy_store import upsert_search_items
+
+
+def _search_item(hh_id: str) -> dict:
+    return {
+        "id": hh_id,
+        "name": "Python-разработчик",
+        "published_at": "2026-10-01T10:00:00+0300",
+        "snippet": {"requirement": "Python", "responsibility": "API"},
+    }
+
+
+def test_gone_vacancy_is_archived_without_touching_content(db, fake_hh):
+    upsert_search_items(db, [_search_item("1")])
+    db.commit()
+    vacancy = db.query(VacancyCache).one()
+
+    asyncio.run(hydrate_vacancies(db, fake_hh, [vacancy]))
+
+    db.refresh(vacancy)
+    assert vacancy.archived_at is not None
+    assert vacancy.details_fetched_at is None
+    assert vacancy.raw_data["name"] == "Python-разработчик"
+    assert vacancy.description
+
+
+def test_archived_details_are_not_applied(db, fake_hh):
+    upsert_search_items(db, [_search_item("2")])
+    db.commit()
+    vacancy = db.query(VacancyCache).one()
+    snippet = vacancy.description
+    fake_hh.vacancies["2"] = {"id": "2", "archived": True, "description": None, "key_skills": []}
+
+    asyncio.run(hydrate_vacancies(db, fake_hh, [vacancy]))
+
+    db.refresh(vacancy)
+    assert vacancy.archived_at is not None
+    assert vacancy.details_fetched_at is None
+    assert vacancy.description == snippet
+
+
+def test_details_are_applied(db, fake_hh):
+    upsert_search_items(db, [_search_item("3")])
+    db.commit()
+    vacancy = db.query(VacancyCache).one()
+    fake_hh.vacancies["3"] = {
+        "id": "3",
+        "archived": False,
+        "description": "<p>Полное описание</p>",
+        "key_skills": [{"name": "Python"}],
+    }
+
+    asyncio.run(hydrate_vacancies(db, fake_hh, [vacancy]))
+
+    db.refresh(vacancy)
+    assert vacancy.archived_at is None
+    assert vacancy.details_fetched_at is not None
+    assert vacancy.description == "<p>Полное описание</p>"
+    assert vacancy.key_skills == ["Python"]
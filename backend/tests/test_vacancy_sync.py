@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.models import VacancyCache, VacancySyncState
+from app.services.vacancy_store import format_hh_datetime, parse_hh_datetime
+from app.services.vacancy_sync import VacancySync, query_key
+
+START = datetime(2026, 1, 1)
+
+
+class FakeSearchClient:
+    """HH search over a list of postings, newest first, filtered by date_from/date_to."""
+
+    def __init__(self):
+        self.postings: list[dict] = []
+
+    def post(self, count: int):
+        for _ in range(count):
+            n = len(self.postings)
+            self.postings.append({
+                "id": str(1000 + n),
+                "name": f"Вакансия {n}",
+                "published_at": format_hh_datetime(START + timedelta(minutes=n)),
+            })
+
+    async def search_vacancies(self, date_from=None, date_to=None, order_by=None, page=0, per_page=20, **params):
+        since = parse_hh_datetime(date_from)
+        until = parse_hh_datetime(date_to)
+        matching = [
+            item for item in reversed(self.postings)
+            if (since is None or parse_hh_datetime(item["published_at"]) >= since)
+            and (until is None or parse_hh_datetime(item["published_at"]) <= until)
+        ]
+        return {
+            "found": len(matching),
+            "pages": -(-len(matching) // per_page),
+            "items": matching[page * per_page:(page + 1) * per_page],
+        }
+
+
+def test_truncated_sync_backfills_the_gap(db):
+    client = FakeSearchClient()
+    client.post(350)
+    params = {"area": "1"}
+
+    asyncio.run(VacancySync(db, client, max_pages=2).sync(**params))
+    assert db.query(VacancyCache).count() == 200
+    state = db.get(VacancySyncState, query_key(params))
+    assert state.watermark is None  # Not past the unread 150
+
+    client.post(30)  # Posted while the gap is pending
+    asyncio.run(VacancySync(db, client, max_pages=2).sync(**params))
+    assert db.query(VacancyCache).count() == 350
+    assert state.backfill_to is None
+    assert state.watermark == START + timedelta(minutes=349)
+
+    asyncio.run(VacancySync(db, client, max_pages=2).sync(**params))
+    assert db.query(VacancyCache).count() == 380
+
+
+def test_untruncated_sync_moves_watermark(db):
+    client = FakeSearchClient()
+    client.post(50)
+    params = {"area": "2"}
+
+    asyncio.run(VacancySync(db, client, max_pages=2).sync(**params))
+
+    state = db.get(VacancySyncState, query_key(params))
+    assert state.watermark == START + timedelta(minutes=49)
+    assert state.backfill_to is None
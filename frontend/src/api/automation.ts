@@ -27,11 +27,13 @@ export interface VacancyRecommendation {
 }
 
 export interface AutomationStatus {
-  status: 'idle' | 'running' | 'completed' | 'error'
-  phase: 'loading' | 'analyzing' | 'generating' | 'applying' | null
+  run_id: number | null
+  status: 'idle' | 'queued' | 'running' | 'completed' | 'stopped' | 'error' | 'interrupted'
+  phase: 'loading' | 'hydrating' | 'analyzing' | 'generating' | 'applying' | null
   message: string
   vacancies_loaded: number
   vacancies_total: number
+  vacancies_duplicates: number
   vacancies_analyzed: number
   resumes_generated: number
   applications_sent: number
@@ -64,7 +66,7 @@ export const automationApi = {
     return response.data
   },
 
-  async start(config: AutomationConfig): Promise<{ message: string }> {
+  async start(config: AutomationConfig): Promise<{ message: string; run_id: number }> {
     const response = await apiClient.post('/api/automation/start', config)
     return response.data
   },
@@ -79,6 +81,11 @@ export const automationApi = {
     return response.data
   },
 
+  // Server-Sent Events stream of a run: progress, phase, recommendation, status
+  eventsUrl(runId: number, after = 0): string {
+    return `${import.meta.env.VITE_API_URL || ''}/api/automation/runs/${runId}/events?after=${after}`
+  },
+
   async getRecommendations(): Promise<VacancyRecommendation[]> {
     const response = await apiClient.get('/api/automation/recommendations')
     return response.data